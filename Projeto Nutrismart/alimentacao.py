@@ -1,19 +1,32 @@
 # Importações necessárias para o código
-import random
 from datetime import datetime, date
-from database import cursor, conn  
+from catalogo import catalogo
+from recalculo import atualizar_alimento, iniciar_recalculo
+from relatorios import gerar_relatorio, relatorio_datas, relatorio_mes, relatorio_semana
+from repositorios import (RepositorioFechamentos, RepositorioRecomendacoes, RepositorioRefeicoes, RepositorioTotaisDiarios,
+                          data_da_chave, intervalo_datas, intervalo_ultimos_dias)
+from sessao import Sessao
+
+# Alimentos consumidos nos últimos dias não entram nas recomendações
+DIAS_SEM_REPETIR = 3
+
+# Refeições por página do histórico
+TAMANHO_PAGINA_HISTORICO = 20
 
 class Comida:
     """Classe principal para gerenciar operações relacionadas a alimentos"""
     
-    def __init__(self, email_usuario):
+    def __init__(self, email_usuario, sessao=None):
         """
         Inicializa a instância da classe Comida
         
         Args:
             email_usuario (str): Email do usuário que será associado às operações
+            sessao (Sessao, opcional): Sessão do usuário logado, com o perfil já
+                carregado (padrão: uma sessão nova, lida no primeiro uso)
         """
         self.email_usuario = email_usuario
+        self.sessao = sessao if sessao is not None else Sessao(email_usuario)
     
     def registrar_refeicao(self, alimento, quantidade):
         """
@@ -28,21 +41,16 @@ class Comida:
         """
         try:
             # Verifica se o alimento existe no banco de dados
-            cursor.execute("SELECT calorias FROM alimentos WHERE nome = ?", (alimento,))
-            resultado = cursor.fetchone()
-            if not resultado:
-                return False, "Alimento não cadastrado"
+            calorias_100g = catalogo.calorias(alimento)
+            if calorias_100g is None:
+                return False, catalogo.mensagem_nao_cadastrado(alimento)
             
             # Calcula as calorias consumidas com base na quantidade (em gramas)
-            calorias = (quantidade / 100) * resultado[0]
+            calorias = (quantidade / 100) * calorias_100g
             
             # Insere a refeição no banco de dados com data/hora atual
             data = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute('''
-                INSERT INTO refeicoes (email_usuario, alimento, quantidade_gramas, calorias, data)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (self.email_usuario, alimento, quantidade, calorias, data))
-            conn.commit()
+            RepositorioRefeicoes.inserir(self.email_usuario, alimento, quantidade, calorias, data)
             return True, "Refeição registrada com sucesso"
             
         except Exception as e:
@@ -50,105 +58,233 @@ class Comida:
             print(f"Erro ao registrar refeição: {e}")
             return False, f"Erro ao registrar: {str(e)}"
 
-    def ver_refeicoes(self):
+    def registrar_refeicoes(self, itens, fila=None, ao_concluir=None):
         """
-        Retorna todas as refeições registradas pelo usuário
+        Registra várias refeições (um prato inteiro) de uma só vez
         
+        Consulta os alimentos no catálogo em memória, insere as refeições válidas
+        com uma única transação e informa separadamente os itens recusados, sem
+        impedir o registro dos demais.
+        
+        Args:
+            itens (list): Tuplas (alimento, quantidade[, data]); data é um datetime ou
+                texto 'AAAA-MM-DD HH:MM:SS' (padrão: data/hora atual)
+            fila (FilaGravacao, opcional): Se informada, as refeições válidas vão para a
+                fila de gravação em segundo plano em vez de serem gravadas agora
+            ao_concluir (callable, opcional): Com fila, chamada com (sucesso, quantidade, erro)
+                depois da gravação, ver gravacao.FilaGravacao.enfileirar
+            
         Returns:
-            list: Lista de tuplas com informações das refeições, ordenadas por data (mais recente primeiro)
+            tuple: (int, list) Quantidade registrada (ou enfileirada) e lista de (alimento, mensagem) das falhas
         """
-        cursor.execute('''
-            SELECT id, alimento, quantidade_gramas, calorias, data 
-            FROM refeicoes 
-            WHERE email_usuario = ?
-            ORDER BY data DESC
-        ''', (self.email_usuario,))
-        return cursor.fetchall()
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        falhas = []
+        validos = []
+        
+        for item in itens:
+            alimento, quantidade = item[0], item[1]
+            data = item[2] if len(item) > 2 and item[2] else agora
+            if isinstance(data, datetime):
+                data = data.strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                quantidade = float(quantidade)
+            except (TypeError, ValueError):
+                falhas.append((alimento, "Quantidade inválida"))
+                continue
+            if quantidade <= 0:
+                falhas.append((alimento, "A quantidade deve ser maior que zero"))
+                continue
+            validos.append((alimento, quantidade, data))
+        
+        refeicoes = []
+        recusados = set()  # Índices em validos dos alimentos não cadastrados (já em falhas)
+        try:
+            for i, (alimento, quantidade, data) in enumerate(validos):
+                calorias_100g = catalogo.calorias(alimento)
+                if calorias_100g is None:
+                    falhas.append((alimento, catalogo.mensagem_nao_cadastrado(alimento)))
+                    recusados.add(i)
+                    continue
+                calorias = (quantidade / 100) * calorias_100g
+                refeicoes.append((self.email_usuario, alimento, quantidade, calorias, data))
+            
+            if refeicoes:
+                if fila is not None:
+                    fila.enfileirar(refeicoes, ao_concluir)
+                else:
+                    RepositorioRefeicoes.inserir_varios(refeicoes)
+            return len(refeicoes), falhas
+            
+        except Exception as e:
+            # Trata erros durante o registro: nenhuma refeição do lote foi gravada
+            print(f"Erro ao registrar refeições: {e}")
+            nao_gravados = [alimento for i, (alimento, _, _) in enumerate(validos) if i not in recusados]
+            return 0, falhas + [(alimento, f"Erro ao registrar: {str(e)}") for alimento in nao_gravados]
 
-    def ver_alimentos_recomendados(self):
+    def registrar_refeicao_interativa(self):
+        """
+        Solicita os alimentos de um prato no terminal e registra todos de uma vez
+        """
+        print("\n=== Registrar refeição ===")
+        print("Informe os alimentos do prato (deixe o nome vazio para finalizar).")
+        itens = []
+        while True:
+            alimento = input("Alimento: ").strip().lower()
+            if not alimento:
+                break
+            if not catalogo.existe(alimento):
+                alimento = self.escolher_alimento_parecido(alimento)
+                if not alimento:
+                    continue
+            try:
+                quantidade = float(input("Quantidade (gramas): "))
+            except ValueError:
+                print("❌ Digite um número válido para a quantidade.")
+                continue
+            itens.append((alimento, quantidade))
+
+        if not itens:
+            print("❌ Nenhum alimento informado.")
+            return
+
+        registrados, falhas = self.registrar_refeicoes(itens)
+        if registrados:
+            print(f"✅ {registrados} alimento(s) registrado(s) com sucesso.")
+        for alimento, mensagem in falhas:
+            print(f"❌ {alimento}: {mensagem}")
+
+    @staticmethod
+    def escolher_alimento_parecido(digitado):
+        """
+        Mostra os alimentos cadastrados que completam ou se parecem com o nome digitado
+        e pede para o usuário escolher um deles
+        
+        Args:
+            digitado (str): Nome que não foi encontrado no catálogo
+            
+        Returns:
+            str: Nome escolhido, ou None se não houver sugestões ou o usuário desistir
+        """
+        opcoes = list(dict.fromkeys(catalogo.autocompletar(digitado, 5) + catalogo.sugerir(digitado, 5)))[:5]
+        if not opcoes:
+            print("❌ Alimento não cadastrado.")
+            return None
+        
+        print(f"🔎 '{digitado}' não está cadastrado. Você quis dizer:")
+        for i, nome in enumerate(opcoes, 1):
+            print(f"{i}. {nome}")
+        escolha = input("Escolha o número (Enter para digitar outro alimento): ").strip()
+        if escolha.isdigit() and 1 <= int(escolha) <= len(opcoes):
+            return opcoes[int(escolha) - 1]
+        return None
+
+    def ver_refeicoes(self, limite=TAMANHO_PAGINA_HISTORICO, apos=None, intervalo=None, alimento=None):
         """
-        Exibe 4 alimentos aleatórios recomendados com base na dieta do usuário
+        Retorna uma página das refeições registradas pelo usuário
         
-        Obtém a dieta do usuário do banco de dados e recomenda alimentos adequados
+        Args:
+            limite (int): Quantidade de refeições na página
+            apos (tuple, opcional): Cursor devolvido pela página anterior (None para a primeira)
+            intervalo (tuple, opcional): Faixa (inicio, fim) de chaves de dia, ver intervalo_datas
+            alimento (str, opcional): Apenas as refeições deste alimento
+            
+        Returns:
+            tuple: (list, tuple) Refeições da página, mais recentes primeiro, e o cursor
+                da próxima página (None se não houver mais)
         """
-        # Obtém a dieta do usuário do banco de dados
-        cursor.execute("SELECT dieta FROM usuarios WHERE email = ?", (self.email_usuario,))
-        resultado = cursor.fetchone()
+        return RepositorioRefeicoes.pagina(self.email_usuario, limite, apos, intervalo, alimento)
+
+    def ver_historico(self):
+        """
+        Exibe o histórico de refeições no terminal, uma página por vez, com filtros opcionais
+        """
+        print("\n📜 Histórico de refeições")
+        alimento = input("Filtrar por alimento (Enter para todos): ").strip().lower() or None
+        inicio = input("Primeiro dia (AAAA-MM-DD, Enter para sem limite): ").strip()
+        fim = input("Último dia (AAAA-MM-DD, Enter para sem limite): ").strip()
+        try:
+            intervalo = intervalo_datas(inicio or "1900-01-01", fim or date.today()) if inicio or fim else None
+        except ValueError:
+            print("❌ Data inválida. Use o formato AAAA-MM-DD.")
+            return
+
+        cursor = None
+        pagina = 1
+        while True:
+            refeicoes, cursor = self.ver_refeicoes(apos=cursor, intervalo=intervalo, alimento=alimento)
+            if not refeicoes and pagina == 1:
+                print("❌ Nenhuma refeição encontrada.")
+                return
+
+            print(f"\n--- Página {pagina} ---")
+            for _, nome, quantidade, calorias, data in refeicoes:
+                print(f"{data} | {nome.capitalize()} - {quantidade:.0f} g ({calorias:.0f} kcal)")
+
+            if cursor is None:
+                print("✅ Fim do histórico.")
+                return
+            if input("Enter para a próxima página, 's' para sair: ").strip().lower() == "s":
+                return
+            pagina += 1
+
+    def recomendar_alimentos(self, limite=4):
+        """
+        Escolhe alimentos do catálogo indicados para a dieta do usuário
+        
+        Alimentos consumidos nos últimos DIAS_SEM_REPETIR dias ficam de fora e os
+        menos consumidos no histórico têm prioridade.
+        
+        Args:
+            limite (int): Quantidade de alimentos
+            
+        Returns:
+            tuple: (str, list) Dieta do usuário e nomes dos alimentos recomendados,
+                ou None se o usuário não for encontrado
+        """
+        perfil = self.sessao.perfil
+        if not perfil:
+            return None
+        
+        dieta_usuario = perfil.dieta
+        recomendados = RepositorioRecomendacoes.recomendar(
+            self.email_usuario, dieta_usuario, intervalo_ultimos_dias(DIAS_SEM_REPETIR), limite)
+        return dieta_usuario, [alimento for alimento, _ in recomendados]
+
+    def ver_alimentos_recomendados(self):
+        """
+        Exibe 4 alimentos recomendados com base na dieta do usuário
+        """
+        resultado = self.recomendar_alimentos()
         if not resultado:
             print("❌ Usuário não encontrado.")
             return
 
-        dieta_usuario = resultado[0]
-
-        # Dicionário com alimentos recomendados para cada tipo de dieta
-        recomendacoes = {
-            "Low carb": [
-                "Ovos", "Abacate", "Peixes", "Nozes", "Couve-flor", "Espinafre", "Brócolis", "Azeite de oliva",
-                "Amêndoas", "Queijo", "Cogumelos", "Carne bovina", "Salmão", "Aspargos", "Alface", "Cenoura",
-                "Tomate", "Pepino", "Pimentão", "Berinjela", "Abobrinha", "Castanha-do-pará", "Aipo", "Azeitona",
-                "Sementes de chia", "Sementes de linhaça", "Coco", "Framboesa", "Morango", "Repolho", "Alcachofra",
-                "Cebola", "Algo", "Rúcula", "Manjericão", "Salsinha", "Endívia", "Alcaparras", "Pimenta", "Ervilha-torta",
-                "Limão", "Laranja", "Carne de porco", "Frango", "Iogurte natural", "Ricota", "Chá verde", "Água com gás",
-                "Vinagre de maçã", "Café"
-            ],
-            "Cetogênica": [
-                "Bacon", "Queijo cheddar", "Carne de cordeiro", "Manteiga", "Nata", "Óleo de coco", "Salmão selvagem",
-                "Ovos caipiras", "Espinafre", "Couve", "Brócolis", "Couve-flor", "Abacate", "Nozes", "Castanhas",
-                "Sementes de abóbora", "Azeitonas", "Chá de hortelã", "Café sem açúcar", "Queijo parmesão",
-                "Frango caipira", "Carne moída", "Camarão", "Atum", "Aspargos", "Abobrinha", "Cogumelos", "Algo",
-                "Cebola", "Pimenta", "Ervas frescas", "Alface", "Rúcula", "Salsa", "Manjericão", "Nata fresca",
-                "Creme de leite", "Óleo MCT", "Chá de camomila", "Queijo mozzarella", "Carne bovina", "Carne de porco",
-                "Peixes gordurosos", "Sementes de chia", "Sementes de linhaça", "Abacate", "Limão", "Vinagre de maçã",
-                "Água mineral"
-            ],
-            "Hiperproteica": [
-                "Peito de frango", "Clara de ovo", "Carne magra", "Peixes", "Queijo cottage", "Iogurte grego",
-                "Atum", "Carne bovina magra", "Salmão", "Ovos inteiros", "Tofu", "Tempeh", "Lentilhas", "Feijão",
-                "Quinoa", "Amêndoas", "Nozes", "Sementes de abóbora", "Camarão", "Proteína isolada", "Leite desnatado",
-                "Ricota", "Brócolis", "Couve-flor", "Espinafre", "Cenoura", "Abobrinha", "Alface", "Tomate",
-                "Pepino", "Pimentão", "Azeite de oliva", "Chá verde", "Água"
-            ],
-            "Bulking": [
-                "Arroz integral", "Batata doce", "Aveia", "Massas integrais", "Carne vermelha", "Peito de frango",
-                "Ovos", "Salmão", "Atum", "Quinoa", "Feijão", "Grão-de-bico", "Lentilha", "Leite integral",
-                "Iogurte natural", "Queijo", "Nozes", "Amêndoas", "Castanha-do-pará", "Abacate", "Banana",
-                "Morangos", "Espinafre", "Brócolis", "Cenoura", "Abobrinha", "Tomate", "Pepino", "Pimentão",
-                "Azeite de oliva", "Manteiga de amendoim", "Chá verde", "Água", "Mel", "Chocolate amargo",
-                "Batata inglesa", "Milho", "Pão integral", "Sementes de chia", "Sementes de linhaça", "Ervilha"
-            ]
-        }
-
-        # Obtém a lista de alimentos recomendados para a dieta do usuário
-        alimentos_recomendados = recomendacoes.get(dieta_usuario, [])
-
-        if not alimentos_recomendados:
+        dieta_usuario, recomendados = resultado
+        if not recomendados:
             print("❌ Nenhum alimento recomendado encontrado para esta dieta.")
             return
 
-        # Seleciona 4 alimentos aleatórios da lista
-        aleatorios = random.sample(alimentos_recomendados, k=4)
-
         # Exibe os alimentos recomendados
-        print(f"\n🍽️ 4 Alimentos aleatórios recomendados para a dieta {dieta_usuario}:")
-        for alimento in aleatorios:
-            print(f"- {alimento}")
+        print(f"\n🍽️ Alimentos recomendados para a dieta {dieta_usuario}:")
+        for alimento in recomendados:
+            print(f"- {alimento.capitalize()}")
 
-    def ranking_alimentos_mais_consumidos(self):
+    def ranking_alimentos_mais_consumidos(self, dias=None):
         """
         Exibe um ranking dos 10 alimentos mais consumidos pelo usuário (em gramas)
         
         Mostra os alimentos ordenados pela quantidade total consumida
+
+        Args:
+            dias (int, opcional): Considera apenas os últimos N dias (padrão: todo o histórico)
         """
-        print("\n🏆 Ranking dos alimentos mais consumidos:")
-        cursor.execute('''
-            SELECT alimento, SUM(quantidade_gramas) as total_gramas
-            FROM refeicoes
-            WHERE email_usuario = ?
-            GROUP BY alimento
-            ORDER BY total_gramas DESC
-            LIMIT 10
-        ''', (self.email_usuario,))
-        ranking = cursor.fetchall()
+        if dias:
+            print(f"\n🏆 Ranking dos alimentos mais consumidos nos últimos {dias} dias:")
+            ranking = RepositorioRefeicoes.ranking(self.email_usuario, limite=10,
+                                                  intervalo=intervalo_ultimos_dias(dias))
+        else:
+            print("\n🏆 Ranking dos alimentos mais consumidos:")
+            ranking = RepositorioRefeicoes.ranking(self.email_usuario, limite=10)
 
         if not ranking:
             print("❌ Nenhuma refeição registrada para gerar o ranking.")
@@ -181,14 +317,12 @@ class Adm_alimentar(Comida):
             return
 
         # Verifica se o alimento já existe
-        cursor.execute("SELECT * FROM alimentos WHERE nome = ?", (nome,))
-        if cursor.fetchone():
+        if catalogo.existe(nome):
             print("❌ Alimento já cadastrado!")
             return
 
         # Insere o novo alimento
-        cursor.execute("INSERT INTO alimentos (nome, calorias) VALUES (?, ?)", (nome, calorias))
-        conn.commit()
+        catalogo.inserir(nome, calorias)
         print(f"✅ Alimento '{nome}' cadastrado com sucesso.")
 
     @staticmethod
@@ -199,14 +333,61 @@ class Adm_alimentar(Comida):
         Exibe nome e calorias por 100g de cada alimento
         """
         print("\n=== Lista de alimentos cadastrados ===")
-        cursor.execute("SELECT nome, calorias FROM alimentos")
-        alimentos = cursor.fetchall()
+        alimentos = catalogo.listar()
         if alimentos:
             for a in alimentos:
                 print(f"- {a[0]} | {a[1]} cal por 100g")
         else:
             print("❌ Nenhum alimento cadastrado.")
 
+    @staticmethod
+    def atualizar_alimento():
+        """
+        Corrige os valores por 100g de um alimento já cadastrado
+
+        As refeições já registradas com o alimento são recalculadas em segundo
+        plano, em lotes, junto com os totais diários e os dias já fechados
+        """
+        print("\n=== Atualizar alimento ===")
+        nome = input("Nome do alimento: ").strip().lower()
+        atuais = catalogo.buscar(nome)
+        if not atuais:
+            print(catalogo.mensagem_nao_cadastrado(nome))
+            return
+
+        print("Deixe em branco para manter o valor atual.")
+        valores = []
+        for campo, atual in zip(("Calorias", "Proteínas", "Carboidratos", "Gorduras"), atuais):
+            texto = input(f"{campo} por 100g [{atual}]: ").strip().replace(",", ".")
+            try:
+                valor = float(texto) if texto else atual
+            except ValueError:
+                print(f"❌ Digite um número válido para {campo.lower()}.")
+                return
+            if valor < 0 or (campo == "Calorias" and valor <= 0):
+                print("❌ Calorias devem ser maior que zero e os demais valores não podem ser negativos.")
+                return
+            valores.append(valor)
+
+        if tuple(valores) == tuple(atuais):
+            print("Nenhum valor alterado.")
+            return
+
+        if not atualizar_alimento(nome, *valores):
+            print(f"✅ Alimento '{nome}' atualizado (nenhuma refeição a recalcular).")
+            return
+
+        def ao_concluir(resultado):
+            if isinstance(resultado, Exception):
+                print(f"\n❌ Erro ao recalcular as refeições: {resultado} "
+                      "(rode: python manutencao.py recalcular-alimentos)")
+            else:
+                print(f"\n✅ Recálculo concluído: {sum(resultado.values())} refeição(ões) atualizada(s).")
+
+        iniciar_recalculo(ao_concluir=ao_concluir)
+        print(f"✅ Alimento '{nome}' atualizado. As refeições já registradas estão sendo recalculadas "
+              "em segundo plano.")
+
     @staticmethod
     def excluir_alimento():
         """
@@ -216,29 +397,24 @@ class Adm_alimentar(Comida):
         """
         print("\n=== Excluir alimento ===")
         nome = input("Nome do alimento para excluir: ").strip().lower()
-        cursor.execute("SELECT * FROM alimentos WHERE nome = ?", (nome,))
-        if not cursor.fetchone():
+        if not catalogo.existe(nome):
             print("❌ Alimento não encontrado.")
             return
-        cursor.execute("DELETE FROM alimentos WHERE nome = ?", (nome,))
-        conn.commit()
+        catalogo.excluir(nome)
         print(f"✅ Alimento '{nome}' excluído com sucesso.")
 
 
 class Registros(Comida):
     """Classe para gerenciar registros diários e lembretes (herda de Comida)"""
     
-    def pegar_registros_do_dia(self):
+    def contar_refeicoes_do_dia(self):
         """
-        Obtém todos os registros alimentares do dia atual
+        Conta as refeições registradas no dia atual
         
         Returns:
-            list: Lista de registros do dia atual
+            int: Quantidade de refeições registradas hoje
         """
-        hoje = date.today()
-        cursor.execute("SELECT * FROM registro_refeicoes WHERE email = ? AND data = ?", (self.email_usuario, str(hoje)))
-        registros = cursor.fetchall()
-        return registros
+        return RepositorioRefeicoes.contar_do_dia(self.email_usuario, date.today())
 
     def submenu_lembretes(self):
         """
@@ -246,14 +422,14 @@ class Registros(Comida):
         
         Mostra alertas sobre consumo alimentar e hidratação
         """
-        registros_diarios = self.pegar_registros_do_dia()
+        refeicoes_hoje = self.contar_refeicoes_do_dia()
 
         print("\n--- Lembretes e Alertas ---")
 
-        if not registros_diarios:
+        if not refeicoes_hoje:
             print("Atenção! Você ainda não registrou nenhuma refeição hoje. Não esqueça de se alimentar!")
         else:
-            print(f"Você já registrou {len(registros_diarios)} refeição(ões) hoje. Continue assim!")
+            print(f"Você já registrou {refeicoes_hoje} refeição(ões) hoje. Continue assim!")
 
         print("Lembrete: Beba pelo menos 2 litros de água ao longo do dia.")
         input("\nPressione Enter para voltar ao menu principal...")
@@ -267,52 +443,113 @@ class Registros(Comida):
         print("\n📅 Encerramento do Dia")
         hoje = date.today().strftime("%Y-%m-%d")
 
-        # Obtém dados do usuário (dieta, peso, altura)
-        cursor.execute("SELECT dieta, peso, altura FROM usuarios WHERE email = ?", (self.email_usuario,))
-        resultado = cursor.fetchone()
-        if not resultado:
+        # Dados do usuário (dieta e meta calórica), já carregados na sessão
+        perfil = self.sessao.perfil
+        if not perfil:
             print("❌ Usuário não encontrado.")
             return
-        dieta_usuario, peso, altura = resultado
+        dieta_usuario = perfil.dieta
 
-        # Obtém todas as refeições registradas hoje
-        cursor.execute('''
-            SELECT r.alimento, r.quantidade_gramas, a.calorias
-            FROM refeicoes r
-            JOIN alimentos a ON r.alimento = a.nome
-            WHERE r.email_usuario = ? AND date(r.data) = ?
-        ''', (self.email_usuario, hoje))
-        refeicoes_hoje = cursor.fetchall()
+        # Obtém o total do dia, já consolidado a cada refeição registrada
+        total_hoje = RepositorioTotaisDiarios.buscar(self.email_usuario, hoje)
 
-        if not refeicoes_hoje:
+        if not total_hoje:
             print("❌ Nenhuma refeição registrada para hoje.")
             return
 
-        # Calcula o total de calorias consumidas
-        calorias_totais = 0
-        for alimento, quantidade, cal_100g in refeicoes_hoje:
-            calorias_totais += (cal_100g * quantidade) / 100
-
-        calorias_totais = round(calorias_totais, 2)
-
-        # Define metas calóricas baseadas no tipo de dieta
-        metas = {
-            "Low carb": 25 * peso,
-            "Cetogênica": 27 * peso,
-            "Hiperproteica": 30 * peso,
-            "Bulking": 35 * peso
-        }
+        calorias_totais = round(total_hoje[0], 2)
 
-        meta_calorias = metas.get(dieta_usuario, 30 * peso)
+        # Meta calórica baseada no tipo de dieta
+        meta_calorias = perfil.meta_calorias
 
         # Exibe o resumo e feedback
         print(f"\nDieta: {dieta_usuario}")
         print(f"Calorias consumidas hoje: {calorias_totais} kcal")
         print(f"Meta calórica diária aproximada: {meta_calorias} kcal")
 
+        # Macronutrientes do dia, consolidados junto com as calorias
+        _, _, proteinas, carboidratos, gorduras = total_hoje
+        print(f"Proteínas: {proteinas:.1f} g | Carboidratos: {carboidratos:.1f} g | Gorduras: {gorduras:.1f} g")
+
         if calorias_totais < meta_calorias * 0.9:
             print("⚠️ Você consumiu menos calorias que o recomendado para sua dieta hoje.")
         elif calorias_totais > meta_calorias * 1.1:
             print("⚠️ Você consumiu mais calorias que o recomendado para sua dieta hoje.")
         else:
-            print("✅ Consumo calórico dentro da meta para hoje. Bom trabalho!")
\ No newline at end of file
+            print("✅ Consumo calórico dentro da meta para hoje. Bom trabalho!")
+
+    def ver_relatorio(self):
+        """
+        Exibe o relatório de calorias e macronutrientes de vários dias, com médias
+        móveis e aderência à meta calórica
+        """
+        print("\n📊 Relatórios")
+        print("1. Esta semana")
+        print("2. Este mês")
+        print("3. Últimos 30 dias")
+        print("4. Escolher período")
+        print("5. Dias fechados (últimos 30)")
+        escolha = input("Escolha uma opção: ").strip()
+
+        if escolha == "5":
+            self.ver_dias_fechados()
+            return
+
+        if escolha == "1":
+            relatorio = relatorio_semana(self.email_usuario, perfil=self.sessao.perfil)
+        elif escolha == "2":
+            relatorio = relatorio_mes(self.email_usuario, perfil=self.sessao.perfil)
+        elif escolha == "3":
+            relatorio = gerar_relatorio(self.email_usuario, intervalo_ultimos_dias(30), self.sessao.perfil)
+        elif escolha == "4":
+            try:
+                relatorio = relatorio_datas(self.email_usuario, input("Primeiro dia (AAAA-MM-DD): ").strip(),
+                                            input("Último dia (AAAA-MM-DD): ").strip(), self.sessao.perfil)
+            except ValueError:
+                print("❌ Data inválida. Use o formato AAAA-MM-DD.")
+                return
+        else:
+            print("❌ Opção inválida!")
+            return
+
+        if not relatorio:
+            print("❌ Usuário não encontrado.")
+            return
+
+        print(f"\nDieta: {relatorio['dieta']} | Meta diária: {relatorio['meta']:.0f} kcal")
+        print(f"{'Dia':<12} {'kcal':>7} {'Prot.':>7} {'Carb.':>7} {'Gord.':>7} {'Média 7d':>9} {'Média 30d':>10}  Meta")
+        for dia in relatorio["dias"]:
+            if not dia.refeicoes:
+                print(f"{dia.dia.strftime('%d/%m/%Y'):<12} {'sem registros':>29}")
+                continue
+            media_7 = f"{dia.media_7:.0f}" if dia.media_7 is not None else "-"
+            media_30 = f"{dia.media_30:.0f}" if dia.media_30 is not None else "-"
+            print(f"{dia.dia.strftime('%d/%m/%Y'):<12} {dia.calorias:>7.0f} {dia.proteinas:>7.1f} "
+                  f"{dia.carboidratos:>7.1f} {dia.gorduras:>7.1f} {media_7:>9} {media_30:>10}  "
+                  f"{'✅' if dia.na_meta else '⚠️'}")
+
+        if relatorio["aderencia"] is None:
+            print("❌ Nenhuma refeição registrada no período.")
+            return
+        print(f"\nMédia do período: {relatorio['media_calorias']:.0f} kcal/dia")
+        print(f"Aderência à meta: {relatorio['aderencia']:.0%} dos dias registrados")
+
+    def ver_dias_fechados(self, dias=30):
+        """
+        Exibe o resultado dos dias já fechados pelo fechamento diário (ver fechamento.py)
+
+        Args:
+            dias (int): Quantidade de dias para trás
+        """
+        fechados = RepositorioFechamentos.listar_por_usuario(self.email_usuario, intervalo_ultimos_dias(dias))
+        if not fechados:
+            print("❌ Nenhum dia fechado nos últimos dias.")
+            return
+
+        simbolos = {-1: "⬇️ abaixo", 0: "✅ dentro", 1: "⬆️ acima"}
+        print(f"\n📅 Dias fechados (últimos {dias} dias)")
+        for dia, dieta, meta, calorias, proteinas, carboidratos, gorduras, situacao in fechados:
+            print(f"{data_da_chave(dia).strftime('%d/%m/%Y')} | {calorias:.0f} de {meta:.0f} kcal ({dieta}) | "
+                  f"P {proteinas:.0f} g, C {carboidratos:.0f} g, G {gorduras:.0f} g | {simbolos[situacao]}")
+        dentro = sum(1 for linha in fechados if linha[7] == 0)
+        print(f"Aderência: {dentro}/{len(fechados)} dia(s) dentro da meta ({dentro / len(fechados):.0%})")
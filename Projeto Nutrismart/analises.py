@@ -0,0 +1,200 @@
+# Painel de análises da população, para o administrador
+# Cada indicador sai de uma única consulta agrupada, lida de um índice de
+# cobertura ou de uma tabela de contagem mantida por gatilhos, nunca das
+# tabelas inteiras de usuários ou refeições: histograma de IMC
+# (idx_usuarios_imc), dietas e faixas de IMC (contagem_usuarios), calorias
+# médias contra a meta por dieta (idx_fechamentos_dia_dieta) e usuários ativos
+# (idx_totais_diarios_dia). Percentis e contagens por janela são calculados
+# com NumPy, se instalado. O painel fica em cache por TEMPO_CACHE segundos, e
+# a interface o calcula numa thread (calcular_painel_async).
+import bisect
+import itertools
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from database import FAIXAS_IMC, gerenciador
+from nutrientes import np
+from repositorios import (RepositorioFechamentos, RepositorioTotaisDiarios, RepositorioUsuarios, chave_dia,
+                          intervalo_ultimos_dias)
+
+# Segundos que um painel calculado continua valendo
+TEMPO_CACHE = 60
+
+# Largura (em pontos de IMC) de cada barra do histograma
+LARGURA_HISTOGRAMA_IMC = 1.0
+
+# Janelas, em dias, da contagem de usuários ativos (registraram alguma refeição)
+JANELAS_ATIVOS = (1, 7, 30)
+
+# Período padrão, em dias, das calorias médias por dieta
+DIAS_CALORIAS = 30
+
+# Quantis do IMC exibidos no painel
+QUANTIS_IMC = (0.1, 0.5, 0.9)
+
+# O histograma vai destes quantis do IMC; valores fora deles entram na primeira
+# ou na última barra, que ficam abertas (inicio ou fim None)
+LIMITES_HISTOGRAMA_IMC = (0.01, 0.99)
+
+# histograma_imc: tuplas (inicio, fim, quantidade), sem lacunas entre as barras
+# imc: dict com media e os quantis de QUANTIS_IMC ('p10', 'p50', 'p90')
+# dietas e faixas_imc: tuplas (nome, quantidade, fração dos usuários)
+# calorias_por_dieta: tuplas (dieta, dias_fechados, calorias_media, meta_media, fração da meta, aderência)
+# ativos: dict janela em dias -> usuários ativos
+Painel = namedtuple("Painel", "usuarios histograma_imc imc dietas faixas_imc calorias_por_dieta "
+                              "ativos dias gerado_em duracao")
+
+_cache = {}
+_trava = threading.Lock()
+_pool = None
+_trava_pool = threading.Lock()
+
+
+def _quantis_histograma(inicios, contagens, largura, quantis):
+    """Estima quantis pelo histograma, supondo os valores espalhados por igual dentro de cada barra"""
+    if np is not None:
+        inicios = np.asarray(inicios, dtype=float)
+        contagens = np.asarray(contagens, dtype=float)
+        acumulado = np.cumsum(contagens)
+        alvos = np.asarray(quantis) * acumulado[-1]
+        i = np.minimum(np.searchsorted(acumulado, alvos), len(acumulado) - 1)
+        antes = acumulado[i] - contagens[i]
+        return (inicios[i] + (alvos - antes) / contagens[i] * largura).tolist()
+
+    acumulado = list(itertools.accumulate(contagens))
+    resultado = []
+    for quantil in quantis:
+        alvo = quantil * acumulado[-1]
+        i = min(bisect.bisect_left(acumulado, alvo), len(acumulado) - 1)
+        antes = acumulado[i] - contagens[i]
+        resultado.append(inicios[i] + (alvo - antes) / contagens[i] * largura)
+    return resultado
+
+
+def _resumo_imc(largura):
+    """Histograma (sem lacunas), média e quantis do IMC, a partir da contagem por barra"""
+    linhas = RepositorioUsuarios.histograma_imc(largura)
+    if not linhas:
+        return [], {}
+
+    total = sum(quantidade for _, quantidade, _ in linhas)
+    imc = {"media": sum(soma for _, _, soma in linhas) / total}
+    quantis = _quantis_histograma([k * largura for k, _, _ in linhas], [quantidade for _, quantidade, _ in linhas],
+                                  largura, QUANTIS_IMC + LIMITES_HISTOGRAMA_IMC)
+    imc.update((f"p{round(quantil * 100)}", valor) for quantil, valor in zip(QUANTIS_IMC, quantis))
+
+    # Barras de k = primeira até k = ultima; o que estiver antes ou depois é somado nas pontas
+    primeira, ultima = (int(valor // largura) for valor in quantis[len(QUANTIS_IMC):])
+    quantidades = [0] * (ultima - primeira + 1)
+    for k, quantidade, _ in linhas:
+        quantidades[min(max(k, primeira), ultima) - primeira] += quantidade
+    histograma = [[k * largura, (k + 1) * largura, quantidade]
+                  for k, quantidade in zip(range(primeira, ultima + 1), quantidades)]
+    if linhas[0][0] < primeira:
+        histograma[0][0] = None
+    if linhas[-1][0] > ultima:
+        histograma[-1][1] = None
+    return [tuple(barra) for barra in histograma], imc
+
+
+def _distribuicoes():
+    """Usuários por dieta e por faixa de IMC, somados a partir de contagem_usuarios"""
+    por_dieta = {}
+    por_faixa = [0] * len(FAIXAS_IMC)
+    for dieta, _, faixa, quantidade in RepositorioUsuarios.contagem_por_grupo():
+        por_dieta[dieta] = por_dieta.get(dieta, 0) + quantidade
+        por_faixa[faixa] += quantidade
+
+    total = sum(por_faixa)
+    dietas = [(dieta, quantidade, quantidade / total if total else 0.0)
+              for dieta, quantidade in sorted(por_dieta.items(), key=lambda item: (-item[1], item[0]))]
+    faixas = [(nome, quantidade, quantidade / total if total else 0.0)
+              for (nome, _, _), quantidade in zip(FAIXAS_IMC, por_faixa)]
+    return total, dietas, faixas
+
+
+def _calorias_por_dieta(dias):
+    """Médias diárias de calorias e meta por dieta, nos dias fechados do período"""
+    resumo = []
+    for dieta, fechados, calorias, metas, dentro in RepositorioFechamentos.resumo_por_dieta(
+            intervalo_ultimos_dias(dias)):
+        resumo.append((dieta, fechados, calorias / fechados, metas / fechados,
+                       calorias / metas if metas else 0.0, dentro / fechados))
+    return sorted(resumo)
+
+
+def _ativos(janelas, hoje):
+    """Usuários com refeições registradas em cada janela (um único passe sobre o último dia de cada usuário)"""
+    ultimos = RepositorioTotaisDiarios.ultimos_dias_ativos(intervalo_ultimos_dias(max(janelas), hoje))
+    limites = [chave_dia(hoje - timedelta(days=janela - 1)) for janela in janelas]
+    if np is not None:
+        ultimos = np.sort(np.asarray(ultimos, dtype=np.int64))
+        antes = np.searchsorted(ultimos, limites).tolist()
+    else:
+        ultimos.sort()
+        antes = [bisect.bisect_left(ultimos, limite) for limite in limites]
+    return {janela: len(ultimos) - quantidade for janela, quantidade in zip(janelas, antes)}
+
+
+def _calcular(dias):
+    """Executa as consultas do painel e monta o resultado"""
+    inicio = time.perf_counter()
+    hoje = date.today()
+    usuarios, dietas, faixas = _distribuicoes()
+    histograma, imc = _resumo_imc(LARGURA_HISTOGRAMA_IMC)
+    return Painel(usuarios, histograma, imc, dietas, faixas, _calorias_por_dieta(dias),
+                  _ativos(JANELAS_ATIVOS, hoje), dias, datetime.now(), time.perf_counter() - inicio)
+
+
+def calcular_painel(dias=DIAS_CALORIAS, usar_cache=True):
+    """
+    Calcula o painel de análises da população
+
+    Um painel calculado há menos de TEMPO_CACHE segundos (para o mesmo banco,
+    período e dia) é devolvido sem consultar o banco. Chamadas simultâneas
+    esperam o mesmo cálculo em vez de repetir as consultas.
+
+    Args:
+        dias (int): Período, em dias, das calorias médias por dieta
+        usar_cache (bool): False força um novo cálculo
+
+    Returns:
+        Painel: Indicadores da população
+    """
+    chave = (gerenciador.caminho, dias, date.today())
+    with _trava:
+        guardado = _cache.get(chave)
+        if usar_cache and guardado and time.monotonic() < guardado[0]:
+            return guardado[1]
+        painel = _calcular(dias)
+        _cache.clear()
+        _cache[chave] = (time.monotonic() + TEMPO_CACHE, painel)
+        return painel
+
+
+def limpar_cache():
+    """Descarta o painel guardado; o próximo acesso consulta o banco"""
+    with _trava:
+        _cache.clear()
+
+
+def _executor():
+    """Thread que calcula o painel fora da interface (criada no primeiro uso)"""
+    global _pool
+    with _trava_pool:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(1, thread_name_prefix="analises")
+        return _pool
+
+
+def calcular_painel_async(dias=DIAS_CALORIAS, usar_cache=True):
+    """
+    Calcula o painel numa thread separada
+
+    Returns:
+        concurrent.futures.Future: Resultado de calcular_painel
+    """
+    return _executor().submit(calcular_painel, dias, usar_cache)
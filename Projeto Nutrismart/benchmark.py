@@ -0,0 +1,340 @@
+# Medições de desempenho do banco de dados
+# Uso: python benchmark.py perfis [--insercoes N] [--leituras N]
+#      python benchmark.py busca [--nomes N] [--consultas N]
+#      python benchmark.py nutrientes [--refeicoes N] [--alimentos N] [--usuarios N] [--dias N]
+#      python benchmark.py senhas [--alvo N] [--trabalhadores N] [--algoritmo scrypt|pbkdf2_sha256]
+#      python benchmark.py painel [--usuarios N] [--dias N]
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from database import PERFIS_ARMAZENAMENTO, gerenciador, preparar_banco
+from catalogo import Nutrientes
+import analises
+import credenciais
+from indice_nomes import IndiceNomes
+from nutrientes import MINIMO_NUMPY, np, somar_nutrientes
+from relatorios import METAS_POR_KG, meta_calorica, situacao_meta
+from repositorios import RepositorioAlimentos, RepositorioFechamentos, RepositorioRefeicoes, RepositorioUsuarios, chave_dia
+
+EMAIL_TESTE = "benchmark@nutrismart.com"
+
+
+def _preparar_banco(pasta, nome, perfil):
+    """Aponta o gerenciador para um banco novo dentro de 'pasta' e cria as tabelas"""
+    gerenciador.configurar(caminho=os.path.join(pasta, f"{nome}.db"), perfil=perfil)
+    preparar_banco()
+    RepositorioUsuarios.inserir(EMAIL_TESTE, "senha", 70, 1.75, "M", "Bulking", 22.86, "pergunta", "resposta")
+    RepositorioAlimentos.inserir("arroz", 130)
+
+
+def _percentil(valores, p):
+    """Retorna o percentil p (0-100) de uma lista de valores"""
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def benchmark_perfis(insercoes=2000, leituras=200):
+    """
+    Compara os perfis de armazenamento em vazão de inserção de refeições
+    (um commit por refeição, como em Comida.registrar_refeicao) e latência
+    de leitura da primeira página do histórico do usuário.
+
+    Returns:
+        dict: Resultados por perfil
+    """
+    resultados = {}
+    caminho_original, perfil_original = gerenciador.caminho, gerenciador.perfil
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            for nome in PERFIS_ARMAZENAMENTO:
+                _preparar_banco(pasta, nome, nome)
+
+                inicio = time.perf_counter()
+                for _ in range(insercoes):
+                    data = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    RepositorioRefeicoes.inserir(EMAIL_TESTE, "arroz", 100, 130, data)
+                duracao = time.perf_counter() - inicio
+
+                latencias = []
+                for _ in range(leituras):
+                    inicio = time.perf_counter()
+                    RepositorioRefeicoes.pagina(EMAIL_TESTE)
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+
+                resultados[nome] = {
+                    "insercoes_por_segundo": insercoes / duracao,
+                    "leitura_p50_ms": statistics.median(latencias),
+                    "leitura_p95_ms": _percentil(latencias, 95),
+                }
+                gerenciador.fechar()
+    finally:
+        gerenciador.configurar(caminho=caminho_original, perfil=perfil_original)
+
+    print(f"\n=== Perfis de armazenamento ({insercoes} inserções, {leituras} leituras) ===")
+    print(f"{'Perfil':<10} {'Inserções/s':>12} {'Leitura p50 (ms)':>18} {'Leitura p95 (ms)':>18}")
+    for nome, r in resultados.items():
+        print(f"{nome:<10} {r['insercoes_por_segundo']:>12.0f} {r['leitura_p50_ms']:>18.2f} {r['leitura_p95_ms']:>18.2f}")
+    return resultados
+
+
+def _nome_aleatorio(gerador):
+    """Gera um nome de alimento no formato da TACO ("palavra, palavra, palavra")"""
+    silabas = ["ba", "na", "ar", "roz", "fei", "jao", "ma", "ca", "ra", "to", "co", "zi", "do", "pe", "lo", "cru"]
+    palavras = ["".join(gerador.choices(silabas, k=gerador.randint(2, 4))) for _ in range(gerador.randint(1, 4))]
+    return ", ".join(palavras)
+
+
+def benchmark_busca(nomes=10000, consultas=1000):
+    """
+    Mede a construção do índice de nomes e a latência de autocompletar e de
+    sugestões por semelhança num catálogo sintético
+
+    Returns:
+        dict: Tempo de construção (ms) e latências p50/p95 (µs) de cada busca
+    """
+    gerador = random.Random(42)
+    catalogo = [_nome_aleatorio(gerador) for _ in range(nomes)]
+
+    inicio = time.perf_counter()
+    indice = IndiceNomes(catalogo)
+    construcao_ms = (time.perf_counter() - inicio) * 1000
+
+    def medir(funcao, textos):
+        latencias = []
+        for texto in textos:
+            inicio = time.perf_counter()
+            funcao(texto)
+            latencias.append((time.perf_counter() - inicio) * 1_000_000)
+        return statistics.median(latencias), _percentil(latencias, 95)
+
+    amostra = [gerador.choice(catalogo) for _ in range(consultas)]
+    prefixos = [nome[:gerador.randint(2, 6)] for nome in amostra]
+    # Um erro de digitação por nome: troca, remove ou repete uma letra
+    erros = []
+    for nome in amostra:
+        i = gerador.randrange(len(nome))
+        erros.append(gerador.choice([nome[:i] + "x" + nome[i + 1:], nome[:i] + nome[i + 1:], nome[:i] + nome[i:]]))
+
+    resultados = {
+        "construcao_ms": construcao_ms,
+        "autocompletar": medir(indice.autocompletar, prefixos),
+        "parecidos": medir(indice.parecidos, erros),
+    }
+
+    print(f"\n=== Índice de nomes ({len(indice)} nomes, {consultas} consultas) ===")
+    print(f"Construção: {construcao_ms:.0f} ms")
+    print(f"{'Busca':<14} {'p50 (µs)':>10} {'p95 (µs)':>10}")
+    for nome in ("autocompletar", "parecidos"):
+        p50, p95 = resultados[nome]
+        print(f"{nome:<14} {p50:>10.0f} {p95:>10.0f}")
+    return resultados
+
+
+def benchmark_nutrientes(refeicoes=1_000_000, alimentos=500, usuarios=1000, dias=30):
+    """
+    Compara a soma de nutrientes por usuário e dia com o laço em Python e com
+    o NumPy (se instalado), sobre refeições sintéticas geradas em memória
+
+    Returns:
+        dict: Segundos de cada implementação
+    """
+    gerador = random.Random(42)
+    tabela = {f"alimento {i}": Nutrientes(*(round(gerador.uniform(0, 400), 1) for _ in range(4)))
+              for i in range(alimentos)}
+    nomes = list(tabela)
+    grupos = [gerador.randrange(usuarios) * 100_000_000 + 20250101 + gerador.randrange(dias)
+              for _ in range(refeicoes)]
+    lista_alimentos = gerador.choices(nomes, k=refeicoes)
+    quantidades = [gerador.randint(10, 500) for _ in range(refeicoes)]
+
+    resultados = {}
+    implementacoes = [("python", False)] + ([("numpy", True)] if np is not None else [])
+    for nome, usar_numpy in implementacoes:
+        inicio = time.perf_counter()
+        totais = somar_nutrientes(grupos, lista_alimentos, quantidades, usar_numpy=usar_numpy, buscar=tabela.get)
+        resultados[nome] = time.perf_counter() - inicio
+
+    print(f"\n=== Soma de nutrientes ({refeicoes} refeições, {len(totais)} pares usuário/dia) ===")
+    print(f"{'Implementação':<14} {'Tempo (s)':>10} {'Refeições/s':>14}")
+    for nome, segundos in resultados.items():
+        print(f"{nome:<14} {segundos:>10.2f} {refeicoes / segundos:>14.0f}")
+    if np is None:
+        print("ℹ️ NumPy não está instalado; apenas o laço em Python foi medido.")
+    else:
+        padrao = "numpy" if refeicoes >= MINIMO_NUMPY else "python"
+        print(f"Padrão de somar_nutrientes para {refeicoes} refeições: {padrao} (nutrientes.MINIMO_NUMPY = {MINIMO_NUMPY})")
+    return resultados
+
+
+def benchmark_senhas(alvo=20, trabalhadores=None, algoritmo=None, amostras=5):
+    """
+    Mede o custo do hash de senha em vários níveis para escolher o
+    parâmetro de credenciais.PARAMETROS: latência de um login e logins por
+    segundo com o pool de 'trabalhadores' threads calculando ao mesmo tempo
+
+    Args:
+        alvo (float): Logins por segundo que o sistema precisa atender
+        trabalhadores (int, opcional): Threads do pool (padrão: credenciais.TRABALHADORES)
+        algoritmo (str, opcional): 'scrypt' ou 'pbkdf2_sha256' (padrão: credenciais.ALGORITMO)
+        amostras (int): Hashes por medição de latência
+
+    Returns:
+        dict: Resultados por custo e o custo recomendado (o maior que atende o alvo)
+    """
+    algoritmo = algoritmo or credenciais.ALGORITMO
+    trabalhadores = trabalhadores or credenciais.TRABALHADORES
+    if algoritmo == "scrypt":
+        niveis = [{"n": 2 ** expoente, "r": 8, "p": 1} for expoente in range(12, 18)]
+    else:
+        niveis = [{"iteracoes": iteracoes} for iteracoes in (100_000, 200_000, 400_000, 600_000, 1_000_000, 2_000_000)]
+
+    resultados = {}
+    recomendado = None
+    with ThreadPoolExecutor(trabalhadores) as pool:
+        for parametros in niveis:
+            custo = ", ".join(f"{chave}={valor}" for chave, valor in parametros.items())
+
+            latencias = []
+            for _ in range(amostras):
+                inicio = time.perf_counter()
+                credenciais.gerar_hash("senha de teste", algoritmo, parametros)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+
+            # Vários logins ao mesmo tempo, como no pool de credenciais
+            quantidade = trabalhadores * amostras
+            inicio = time.perf_counter()
+            list(pool.map(lambda _: credenciais.gerar_hash("senha de teste", algoritmo, parametros), range(quantidade)))
+            vazao = quantidade / (time.perf_counter() - inicio)
+
+            resultados[custo] = {"latencia_ms": statistics.median(latencias), "logins_por_segundo": vazao}
+            if vazao >= alvo:
+                recomendado = custo
+            else:
+                break  # Custos maiores só seriam mais lentos
+
+    print(f"\n=== Hash de senha ({algoritmo}, {trabalhadores} thread(s), alvo {alvo:g} logins/s) ===")
+    print(f"{'Custo':<22} {'Latência (ms)':>14} {'Logins/s':>10}")
+    for custo, r in resultados.items():
+        print(f"{custo:<22} {r['latencia_ms']:>14.1f} {r['logins_por_segundo']:>10.1f}")
+    if recomendado:
+        print(f"✅ Custo recomendado: {recomendado} (configure em credenciais.PARAMETROS)")
+    else:
+        print("⚠️ Nenhum custo testado atinge o alvo; aumente os trabalhadores ou reduza o alvo.")
+    return {"resultados": resultados, "recomendado": recomendado}
+
+
+def benchmark_painel(usuarios=100_000, dias=30, lote=10_000):
+    """
+    Mede o painel da população (analises.calcular_painel) num banco
+    sintético: 'usuarios' usuários, cada um com refeições em cerca de 70% dos
+    últimos 'dias' dias, e os dias anteriores a hoje já fechados
+
+    Os totais diários são gravados direto em totais_diarios (o que os gatilhos
+    de refeicoes gravariam), para que gerar o banco não domine a medição.
+
+    Returns:
+        dict: Segundos do cálculo sem cache e com cache
+    """
+    gerador = random.Random(42)
+    dietas = list(METAS_POR_KG)
+    hoje = date.today()
+    chaves = [chave_dia(hoje - timedelta(days=i)) for i in range(dias)]
+    fechado_em = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    caminho_original, perfil_original = gerenciador.caminho, gerenciador.perfil
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            _preparar_banco(pasta, "painel", "rapido")
+            inicio = time.perf_counter()
+            for primeiro in range(0, usuarios, lote):
+                cadastros, totais, fechamentos = [], [], []
+                for i in range(primeiro, min(primeiro + lote, usuarios)):
+                    email = f"usuario{i}@nutrismart.com"
+                    peso, altura = round(gerador.uniform(45, 130), 1), round(gerador.uniform(1.5, 2.0), 2)
+                    dieta = gerador.choice(dietas)
+                    cadastros.append((email, credenciais.SENHA_BLOQUEADA, peso, altura, gerador.choice("MF"), dieta,
+                                      round(peso / altura ** 2, 2), "pergunta", "resposta"))
+                    meta = meta_calorica(dieta, peso)
+                    for chave in chaves:
+                        if gerador.random() < 0.7:
+                            calorias = meta * gerador.uniform(0.7, 1.3)
+                            totais.append((email, chave, calorias))
+                            if chave != chaves[0]:
+                                fechamentos.append((email, chave, dieta, meta, calorias, 0, 0, 0, 3,
+                                                    situacao_meta(calorias, meta), fechado_em))
+                RepositorioUsuarios.salvar_varios(cadastros, credenciais.SENHA_BLOQUEADA)
+                RepositorioFechamentos.salvar_varios(fechamentos)
+                with gerenciador.transacao() as conexao:
+                    conexao.executemany('''
+                        INSERT INTO totais_diarios (email_usuario, dia, calorias, quantidade_refeicoes)
+                        VALUES (?, ?, ?, 3)
+                    ''', totais)
+            geracao = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            painel = analises.calcular_painel(dias, usar_cache=False)
+            sem_cache = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            analises.calcular_painel(dias)
+            com_cache = time.perf_counter() - inicio
+            analises.limpar_cache()
+            gerenciador.fechar()
+    finally:
+        gerenciador.configurar(caminho=caminho_original, perfil=perfil_original)
+
+    print(f"\n=== Painel da população ({painel.usuarios} usuários, {dias} dias, banco gerado em {geracao:.0f}s) ===")
+    print(f"Sem cache: {sem_cache * 1000:.0f} ms | Com cache: {com_cache * 1000:.3f} ms")
+    print(f"Ativos: {painel.ativos}")
+    if np is None:
+        print("ℹ️ NumPy não está instalado; o pós-processamento usou Python puro.")
+    return {"sem_cache": sem_cache, "com_cache": com_cache}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do Nutrismart")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    perfis = subparsers.add_parser("perfis", help="Compara os perfis de armazenamento do SQLite")
+    perfis.add_argument("--insercoes", type=int, default=2000)
+    perfis.add_argument("--leituras", type=int, default=200)
+
+    busca = subparsers.add_parser("busca", help="Mede o autocompletar e as sugestões de nomes de alimentos")
+    busca.add_argument("--nomes", type=int, default=10000)
+    busca.add_argument("--consultas", type=int, default=1000)
+
+    nutrientes = subparsers.add_parser("nutrientes", help="Compara a soma de nutrientes em Python e com NumPy")
+    nutrientes.add_argument("--refeicoes", type=int, default=1_000_000)
+    nutrientes.add_argument("--alimentos", type=int, default=500)
+    nutrientes.add_argument("--usuarios", type=int, default=1000)
+    nutrientes.add_argument("--dias", type=int, default=30)
+
+    senhas = subparsers.add_parser("senhas", help="Mede o custo do hash de senha para escolher o parâmetro")
+    senhas.add_argument("--alvo", type=float, default=20, help="Logins por segundo necessários")
+    senhas.add_argument("--trabalhadores", type=int, default=None)
+    senhas.add_argument("--algoritmo", choices=list(credenciais.PARAMETROS), default=None)
+
+    painel = subparsers.add_parser("painel", help="Mede o painel da população num banco sintético")
+    painel.add_argument("--usuarios", type=int, default=100_000)
+    painel.add_argument("--dias", type=int, default=30)
+
+    args = parser.parse_args()
+    if args.comando == "perfis":
+        benchmark_perfis(args.insercoes, args.leituras)
+    elif args.comando == "busca":
+        benchmark_busca(args.nomes, args.consultas)
+    elif args.comando == "nutrientes":
+        benchmark_nutrientes(args.refeicoes, args.alimentos, args.usuarios, args.dias)
+    elif args.comando == "senhas":
+        benchmark_senhas(args.alvo, args.trabalhadores, args.algoritmo)
+    elif args.comando == "painel":
+        benchmark_painel(args.usuarios, args.dias)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# Cache em memória do catálogo de alimentos
+# A tabela de alimentos é pequena e muda pouco, mas é lida a cada refeição
+# registrada e em várias telas. O catálogo é carregado uma vez por processo;
+# as alterações feitas por aqui atualizam a cópia em memória na hora, e as
+# feitas por outros processos são percebidas por PRAGMA data_version.
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from database import gerenciador
+from indice_nomes import IndiceNomes
+from repositorios import RepositorioAlimentos
+
+# Valores por 100g de um alimento
+Nutrientes = namedtuple("Nutrientes", "calorias proteinas carboidratos gorduras")
+
+# Intervalo mínimo (segundos) entre verificações de alterações feitas por outros processos
+INTERVALO_VERIFICACAO = 1.0
+
+
+class CatalogoAlimentos:
+    """
+    Cópia em memória da tabela de alimentos, compartilhada por todo o processo
+
+    As consultas não acessam o banco: no máximo uma vez por
+    INTERVALO_VERIFICACAO segundos o catálogo lê PRAGMA data_version numa
+    conexão própria. Se algum commit aconteceu desde a última leitura, compara
+    o contador revisao_catalogo e só recarrega se a tabela de alimentos mudou.
+    """
+
+    def __init__(self, intervalo_verificacao=INTERVALO_VERIFICACAO):
+        """
+        Inicializa o catálogo vazio; a carga acontece na primeira consulta
+
+        Args:
+            intervalo_verificacao (float): Segundos entre verificações de alterações externas
+        """
+        self.intervalo_verificacao = intervalo_verificacao
+        self._alimentos = None
+        self._revisao = None
+        self._caminho = None
+        self._sentinela = None
+        self._versao_dados = None
+        self._proxima_verificacao = 0.0
+        self._indice = None
+        self._indexados = None
+        self._trava = threading.RLock()
+
+    def _carregar(self):
+        """Lê a tabela de alimentos inteira (a revisão é lida antes, para nunca ficar adiantada)"""
+        self._revisao = RepositorioAlimentos.revisao()
+        self._alimentos = {nome: Nutrientes(calorias, proteinas or 0, carboidratos or 0, gorduras or 0)
+                           for nome, calorias, proteinas, carboidratos, gorduras
+                           in RepositorioAlimentos.listar_nutrientes()}
+
+    def _dados(self):
+        """Retorna o dicionário nome -> Nutrientes, carregando ou recarregando se necessário"""
+        agora = time.monotonic()
+        if (self._alimentos is not None and agora < self._proxima_verificacao
+                and self._caminho == gerenciador.caminho):
+            return self._alimentos
+
+        with self._trava:
+            if self._caminho != gerenciador.caminho:
+                self.invalidar()
+                if self._sentinela is not None:
+                    self._sentinela.close()
+                self._caminho = gerenciador.caminho
+                # Conexão usada só para PRAGMA data_version, que muda quando
+                # qualquer outra conexão faz commit no banco
+                self._sentinela = sqlite3.connect(self._caminho, check_same_thread=False)
+
+            versao_dados = self._sentinela.execute("PRAGMA data_version").fetchone()[0]
+            if self._alimentos is None:
+                self._carregar()
+            elif versao_dados != self._versao_dados and RepositorioAlimentos.revisao() != self._revisao:
+                self._carregar()
+            self._versao_dados = versao_dados
+            self._proxima_verificacao = agora + self.intervalo_verificacao
+            return self._alimentos
+
+    def invalidar(self):
+        """Descarta a cópia em memória; a próxima consulta recarrega do banco"""
+        with self._trava:
+            self._alimentos = None
+            self._revisao = None
+
+    # --- Consultas --- #
+
+    def buscar(self, nome):
+        """
+        Busca os valores nutricionais de um alimento
+
+        Returns:
+            Nutrientes: Valores por 100g, ou None se o alimento não estiver cadastrado
+        """
+        return self._dados().get(nome)
+
+    def calorias(self, nome):
+        """Retorna as calorias por 100g do alimento, ou None se não estiver cadastrado"""
+        nutrientes = self._dados().get(nome)
+        return nutrientes.calorias if nutrientes else None
+
+    def existe(self, nome):
+        """Indica se o alimento está cadastrado"""
+        return nome in self._dados()
+
+    def listar(self):
+        """
+        Lista todos os alimentos cadastrados
+
+        Returns:
+            list: Tuplas (nome, calorias) ordenadas por nome
+        """
+        return sorted((nome, n.calorias) for nome, n in self._dados().items())
+
+    def nomes(self):
+        """Retorna os nomes de todos os alimentos cadastrados"""
+        return list(self._dados())
+
+    def _indice_nomes(self):
+        """Retorna o índice de nomes, reconstruído quando a cópia em memória muda"""
+        alimentos = self._dados()
+        if self._indexados is not alimentos:
+            with self._trava:
+                if self._indexados is not alimentos:
+                    self._indice = IndiceNomes(alimentos)
+                    self._indexados = alimentos
+        return self._indice
+
+    def autocompletar(self, prefixo, limite=10):
+        """Lista os alimentos cujo nome (ou uma palavra do nome) começa pelo prefixo, ver IndiceNomes"""
+        return self._indice_nomes().autocompletar(prefixo, limite)
+
+    def sugerir(self, nome, limite=5):
+        """Sugere alimentos cadastrados com nome parecido ("você quis dizer"), ver IndiceNomes"""
+        return self._indice_nomes().parecidos(nome, limite)
+
+    def mensagem_nao_cadastrado(self, nome):
+        """Mensagem de alimento não cadastrado, com as sugestões de nomes parecidos"""
+        sugestoes = self.sugerir(nome, 3)
+        if not sugestoes:
+            return "Alimento não cadastrado"
+        return f"Alimento não cadastrado. Você quis dizer: {', '.join(sugestoes)}?"
+
+    # --- Alterações (gravam no banco e atualizam a cópia em memória) --- #
+
+    def inserir(self, nome, calorias):
+        """Cadastra um novo alimento com suas calorias por 100g"""
+        self._gravar(lambda: RepositorioAlimentos.inserir(nome, calorias), {nome: Nutrientes(calorias, 0, 0, 0)})
+
+    def salvar_varios(self, alimentos):
+        """
+        Insere ou atualiza vários alimentos numa única transação
+
+        Args:
+            alimentos (list): Tuplas (nome, calorias, proteinas, carboidratos, gorduras)
+        """
+        self._gravar(lambda: RepositorioAlimentos.salvar_varios(alimentos),
+                     {nome: Nutrientes(*valores) for nome, *valores in alimentos})
+
+    def excluir(self, nome):
+        """Remove um alimento do catálogo"""
+        self._gravar(lambda: RepositorioAlimentos.excluir(nome), excluidos=[nome])
+
+    def _gravar(self, gravar, alterados=None, excluidos=()):
+        """
+        Grava uma alteração no banco e a aplica à cópia em memória depois do commit
+
+        Dentro de uma transação maior (ex.: recalculo.atualizar_alimentos), a cópia
+        só muda depois do commit da externa; se ela for desfeita, nada muda. A
+        revisão do catálogo é lida antes e depois da gravação, na mesma transação,
+        para que a cópia atualizada não seja recarregada sem necessidade.
+        """
+        with gerenciador.transacao(imediata=True):
+            antes = RepositorioAlimentos.revisao()
+            gravar()
+            depois = RepositorioAlimentos.revisao()
+            gerenciador.apos_commit(lambda: self._atualizar(antes, depois, alterados or {}, excluidos))
+
+    def _atualizar(self, antes, depois, alterados, excluidos):
+        """Aplica à cópia em memória uma alteração que levou a revisão de 'antes' para 'depois'"""
+        with self._trava:
+            if self._alimentos is None or self._caminho != gerenciador.caminho:
+                return
+            if self._revisao != antes:
+                # A cópia já estava atrás do banco (alteração de outro processo ainda não percebida)
+                self.invalidar()
+                return
+
+            versao_dados = self._sentinela.execute("PRAGMA data_version").fetchone()[0]
+            if RepositorioAlimentos.revisao() != depois:
+                # Outro processo alterou os alimentos logo depois deste commit
+                self.invalidar()
+                return
+            alimentos = {**self._alimentos, **alterados}
+            for nome in excluidos:
+                alimentos.pop(nome, None)
+            self._alimentos = alimentos
+            self._revisao = depois
+            self._versao_dados = versao_dados
+
+
+# Catálogo compartilhado por todo o sistema
+catalogo = CatalogoAlimentos()
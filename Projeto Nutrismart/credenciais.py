@@ -0,0 +1,172 @@
+# Senhas dos usuários: hash com função de derivação de chave (scrypt, ou
+# PBKDF2 se o Python não tiver scrypt) e sal aleatório por usuário.
+# Calcular o hash custa de propósito dezenas de milissegundos; por isso ele
+# roda num pool de threads (hashlib libera o GIL durante o cálculo), e a
+# interface espera o resultado sem travar a janela. Senhas gravadas em texto
+# puro (cadastros antigos) continuam aceitas e são trocadas pelo hash no
+# primeiro login; o mesmo acontece quando o custo configurado aumenta.
+# Para escolher o custo: python benchmark.py senhas --alvo <logins por segundo>
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from repositorios import RepositorioUsuarios
+
+# Parâmetros de custo de cada algoritmo (o hash gravado guarda os usados nele)
+PARAMETROS = {
+    "scrypt": {"n": 2 ** 14, "r": 8, "p": 1},
+    "pbkdf2_sha256": {"iteracoes": 600_000},
+}
+ALGORITMO = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+
+# Threads que calculam hashes ao mesmo tempo
+TRABALHADORES = os.cpu_count() or 1
+
+# Senha de quem ainda não definiu uma (ex.: importado sem senha): nenhum login
+# confere até o usuário definir a senha pela recuperação. Tem um '$' mas não começa
+# por um algoritmo de PARAMETROS, então não passa por hash nem por uma senha curta
+# em texto puro de cadastros antigos (como '!')
+SENHA_BLOQUEADA = "bloqueada$"
+
+TAMANHO_SAL = 16
+TAMANHO_HASH = 32
+
+# Sal das derivações feitas só para gastar o tempo de uma verificação de verdade
+_SAL_FICTICIO = secrets.token_bytes(TAMANHO_SAL)
+
+_pool = None
+_trava_pool = threading.Lock()
+
+
+def _derivar(senha, sal, algoritmo, parametros):
+    """Calcula a chave derivada da senha"""
+    if algoritmo == "scrypt":
+        n, r, p = parametros["n"], parametros["r"], parametros["p"]
+        # maxmem folgado: o scrypt usa cerca de 128 * n * r bytes
+        return hashlib.scrypt(senha.encode(), salt=sal, n=n, r=r, p=p,
+                              maxmem=256 * n * r + 1024 * 1024, dklen=TAMANHO_HASH)
+    if algoritmo == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", senha.encode(), sal, parametros["iteracoes"], TAMANHO_HASH)
+    raise ValueError(f"Algoritmo de senha desconhecido: {algoritmo}")
+
+
+def gerar_hash(senha, algoritmo=None, parametros=None):
+    """
+    Calcula o hash de uma senha para gravar no banco
+
+    Args:
+        senha (str): Senha em texto puro
+        algoritmo (str, opcional): 'scrypt' ou 'pbkdf2_sha256' (padrão: ALGORITMO)
+        parametros (dict, opcional): Custo do algoritmo (padrão: PARAMETROS[algoritmo])
+
+    Returns:
+        str: 'algoritmo$parametros$sal$hash', ex.: 'scrypt$16384$8$1$<sal>$<hash>'
+    """
+    algoritmo = algoritmo or ALGORITMO
+    parametros = parametros or PARAMETROS[algoritmo]
+    sal = secrets.token_bytes(TAMANHO_SAL)
+    chave = _derivar(senha, sal, algoritmo, parametros)
+    return "$".join([algoritmo, *(str(v) for v in parametros.values()), sal.hex(), chave.hex()])
+
+
+def _decodificar(armazenado):
+    """Separa um hash gravado em (algoritmo, parametros, sal, chave); None se for uma senha em texto puro"""
+    partes = armazenado.split("$")
+    algoritmo = partes[0]
+    if algoritmo not in PARAMETROS or len(partes) != len(PARAMETROS[algoritmo]) + 3:
+        return None
+    try:
+        parametros = dict(zip(PARAMETROS[algoritmo], (int(v) for v in partes[1:-2])))
+        return algoritmo, parametros, bytes.fromhex(partes[-2]), bytes.fromhex(partes[-1])
+    except ValueError:
+        return None
+
+
+def e_hash(valor):
+    """Indica se o valor já é um hash no formato de gerar_hash (ex.: senhas importadas de outro sistema)"""
+    return _decodificar(valor) is not None
+
+
+def verificar_senha(senha, armazenado):
+    """
+    Confere uma senha com o que está gravado no banco
+
+    Args:
+        senha (str): Senha digitada
+        armazenado (str): Hash gravado (ou senha em texto puro de cadastros antigos)
+
+    Returns:
+        tuple: (bool, bool) Se a senha confere e se o valor gravado deve ser
+            trocado por um hash novo (texto puro ou custo diferente do atual)
+    """
+    if armazenado == SENHA_BLOQUEADA:
+        return False, False
+
+    decodificado = _decodificar(armazenado)
+    if decodificado is None:
+        return hmac.compare_digest(senha.encode(), armazenado.encode()), True
+
+    algoritmo, parametros, sal, chave = decodificado
+    confere = hmac.compare_digest(_derivar(senha, sal, algoritmo, parametros), chave)
+    return confere, algoritmo != ALGORITMO or parametros != PARAMETROS[algoritmo]
+
+
+def _executor():
+    """Pool de threads compartilhado pelos cálculos de hash (criado no primeiro uso)"""
+    global _pool
+    with _trava_pool:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(TRABALHADORES, thread_name_prefix="credenciais")
+        return _pool
+
+
+def _autenticar(email, senha):
+    """Confere a senha do usuário e, se preciso, grava o hash atualizado"""
+    armazenado = RepositorioUsuarios.buscar_senha(email)
+    if armazenado is None:
+        # Mesmo custo de um login com senha errada, para o tempo de resposta não revelar quais e-mails existem
+        _derivar(senha, _SAL_FICTICIO, ALGORITMO, PARAMETROS[ALGORITMO])
+        return False
+    confere, atualizar = verificar_senha(senha, armazenado)
+    if confere and atualizar:
+        # Só troca se ninguém alterou a senha enquanto isso
+        RepositorioUsuarios.atualizar_senha(email, gerar_hash(senha), anterior=armazenado)
+    return confere
+
+
+def autenticar_async(email, senha):
+    """
+    Confere a senha do usuário no pool de threads
+
+    Returns:
+        concurrent.futures.Future: Resultado True se o e-mail existe e a senha confere
+    """
+    return _executor().submit(_autenticar, email, senha)
+
+
+def autenticar(email, senha):
+    """Confere a senha do usuário, esperando o resultado (ver autenticar_async)"""
+    return autenticar_async(email, senha).result()
+
+
+def gerar_hash_async(senha):
+    """
+    Calcula o hash de uma senha no pool de threads
+
+    Returns:
+        concurrent.futures.Future: Resultado de gerar_hash
+    """
+    return _executor().submit(gerar_hash, senha)
+
+
+def gerar_hashes(senhas):
+    """
+    Calcula o hash de várias senhas, dividindo o trabalho entre as threads do pool
+
+    Returns:
+        list: Resultados de gerar_hash, na mesma ordem das senhas
+    """
+    return list(_executor().map(gerar_hash, senhas))
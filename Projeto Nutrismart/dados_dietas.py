@@ -0,0 +1,40 @@
+# Regras iniciais de recomendação: alimentos indicados para cada dieta
+# Carregadas na tabela dietas_alimentos pela migração 6 de database.py; os
+# nomes seguem o padrão do catálogo (minúsculos). Alimentos que não estiverem
+# cadastrados em alimentos não são recomendados (ver manutencao.py verificar-dietas).
+
+REGRAS_DIETAS = {
+    "Low carb": [
+        "ovos", "abacate", "peixes", "nozes", "couve-flor", "espinafre", "brócolis", "azeite de oliva", "amêndoas",
+        "queijo", "cogumelos", "carne bovina", "salmão", "aspargos", "alface", "cenoura", "tomate", "pepino",
+        "pimentão", "berinjela", "abobrinha", "castanha-do-pará", "aipo", "azeitona", "sementes de chia",
+        "sementes de linhaça", "coco", "framboesa", "morango", "repolho", "alcachofra", "cebola", "alho", "rúcula",
+        "manjericão", "salsinha", "endívia", "alcaparras", "pimenta", "ervilha-torta", "limão", "laranja",
+        "carne de porco", "frango", "iogurte natural", "ricota", "chá verde", "água com gás", "vinagre de maçã",
+        "café"
+    ],
+    "Cetogênica": [
+        "bacon", "queijo cheddar", "carne de cordeiro", "manteiga", "nata", "óleo de coco", "salmão selvagem",
+        "ovos caipiras", "espinafre", "couve", "brócolis", "couve-flor", "abacate", "nozes", "castanhas",
+        "sementes de abóbora", "azeitonas", "chá de hortelã", "café sem açúcar", "queijo parmesão",
+        "frango caipira", "carne moída", "camarão", "atum", "aspargos", "abobrinha", "cogumelos", "alho", "cebola",
+        "pimenta", "ervas frescas", "alface", "rúcula", "salsa", "manjericão", "nata fresca", "creme de leite",
+        "óleo mct", "chá de camomila", "queijo mozzarella", "carne bovina", "carne de porco", "peixes gordurosos",
+        "sementes de chia", "sementes de linhaça", "limão", "vinagre de maçã", "água mineral"
+    ],
+    "Hiperproteica": [
+        "peito de frango", "clara de ovo", "carne magra", "peixes", "queijo cottage", "iogurte grego", "atum",
+        "carne bovina magra", "salmão", "ovos inteiros", "tofu", "tempeh", "lentilhas", "feijão", "quinoa",
+        "amêndoas", "nozes", "sementes de abóbora", "camarão", "proteína isolada", "leite desnatado", "ricota",
+        "brócolis", "couve-flor", "espinafre", "cenoura", "abobrinha", "alface", "tomate", "pepino", "pimentão",
+        "azeite de oliva", "chá verde", "água"
+    ],
+    "Bulking": [
+        "arroz integral", "batata doce", "aveia", "massas integrais", "carne vermelha", "peito de frango", "ovos",
+        "salmão", "atum", "quinoa", "feijão", "grão-de-bico", "lentilha", "leite integral", "iogurte natural",
+        "queijo", "nozes", "amêndoas", "castanha-do-pará", "abacate", "banana", "morangos", "espinafre", "brócolis",
+        "cenoura", "abobrinha", "tomate", "pepino", "pimentão", "azeite de oliva", "manteiga de amendoim",
+        "chá verde", "água", "mel", "chocolate amargo", "batata inglesa", "milho", "pão integral",
+        "sementes de chia", "sementes de linhaça", "ervilha"
+    ],
+}
@@ -1,9 +1,259 @@
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
-# Conexão com banco SQLite
-conn = sqlite3.connect('nutricao.db')
-cursor = conn.cursor()
+from dados_dietas import REGRAS_DIETAS
+
+# Caminho do banco SQLite
+CAMINHO_BANCO = 'nutricao.db'
+
+# Perfis de armazenamento aplicados a cada conexão aberta.
+# - duravel: cada commit é sincronizado em disco (padrão do sistema)
+# - rapido: sincroniza só nos checkpoints do WAL; um commit pode se perder
+#   numa queda de energia, mas o banco nunca fica corrompido
+PERFIS_ARMAZENAMENTO = {
+    "duravel": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,        # ~8 MB
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,       # ms
+    },
+    "rapido": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,       # ~64 MB
+        "mmap_size": 268435456,     # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,       # ms
+    },
+}
+PERFIL_PADRAO = "duravel"
+
+
+def aplicar_perfil(conexao, perfil):
+    """
+    Aplica os PRAGMAs de um perfil de armazenamento a uma conexão
+
+    Args:
+        conexao (sqlite3.Connection): Conexão recém-aberta
+        perfil (str | dict): Nome de um perfil em PERFIS_ARMAZENAMENTO ou dicionário de PRAGMAs
+
+    Raises:
+        ValueError: Se o nome do perfil não existir
+    """
+    if isinstance(perfil, str):
+        if perfil not in PERFIS_ARMAZENAMENTO:
+            raise ValueError(f"Perfil de armazenamento desconhecido: {perfil}")
+        perfil = PERFIS_ARMAZENAMENTO[perfil]
+
+    for pragma, valor in perfil.items():
+        conexao.execute(f"PRAGMA {pragma} = {valor}")
+
+
+class GerenciadorConexoes:
+    """
+    Gerencia um pequeno pool de conexões SQLite compartilhado entre threads.
+
+    Cada thread recebe sua própria conexão enquanto estiver usando o banco, de
+    modo que leituras e escritas de threads diferentes não compartilham cursor
+    nem resultado. Chamadas aninhadas na mesma thread reaproveitam a conexão já
+    emprestada.
+    """
+
+    def __init__(self, caminho, tamanho_pool=5, timeout=30, perfil=PERFIL_PADRAO):
+        """
+        Inicializa o gerenciador
+
+        Args:
+            caminho (str): Caminho do arquivo do banco de dados
+            tamanho_pool (int): Número máximo de conexões mantidas abertas
+            timeout (float): Tempo máximo (segundos) de espera por uma conexão livre
+            perfil (str | dict): Perfil de armazenamento aplicado a cada conexão
+        """
+        self.caminho = caminho
+        self.perfil = perfil
+        self.tamanho_pool = tamanho_pool
+        self.timeout = timeout
+        self._livres = queue.LifoQueue()
+        self._criadas = 0
+        self._trava = threading.Lock()
+        self._local = threading.local()
+
+    def _nova_conexao(self):
+        """Abre uma nova conexão com o banco já com o perfil de armazenamento aplicado"""
+        conexao = sqlite3.connect(self.caminho, timeout=self.timeout, check_same_thread=False)
+        try:
+            aplicar_perfil(conexao, self.perfil)
+        except Exception:
+            conexao.close()
+            raise
+        return conexao
+
+    def _obter(self):
+        """Retira uma conexão livre do pool, criando uma nova se houver espaço"""
+        try:
+            return self._livres.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._trava:
+            if self._criadas < self.tamanho_pool:
+                self._criadas += 1
+                criar = True
+            else:
+                criar = False
+
+        if criar:
+            try:
+                return self._nova_conexao()
+            except Exception:
+                with self._trava:
+                    self._criadas -= 1
+                raise
+
+        try:
+            return self._livres.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError("Nenhuma conexão livre com o banco de dados")
+
+    def _devolver(self, conexao):
+        """Devolve uma conexão ao pool, descartando transações pendentes"""
+        if conexao.in_transaction:
+            conexao.rollback()
+        self._livres.put(conexao)
+
+    @contextmanager
+    def conexao(self):
+        """
+        Empresta a conexão da thread atual
+
+        Yields:
+            sqlite3.Connection: Conexão exclusiva da thread enquanto o bloco durar
+        """
+        atual = getattr(self._local, 'conexao', None)
+        if atual is not None:
+            yield atual
+            return
+
+        conexao = self._obter()
+        self._local.conexao = conexao
+        try:
+            yield conexao
+        finally:
+            self._local.conexao = None
+            self._devolver(conexao)
+
+    @contextmanager
+    def transacao(self, imediata=False):
+        """
+        Abre uma transação: faz commit ao final do bloco ou rollback em caso de erro
+
+        Transações aninhadas na mesma thread fazem parte da transação externa.
+        As funções agendadas com apos_commit rodam depois do commit da externa.
+
+        Args:
+            imediata (bool): Reserva a escrita já no início (BEGIN IMMEDIATE), para que
+                nada do que o bloco ler mude em outra conexão antes das gravações
+
+        Yields:
+            sqlite3.Connection: Conexão da thread atual
+        """
+        with self.conexao() as conexao:
+            if getattr(self._local, 'em_transacao', False):
+                yield conexao
+                return
+
+            self._local.em_transacao = True
+            self._local.apos_commit = []
+            try:
+                if imediata:
+                    conexao.execute("BEGIN IMMEDIATE")
+                yield conexao
+                conexao.commit()
+            except BaseException:
+                conexao.rollback()
+                raise
+            finally:
+                self._local.em_transacao = False
+                pendentes, self._local.apos_commit = self._local.apos_commit, []
+
+        for funcao in pendentes:
+            funcao()
+
+    def apos_commit(self, funcao):
+        """
+        Agenda uma função para depois do commit da transação em andamento na thread
+
+        Serve para atualizar cópias em memória (ex.: o catálogo) só com dados
+        que foram de fato gravados: se a transação for desfeita, a função não é
+        chamada. Fora de uma transação, é chamada na hora.
+
+        Args:
+            funcao (callable): Chamada sem argumentos
+        """
+        if getattr(self._local, 'em_transacao', False):
+            self._local.apos_commit.append(funcao)
+        else:
+            funcao()
+
+    def fechar(self):
+        """Fecha todas as conexões livres do pool"""
+        while True:
+            try:
+                conexao = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            conexao.close()
+            with self._trava:
+                self._criadas -= 1
+
+    def configurar(self, caminho=None, perfil=None):
+        """
+        Troca o arquivo do banco e/ou o perfil de armazenamento
+
+        As conexões livres são fechadas; as próximas já usam a nova configuração.
+
+        Args:
+            caminho (str, opcional): Novo caminho do banco de dados
+            perfil (str | dict, opcional): Novo perfil de armazenamento
+        """
+        if perfil is not None and isinstance(perfil, str) and perfil not in PERFIS_ARMAZENAMENTO:
+            raise ValueError(f"Perfil de armazenamento desconhecido: {perfil}")
+        self.fechar()
+        if caminho is not None:
+            self.caminho = caminho
+        if perfil is not None:
+            self.perfil = perfil
+
+
+# Gerenciador compartilhado por todo o sistema
+gerenciador = GerenciadorConexoes(CAMINHO_BANCO)
+
+# Chave numérica do dia (AAAAMMDD) derivada de refeicoes.data ('AAAA-MM-DD HH:MM:SS').
+# Comparar faixas dessa coluna indexada evita aplicar date() sobre cada linha.
+EXPRESSAO_DIA = "CAST(replace(substr(data, 1, 10), '-', '') AS INTEGER)"
+
+# Faixas de IMC (classificação da OMS) usadas nos filtros e na contagem de
+# usuários: (nome, IMC mínimo, IMC máximo exclusivo); o número da faixa é a posição na lista
+FAIXAS_IMC = [
+    ("Abaixo do peso", None, 18.5),
+    ("Normal", 18.5, 25),
+    ("Sobrepeso", 25, 30),
+    ("Obesidade", 30, None),
+]
+
+
+def expressao_faixa_imc(coluna):
+    """Expressão SQL com o número da faixa de IMC (ver FAIXAS_IMC) do valor da coluna"""
+    casos = " ".join(f"WHEN {coluna} < {maximo} THEN {i}"
+                     for i, (_, _, maximo) in enumerate(FAIXAS_IMC) if maximo is not None)
+    return f"CASE {casos} ELSE {len(FAIXAS_IMC) - 1} END"
+
 
 def criar_tabelas():
     """
@@ -13,111 +263,709 @@ def criar_tabelas():
     - usuarios: Armazena informações dos usuários
     - alimentos: Armazena dados nutricionais dos alimentos
     - refeicoes: Registra as refeições dos usuários
-    - registro_refeicoes: Tabela legada mantida para compatibilidade
     - suporte: Armazena mensagens de suporte
+    - totais_diarios: Totais de cada usuário por dia, mantidos por gatilhos
+    - consumo_alimentos: Gramas consumidas de cada alimento por usuário, mantidas por gatilhos
     
     A função não retorna valores, mas faz commit das alterações no banco.
     """
-    # Tabela de usuários
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usuarios (
-            email TEXT PRIMARY KEY,
-            senha TEXT NOT NULL,
-            peso REAL NOT NULL,
-            altura REAL NOT NULL,
-            sexo TEXT NOT NULL,
-            dieta TEXT NOT NULL,
-            imc REAL NOT NULL,
-            pergunta_seguranca TEXT NOT NULL,
-            resposta_seguranca TEXT NOT NULL
-        )
-    ''')
-
-    # Tabela de alimentos
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS alimentos (
-            nome TEXT PRIMARY KEY,
-            calorias REAL NOT NULL,
-            proteinas REAL DEFAULT 0,
-            carboidratos REAL DEFAULT 0,
-            gorduras REAL DEFAULT 0
-        )
-    ''')
-
-    # Tabela de refeições (ATUALIZADA)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS refeicoes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email_usuario TEXT NOT NULL,
-            alimento TEXT NOT NULL,
-            quantidade_gramas REAL NOT NULL,
-            calorias REAL NOT NULL,  -- COLUNA ADICIONADA
-            data TEXT NOT NULL,
-            FOREIGN KEY (email_usuario) REFERENCES usuarios(email),
-            FOREIGN KEY (alimento) REFERENCES alimentos(nome)
-        )
-    ''')
-
-    # Tabela de registro de refeições (mantida para compatibilidade)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS registro_refeicoes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT NOT NULL,
-            refeicao TEXT NOT NULL,
-            calorias INTEGER,
-            data TEXT NOT NULL
-        )
-    ''')
-
-    # Tabela de suporte
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS suporte (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT NOT NULL,
-            mensagem TEXT NOT NULL,
-            resposta TEXT,
-            data_hora TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    with gerenciador.transacao() as conexao:
+        cursor = conexao.cursor()
+
+        # Tabela de usuários
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS usuarios (
+                email TEXT PRIMARY KEY,
+                senha TEXT NOT NULL,
+                peso REAL NOT NULL,
+                altura REAL NOT NULL,
+                sexo TEXT NOT NULL,
+                dieta TEXT NOT NULL,
+                imc REAL NOT NULL,
+                pergunta_seguranca TEXT NOT NULL,
+                resposta_seguranca TEXT NOT NULL
+            )
+        ''')
 
-    conn.commit()
+        # Tabela de alimentos
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alimentos (
+                nome TEXT PRIMARY KEY,
+                calorias REAL NOT NULL,
+                proteinas REAL DEFAULT 0,
+                carboidratos REAL DEFAULT 0,
+                gorduras REAL DEFAULT 0
+            )
+        ''')
 
-def migrar_dados():
+        # Tabela de refeições (ATUALIZADA)
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS refeicoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email_usuario TEXT NOT NULL,
+                alimento TEXT NOT NULL,
+                quantidade_gramas REAL NOT NULL,
+                calorias REAL NOT NULL,  -- COLUNA ADICIONADA
+                data TEXT NOT NULL,
+                dia INTEGER GENERATED ALWAYS AS ({EXPRESSAO_DIA}) VIRTUAL,
+                FOREIGN KEY (email_usuario) REFERENCES usuarios(email),
+                FOREIGN KEY (alimento) REFERENCES alimentos(nome)
+            )
+        ''')
+
+        # Tabela de suporte
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS suporte (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT NOT NULL,
+                mensagem TEXT NOT NULL,
+                resposta TEXT,
+                data_hora TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Totais diários por usuário (ver criar_gatilhos)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS totais_diarios (
+                email_usuario TEXT NOT NULL,
+                dia INTEGER NOT NULL,
+                calorias REAL NOT NULL DEFAULT 0,
+                quantidade_refeicoes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (email_usuario, dia)
+            ) WITHOUT ROWID
+        ''')
+
+        # Consumo acumulado de cada alimento por usuário (ver criar_gatilhos)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS consumo_alimentos (
+                email_usuario TEXT NOT NULL,
+                alimento TEXT NOT NULL,
+                total_gramas REAL NOT NULL DEFAULT 0,
+                quantidade_refeicoes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (email_usuario, alimento)
+            ) WITHOUT ROWID
+        ''')
+
+
+def criar_indices():
     """
-    Realiza migração de dados para a nova estrutura do banco.
-    
-    Adiciona a coluna 'calorias' na tabela refeicoes se não existir e
-    calcula os valores com base nos alimentos registrados.
-    
-    Caso ocorra erro durante a migração, faz rollback das alterações.
+    Cria os índices secundários usados pelas consultas do sistema.
+
+    Cada índice atende consultas específicas de repositorios.py; o script
+    verificar_consultas.py confere com EXPLAIN QUERY PLAN que nenhuma delas
+    volta a varrer a tabela inteira.
     """
-    try:
-        # Adiciona coluna calorias se não existir
-        cursor.execute("PRAGMA table_info(refeicoes)")
-        colunas = [col[1] for col in cursor.fetchall()]
-        
+    with gerenciador.transacao() as conexao:
+        cursor = conexao.cursor()
+
+        # Histórico: filtra por usuário e ordena por data
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_refeicoes_usuario_data
+            ON refeicoes (email_usuario, data)
+        ''')
+
+        # Resumos por dia, semana e mês: faixa sobre a chave numérica do dia
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_refeicoes_usuario_dia
+            ON refeicoes (email_usuario, dia)
+        ''')
+
+        # Ranking: cobre a soma de gramas por alimento sem ler a tabela
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_refeicoes_usuario_alimento
+            ON refeicoes (email_usuario, alimento, quantidade_gramas)
+        ''')
+
+        # Mensagens do usuário, mais recentes primeiro
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_suporte_email_data
+            ON suporte (email, data_hora)
+        ''')
+
+        # Caixa de entrada do administrador, mais recentes primeiro
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_suporte_data
+            ON suporte (data_hora)
+        ''')
+
+        # Ranking: os N alimentos mais consumidos saem direto do índice
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_consumo_alimentos_ranking
+            ON consumo_alimentos (email_usuario, total_gramas DESC)
+        ''')
+
+
+def criar_gatilhos(macronutrientes=True):
+    """
+    Cria os gatilhos que mantêm as tabelas totais_diarios e consumo_alimentos atualizadas.
+
+    Toda inserção, alteração ou exclusão em refeicoes ajusta a linha do
+    usuário no dia correspondente e a linha do usuário para o alimento, de
+    modo que o resumo diário e o ranking viram leituras por índice. Para
+    recalcular tudo a partir de refeicoes, use reconstruir_totais_diarios
+    e reconstruir_consumo_alimentos.
+
+    Args:
+        macronutrientes (bool): Soma também proteínas, carboidratos e gorduras em
+            totais_diarios; False só nas migrações anteriores a essas colunas
+    """
+    colunas = ["calorias"] + (["proteinas", "carboidratos", "gorduras"] if macronutrientes else [])
+    somar = f'''
+                INSERT INTO totais_diarios (email_usuario, dia, quantidade_refeicoes, {", ".join(colunas)})
+                VALUES (NEW.email_usuario, NEW.dia, 1, {", ".join(f"NEW.{coluna}" for coluna in colunas)})
+                ON CONFLICT (email_usuario, dia) DO UPDATE SET
+                    quantidade_refeicoes = quantidade_refeicoes + 1,
+                    {", ".join(f"{coluna} = {coluna} + excluded.{coluna}" for coluna in colunas)};'''
+    subtrair = f'''
+                UPDATE totais_diarios
+                SET quantidade_refeicoes = quantidade_refeicoes - 1,
+                    {", ".join(f"{coluna} = {coluna} - OLD.{coluna}" for coluna in colunas)}
+                WHERE email_usuario = OLD.email_usuario AND dia = OLD.dia;
+
+                DELETE FROM totais_diarios
+                WHERE email_usuario = OLD.email_usuario AND dia = OLD.dia AND quantidade_refeicoes <= 0;'''
+
+    with gerenciador.transacao() as conexao:
+        cursor = conexao.cursor()
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_refeicoes_totais_inserir
+            AFTER INSERT ON refeicoes
+            BEGIN{somar}
+            END
+        ''')
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_refeicoes_totais_excluir
+            AFTER DELETE ON refeicoes
+            BEGIN{subtrair}
+            END
+        ''')
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_refeicoes_totais_alterar
+            AFTER UPDATE OF email_usuario, {", ".join(colunas)}, data ON refeicoes
+            BEGIN{subtrair}
+{somar}
+            END
+        ''')
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_refeicoes_consumo_inserir
+            AFTER INSERT ON refeicoes
+            BEGIN
+                INSERT INTO consumo_alimentos (email_usuario, alimento, total_gramas, quantidade_refeicoes)
+                VALUES (NEW.email_usuario, NEW.alimento, NEW.quantidade_gramas, 1)
+                ON CONFLICT (email_usuario, alimento) DO UPDATE SET
+                    total_gramas = total_gramas + excluded.total_gramas,
+                    quantidade_refeicoes = quantidade_refeicoes + 1;
+            END
+        ''')
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_refeicoes_consumo_excluir
+            AFTER DELETE ON refeicoes
+            BEGIN
+                UPDATE consumo_alimentos
+                SET total_gramas = total_gramas - OLD.quantidade_gramas,
+                    quantidade_refeicoes = quantidade_refeicoes - 1
+                WHERE email_usuario = OLD.email_usuario AND alimento = OLD.alimento;
+
+                DELETE FROM consumo_alimentos
+                WHERE email_usuario = OLD.email_usuario AND alimento = OLD.alimento AND quantidade_refeicoes <= 0;
+            END
+        ''')
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_refeicoes_consumo_alterar
+            AFTER UPDATE OF email_usuario, alimento, quantidade_gramas ON refeicoes
+            BEGIN
+                UPDATE consumo_alimentos
+                SET total_gramas = total_gramas - OLD.quantidade_gramas,
+                    quantidade_refeicoes = quantidade_refeicoes - 1
+                WHERE email_usuario = OLD.email_usuario AND alimento = OLD.alimento;
+
+                DELETE FROM consumo_alimentos
+                WHERE email_usuario = OLD.email_usuario AND alimento = OLD.alimento AND quantidade_refeicoes <= 0;
+
+                INSERT INTO consumo_alimentos (email_usuario, alimento, total_gramas, quantidade_refeicoes)
+                VALUES (NEW.email_usuario, NEW.alimento, NEW.quantidade_gramas, 1)
+                ON CONFLICT (email_usuario, alimento) DO UPDATE SET
+                    total_gramas = total_gramas + excluded.total_gramas,
+                    quantidade_refeicoes = quantidade_refeicoes + 1;
+            END
+        ''')
+
+
+def reconstruir_totais_diarios():
+    """
+    Recalcula toda a tabela totais_diarios a partir de refeicoes.
+
+    Returns:
+        int: Número de linhas (usuário, dia) geradas
+    """
+    with gerenciador.transacao() as conexao:
+        conexao.execute("DELETE FROM totais_diarios")
+        conexao.execute('''
+            INSERT INTO totais_diarios (email_usuario, dia, calorias, quantidade_refeicoes,
+                                        proteinas, carboidratos, gorduras)
+            SELECT email_usuario, dia, SUM(calorias), COUNT(*), SUM(proteinas), SUM(carboidratos), SUM(gorduras)
+            FROM refeicoes
+            GROUP BY email_usuario, dia
+        ''')
+        return conexao.execute("SELECT COUNT(*) FROM totais_diarios").fetchone()[0]
+
+
+def reconstruir_consumo_alimentos():
+    """
+    Recalcula toda a tabela consumo_alimentos a partir de refeicoes.
+
+    Returns:
+        int: Número de linhas (usuário, alimento) geradas
+    """
+    with gerenciador.transacao() as conexao:
+        conexao.execute("DELETE FROM consumo_alimentos")
+        conexao.execute('''
+            INSERT INTO consumo_alimentos (email_usuario, alimento, total_gramas, quantidade_refeicoes)
+            SELECT email_usuario, alimento, SUM(quantidade_gramas), COUNT(*)
+            FROM refeicoes
+            GROUP BY email_usuario, alimento
+        ''')
+        return conexao.execute("SELECT COUNT(*) FROM consumo_alimentos").fetchone()[0]
+
+# --- Migrações --- #
+# Cada migração leva o banco de uma versão para a seguinte; a versão aplicada
+# fica gravada em PRAGMA user_version, então só as etapas pendentes rodam.
+# Preenchimentos grandes andam em faixas de refeicoes.id, com um commit por
+# faixa e o ponto de parada salvo em progresso_migracoes: se o processo for
+# interrompido, a próxima execução continua de onde parou.
+
+# Refeições processadas por commit nos preenchimentos em lote
+TAMANHO_LOTE_MIGRACAO = 5000
+
+
+def _migracao_esquema():
+    """Cria as tabelas e adiciona as colunas que faltam em bancos antigos"""
+    criar_tabelas()
+    with gerenciador.transacao() as conexao:
+        colunas = [col[1] for col in conexao.execute("PRAGMA table_xinfo(refeicoes)")]
         if 'calorias' not in colunas:
-            cursor.execute('ALTER TABLE refeicoes ADD COLUMN calorias REAL NOT NULL DEFAULT 0')
-            
-            # Calcula calorias para registros existentes
-            cursor.execute('''
-                UPDATE refeicoes 
-                SET calorias = (
-                    SELECT (refeicoes.quantidade_gramas/100) * alimentos.calorias 
-                    FROM alimentos 
-                    WHERE alimentos.nome = refeicoes.alimento
-                )
-                WHERE EXISTS (
-                    SELECT 1 FROM alimentos 
-                    WHERE alimentos.nome = refeicoes.alimento
-                )
+            conexao.execute('ALTER TABLE refeicoes ADD COLUMN calorias REAL NOT NULL DEFAULT 0')
+        # Chave numérica do dia (AAAAMMDD); coluna virtual, não reescreve a tabela
+        if 'dia' not in colunas:
+            conexao.execute(f'ALTER TABLE refeicoes ADD COLUMN dia INTEGER GENERATED ALWAYS AS ({EXPRESSAO_DIA}) VIRTUAL')
+
+
+def _adicionar_colunas_macros(conexao):
+    """Adiciona as colunas de macronutrientes a refeicoes e totais_diarios, se faltarem"""
+    for tabela in ("refeicoes", "totais_diarios"):
+        colunas = [col[1] for col in conexao.execute(f"PRAGMA table_xinfo({tabela})")]
+        for coluna in ("proteinas", "carboidratos", "gorduras"):
+            if coluna not in colunas:
+                conexao.execute(f'ALTER TABLE {tabela} ADD COLUMN {coluna} REAL NOT NULL DEFAULT 0')
+
+
+def _migracao_calorias(tamanho_lote, progresso):
+    """Calcula as calorias das refeições registradas antes da coluna existir"""
+    _executar_em_lotes(2, ['''
+        UPDATE refeicoes
+        SET calorias = (
+            SELECT (refeicoes.quantidade_gramas / 100) * alimentos.calorias
+            FROM alimentos
+            WHERE alimentos.nome = refeicoes.alimento
+        )
+        WHERE id > :inicio AND id <= :fim
+          AND calorias = 0
+          AND EXISTS (SELECT 1 FROM alimentos WHERE alimentos.nome = refeicoes.alimento)
+    '''], tamanho_lote, progresso)
+
+
+def _migracao_totais(tamanho_lote, progresso):
+    """
+    Cria os gatilhos e preenche totais_diarios e consumo_alimentos com as refeições existentes
+
+    Os gatilhos e o limite do preenchimento são gravados na mesma transação:
+    refeições com id acima do limite já entram pelos gatilhos, as demais são
+    somadas em lotes.
+    """
+    with gerenciador.transacao() as conexao:
+        iniciado = conexao.execute("SELECT 1 FROM progresso_migracoes WHERE versao = 4").fetchone()
+        preenchido = (conexao.execute("SELECT 1 FROM totais_diarios LIMIT 1").fetchone()
+                      and conexao.execute("SELECT 1 FROM consumo_alimentos LIMIT 1").fetchone())
+        # Os macronutrientes só entram nos totais na migração 10
+        if not iniciado and preenchido:
+            criar_gatilhos(macronutrientes=False)
+            return
+        if not iniciado:
+            _iniciar_lotes(conexao, 4)
+        criar_gatilhos(macronutrientes=False)
+
+    _executar_em_lotes(4, ['''
+        INSERT INTO totais_diarios (email_usuario, dia, calorias, quantidade_refeicoes)
+        SELECT email_usuario, dia, SUM(calorias), COUNT(*)
+        FROM refeicoes
+        WHERE id > :inicio AND id <= :fim
+        GROUP BY email_usuario, dia
+        ON CONFLICT (email_usuario, dia) DO UPDATE SET
+            calorias = calorias + excluded.calorias,
+            quantidade_refeicoes = quantidade_refeicoes + excluded.quantidade_refeicoes
+    ''', '''
+        INSERT INTO consumo_alimentos (email_usuario, alimento, total_gramas, quantidade_refeicoes)
+        SELECT email_usuario, alimento, SUM(quantidade_gramas), COUNT(*)
+        FROM refeicoes
+        WHERE id > :inicio AND id <= :fim
+        GROUP BY email_usuario, alimento
+        ON CONFLICT (email_usuario, alimento) DO UPDATE SET
+            total_gramas = total_gramas + excluded.total_gramas,
+            quantidade_refeicoes = quantidade_refeicoes + excluded.quantidade_refeicoes
+    '''], tamanho_lote, progresso)
+
+
+def _migracao_revisao_catalogo():
+    """
+    Cria o contador de revisões do catálogo de alimentos
+
+    Toda alteração em alimentos incrementa revisao_catalogo.revisao; o cache
+    de catalogo.py compara esse número para saber se precisa recarregar.
+    """
+    with gerenciador.transacao() as conexao:
+        conexao.execute('''
+            CREATE TABLE IF NOT EXISTS revisao_catalogo (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                revisao INTEGER NOT NULL
+            )
+        ''')
+        conexao.execute("INSERT OR IGNORE INTO revisao_catalogo (id, revisao) VALUES (1, 0)")
+        for evento in ("INSERT", "UPDATE", "DELETE"):
+            conexao.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_alimentos_revisao_{evento.lower()}
+                AFTER {evento} ON alimentos
+                BEGIN
+                    UPDATE revisao_catalogo SET revisao = revisao + 1 WHERE id = 1;
+                END
             ''')
-            conn.commit()
-            print("Migração de dados concluída com sucesso!")
-            
-    except Exception as e:
-        print(f"Erro durante migração: {e}")
-        conn.rollback()
+
+
+def _migracao_regras_dietas():
+    """Cria a tabela de alimentos indicados por dieta com as regras iniciais de dados_dietas.py"""
+    with gerenciador.transacao() as conexao:
+        conexao.execute('''
+            CREATE TABLE IF NOT EXISTS dietas_alimentos (
+                dieta TEXT NOT NULL,
+                alimento TEXT NOT NULL,
+                peso REAL NOT NULL DEFAULT 1,
+                PRIMARY KEY (dieta, alimento)
+            ) WITHOUT ROWID
+        ''')
+        conexao.executemany(
+            "INSERT OR IGNORE INTO dietas_alimentos (dieta, alimento) VALUES (?, ?)",
+            [(dieta, alimento) for dieta, alimentos in REGRAS_DIETAS.items() for alimento in alimentos])
+
+
+def _migracao_indice_historico():
+    """Cria o índice do histórico filtrado por alimento (paginado por data, ver RepositorioRefeicoes.pagina)"""
+    with gerenciador.transacao() as conexao:
+        conexao.execute('''
+            CREATE INDEX IF NOT EXISTS idx_refeicoes_usuario_alimento_data
+            ON refeicoes (email_usuario, alimento, data)
+        ''')
+
+
+def _migracao_fechamentos():
+    """
+    Cria a tabela com o resultado do fechamento de cada dia por usuário (ver fechamento.py)
+
+    A situação compara as calorias do dia com a meta da dieta naquele dia:
+    -1 abaixo, 0 dentro da tolerância e 1 acima.
+    """
+    with gerenciador.transacao() as conexao:
+        conexao.execute('''
+            CREATE TABLE IF NOT EXISTS fechamentos_diarios (
+                email_usuario TEXT NOT NULL,
+                dia INTEGER NOT NULL,
+                dieta TEXT NOT NULL,
+                meta REAL NOT NULL,
+                calorias REAL NOT NULL,
+                proteinas REAL NOT NULL,
+                carboidratos REAL NOT NULL,
+                gorduras REAL NOT NULL,
+                quantidade_refeicoes INTEGER NOT NULL,
+                situacao INTEGER NOT NULL,
+                fechado_em TEXT NOT NULL,
+                PRIMARY KEY (email_usuario, dia)
+            ) WITHOUT ROWID
+        ''')
+        # Aderência de todos os usuários por dia, para o administrador
+        conexao.execute('''
+            CREATE INDEX IF NOT EXISTS idx_fechamentos_dia
+            ON fechamentos_diarios (dia, situacao)
+        ''')
+
+
+def _migracao_registros_legados(tamanho_lote, progresso):
+    """
+    Incorpora os registros da tabela legada registro_refeicoes a refeicoes e remove a tabela
+
+    Os registros legados guardavam só o nome e as calorias; a quantidade em
+    gramas é estimada pelas calorias por 100g do alimento (0 se ele não estiver
+    no catálogo). Os gatilhos de refeicoes atualizam os totais diários e o
+    consumo por alimento. Cada faixa de ids é copiada num commit próprio, então
+    uma migração interrompida continua de onde parou.
+    """
+    with gerenciador.conexao() as conexao:
+        existe = conexao.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'registro_refeicoes'").fetchone()
+    if not existe:
+        return
+
+    _executar_em_lotes(9, ['''
+        INSERT INTO refeicoes (email_usuario, alimento, quantidade_gramas, calorias, data)
+        SELECT r.email,
+               LOWER(TRIM(r.refeicao)),
+               COALESCE(r.calorias * 100.0 / NULLIF(a.calorias, 0), 0),
+               COALESCE(r.calorias, 0),
+               CASE WHEN LENGTH(r.data) = 10 THEN r.data || ' 00:00:00' ELSE r.data END
+        FROM registro_refeicoes r
+        LEFT JOIN alimentos a ON a.nome = LOWER(TRIM(r.refeicao))
+        WHERE r.id > :inicio AND r.id <= :fim
+    '''], tamanho_lote, progresso, tabela="registro_refeicoes")
+
+    with gerenciador.transacao() as conexao:
+        conexao.execute("DROP TABLE registro_refeicoes")
+
+
+def _migracao_macros_refeicoes(tamanho_lote, progresso):
+    """
+    Grava proteínas, carboidratos e gorduras em cada refeição e nos totais diários
+
+    Assim como as calorias, os macronutrientes passam a ser calculados ao
+    registrar a refeição, e os relatórios somam as colunas sem consultar
+    alimentos. Quando os valores de um alimento mudam, recalculo.py atualiza
+    as refeições dele em lotes. Os gatilhos de totais_diarios são recriados
+    para somar os macronutrientes; o preenchimento das refeições existentes
+    passa por eles, então os totais diários são preenchidos junto.
+    """
+    with gerenciador.transacao() as conexao:
+        iniciado = conexao.execute("SELECT 1 FROM progresso_migracoes WHERE versao = 10").fetchone()
+        _adicionar_colunas_macros(conexao)
+        if not iniciado:
+            for evento in ("inserir", "excluir", "alterar"):
+                conexao.execute(f"DROP TRIGGER IF EXISTS trg_refeicoes_totais_{evento}")
+            _iniciar_lotes(conexao, 10)
+        criar_gatilhos()
+
+        # Refeições de um alimento em ordem de id, para o recálculo em lotes
+        conexao.execute('''
+            CREATE INDEX IF NOT EXISTS idx_refeicoes_alimento
+            ON refeicoes (alimento)
+        ''')
+        # Recálculos ainda não concluídos, retomados por recalculo.recalcular_pendentes
+        conexao.execute('''
+            CREATE TABLE IF NOT EXISTS recalculos_pendentes (
+                alimento TEXT PRIMARY KEY,
+                ultimo_id INTEGER NOT NULL,
+                limite_id INTEGER NOT NULL
+            )
+        ''')
+
+    _executar_em_lotes(10, ['''
+        UPDATE refeicoes
+        SET (proteinas, carboidratos, gorduras) = (
+            SELECT quantidade_gramas * COALESCE(a.proteinas, 0) / 100,
+                   quantidade_gramas * COALESCE(a.carboidratos, 0) / 100,
+                   quantidade_gramas * COALESCE(a.gorduras, 0) / 100
+            FROM alimentos a
+            WHERE a.nome = refeicoes.alimento
+        )
+        WHERE id > :inicio AND id <= :fim
+          AND EXISTS (SELECT 1 FROM alimentos a WHERE a.nome = refeicoes.alimento)
+    '''], tamanho_lote, progresso)
+
+
+def _migracao_listagem_usuarios():
+    """
+    Cria os índices da listagem de usuários do administrador e a contagem de usuários por grupo
+
+    A listagem é paginada por chave e ordenada por IMC, peso ou dieta (ver
+    RepositorioUsuarios.pagina); cada ordem tem um índice que termina no
+    e-mail, para o cursor continuar exatamente de onde a página parou, e as
+    ordens por IMC e peso têm também uma versão filtrada por dieta.
+    contagem_usuarios guarda quantos usuários há em cada combinação de dieta,
+    sexo e faixa de IMC, mantida por gatilhos, então o total de qualquer filtro
+    soma no máximo algumas dezenas de linhas em vez de contar a tabela usuarios.
+    """
+    faixa_nova, faixa_antiga = expressao_faixa_imc("NEW.imc"), expressao_faixa_imc("OLD.imc")
+    with gerenciador.transacao() as conexao:
+        for nome, colunas in (("imc", "imc, email"), ("peso", "peso, email"),
+                              ("dieta_imc", "dieta, imc, email"), ("dieta_peso", "dieta, peso, email")):
+            conexao.execute(f"CREATE INDEX IF NOT EXISTS idx_usuarios_{nome} ON usuarios ({colunas})")
+
+        conexao.execute('''
+            CREATE TABLE IF NOT EXISTS contagem_usuarios (
+                dieta TEXT NOT NULL,
+                sexo TEXT NOT NULL,
+                faixa_imc INTEGER NOT NULL,
+                quantidade INTEGER NOT NULL,
+                PRIMARY KEY (dieta, sexo, faixa_imc)
+            ) WITHOUT ROWID
+        ''')
+        conexao.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_usuarios_contagem_inserir
+            AFTER INSERT ON usuarios
+            BEGIN
+                INSERT INTO contagem_usuarios (dieta, sexo, faixa_imc, quantidade)
+                VALUES (NEW.dieta, NEW.sexo, {faixa_nova}, 1)
+                ON CONFLICT (dieta, sexo, faixa_imc) DO UPDATE SET quantidade = quantidade + 1;
+            END
+        ''')
+        conexao.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_usuarios_contagem_excluir
+            AFTER DELETE ON usuarios
+            BEGIN
+                UPDATE contagem_usuarios SET quantidade = quantidade - 1
+                WHERE dieta = OLD.dieta AND sexo = OLD.sexo AND faixa_imc = {faixa_antiga};
+            END
+        ''')
+        conexao.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_usuarios_contagem_alterar
+            AFTER UPDATE OF dieta, sexo, imc ON usuarios
+            BEGIN
+                UPDATE contagem_usuarios SET quantidade = quantidade - 1
+                WHERE dieta = OLD.dieta AND sexo = OLD.sexo AND faixa_imc = {faixa_antiga};
+                INSERT INTO contagem_usuarios (dieta, sexo, faixa_imc, quantidade)
+                VALUES (NEW.dieta, NEW.sexo, {faixa_nova}, 1)
+                ON CONFLICT (dieta, sexo, faixa_imc) DO UPDATE SET quantidade = quantidade + 1;
+            END
+        ''')
+
+        # Preenchimento na mesma transação dos gatilhos, para não perder nem contar duas vezes
+        conexao.execute("DELETE FROM contagem_usuarios")
+        conexao.execute(f'''
+            INSERT INTO contagem_usuarios (dieta, sexo, faixa_imc, quantidade)
+            SELECT dieta, sexo, {expressao_faixa_imc("imc")}, COUNT(*)
+            FROM usuarios
+            GROUP BY 1, 2, 3
+        ''')
+
+
+def _migracao_indices_analises():
+    """
+    Cria os índices das análises da população (ver analises.py)
+
+    Usuários ativos: faixa de dias em totais_diarios, com o e-mail no próprio
+    índice. Calorias e meta por dieta: índice de fechamentos_diarios que cobre
+    dia, dieta, situação, calorias e meta, e por isso também atende a
+    aderência por dia; o índice antigo (dia, situacao) fica redundante e é removido.
+    """
+    with gerenciador.transacao() as conexao:
+        conexao.execute('''
+            CREATE INDEX IF NOT EXISTS idx_totais_diarios_dia
+            ON totais_diarios (dia, email_usuario)
+        ''')
+        conexao.execute('''
+            CREATE INDEX IF NOT EXISTS idx_fechamentos_dia_dieta
+            ON fechamentos_diarios (dia, dieta, situacao, calorias, meta)
+        ''')
+        conexao.execute("DROP INDEX IF EXISTS idx_fechamentos_dia")
+
+
+# (versão, descrição, função). Novas migrações entram sempre no final.
+MIGRACOES = [
+    (1, "Cria as tabelas e colunas do esquema", lambda tamanho_lote, progresso: _migracao_esquema()),
+    (2, "Calcula as calorias de refeições antigas", _migracao_calorias),
+    (3, "Cria os índices secundários", lambda tamanho_lote, progresso: criar_indices()),
+    (4, "Cria os gatilhos e preenche totais diários e consumo por alimento", _migracao_totais),
+    (5, "Cria o contador de revisões do catálogo de alimentos", lambda tamanho_lote, progresso: _migracao_revisao_catalogo()),
+    (6, "Cria as regras de alimentos recomendados por dieta", lambda tamanho_lote, progresso: _migracao_regras_dietas()),
+    (7, "Cria o índice do histórico de refeições por alimento", lambda tamanho_lote, progresso: _migracao_indice_historico()),
+    (8, "Cria a tabela de fechamentos diários", lambda tamanho_lote, progresso: _migracao_fechamentos()),
+    (9, "Incorpora os registros legados a refeicoes e remove registro_refeicoes", _migracao_registros_legados),
+    (10, "Grava os macronutrientes em cada refeição e nos totais diários", _migracao_macros_refeicoes),
+    (11, "Cria os índices e a contagem da listagem de usuários", lambda tamanho_lote, progresso: _migracao_listagem_usuarios()),
+    (12, "Cria os índices das análises da população", lambda tamanho_lote, progresso: _migracao_indices_analises()),
+]
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+
+def _iniciar_lotes(conexao, versao, tabela="refeicoes"):
+    """Registra o ponto de partida (id 0) e o limite (maior id atual da tabela) de um preenchimento em lotes"""
+    conexao.execute(f'''
+        INSERT OR IGNORE INTO progresso_migracoes (versao, ultimo_id, limite_id)
+        SELECT ?, 0, COALESCE(MAX(id), 0) FROM {tabela}
+    ''', (versao,))
+
+
+def _executar_em_lotes(versao, instrucoes, tamanho_lote, progresso=None, tabela="refeicoes"):
+    """
+    Executa instruções sobre faixas de ids da tabela, com um commit por faixa
+
+    Args:
+        versao (int): Migração dona do preenchimento (chave em progresso_migracoes)
+        instrucoes (list): SQL com os parâmetros :inicio (exclusivo) e :fim (inclusivo)
+        tamanho_lote (int): Tamanho de cada faixa de ids
+        progresso (callable, opcional): Chamada com (versao, ultimo_id, limite_id) após cada faixa
+        tabela (str): Tabela cujos ids são percorridos
+    """
+    with gerenciador.transacao() as conexao:
+        _iniciar_lotes(conexao, versao, tabela)
+        ultimo, limite = conexao.execute(
+            "SELECT ultimo_id, limite_id FROM progresso_migracoes WHERE versao = ?", (versao,)).fetchone()
+
+    while ultimo < limite:
+        fim = min(ultimo + tamanho_lote, limite)
+        with gerenciador.transacao() as conexao:
+            for sql in instrucoes:
+                conexao.execute(sql, {"inicio": ultimo, "fim": fim})
+            conexao.execute("UPDATE progresso_migracoes SET ultimo_id = ? WHERE versao = ?", (fim, versao))
+        ultimo = fim
+        if progresso:
+            progresso(versao, ultimo, limite)
+
+
+def versao_banco():
+    """Retorna a versão do esquema gravada no banco (PRAGMA user_version)"""
+    with gerenciador.conexao() as conexao:
+        return conexao.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrar(tamanho_lote=TAMANHO_LOTE_MIGRACAO, progresso=None):
+    """
+    Aplica as migrações pendentes, em ordem
+
+    Se o banco já estiver na versão atual, custa apenas a leitura de PRAGMA user_version.
+
+    Args:
+        tamanho_lote (int): Refeições processadas por commit nos preenchimentos
+        progresso (callable, opcional): Ver _executar_em_lotes
+
+    Returns:
+        list: Tuplas (versao, descricao, segundos) das migrações aplicadas
+    """
+    atual = versao_banco()
+    if atual >= VERSAO_ATUAL:
+        return []
+
+    with gerenciador.transacao() as conexao:
+        conexao.execute('''
+            CREATE TABLE IF NOT EXISTS progresso_migracoes (
+                versao INTEGER PRIMARY KEY,
+                ultimo_id INTEGER NOT NULL,
+                limite_id INTEGER NOT NULL
+            )
+        ''')
+
+    aplicadas = []
+    for versao, descricao, funcao in MIGRACOES:
+        if versao <= atual:
+            continue
+        inicio = time.perf_counter()
+        funcao(tamanho_lote, progresso)
+        with gerenciador.transacao() as conexao:
+            conexao.execute("DELETE FROM progresso_migracoes WHERE versao = ?", (versao,))
+            conexao.execute(f"PRAGMA user_version = {versao}")
+        aplicadas.append((versao, descricao, time.perf_counter() - inicio))
+    return aplicadas
+
 
 def mostrar_estrutura():
     """
@@ -127,19 +975,32 @@ def mostrar_estrutura():
     Útil para verificação e depuração.
     """
     print("\nESTRUTURA DO BANCO DE DADOS:")
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tabelas = cursor.fetchall()
-    
-    for tabela in tabelas:
-        print(f"\nTabela: {tabela[0]}")
-        cursor.execute(f"PRAGMA table_info({tabela[0]})")
-        for coluna in cursor.fetchall():
-            print(f"  {coluna[1]} ({coluna[2]})")
+    with gerenciador.conexao() as conexao:
+        cursor = conexao.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tabelas = cursor.fetchall()
+        
+        for tabela in tabelas:
+            print(f"\nTabela: {tabela[0]}")
+            cursor.execute(f"PRAGMA table_info({tabela[0]})")
+            for coluna in cursor.fetchall():
+                print(f"  {coluna[1]} ({coluna[2]})")
+
+
+def preparar_banco():
+    """
+    Deixa o banco pronto para uso, aplicando as migrações pendentes
+
+    Deve ser chamada uma vez ao iniciar o programa (importar este módulo não
+    acessa o banco).
+
+    Returns:
+        list: Migrações aplicadas, ver migrar
+    """
+    return migrar()
 
-# Executa a criação das tabelas e migração
-criar_tabelas()
-migrar_dados()
 
 # Mostra a estrutura ao executar 
 if __name__ == "__main__":
-    mostrar_estrutura()
\ No newline at end of file
+    preparar_banco()
+    mostrar_estrutura()
@@ -0,0 +1,97 @@
+# Exportação de refeições e usuários para CSV ou JSONL (opcionalmente .gz)
+# As linhas são lidas do banco em lotes e gravadas uma a uma, então a memória
+# usada não depende do tamanho das tabelas.
+import csv
+import gzip
+import json
+
+from repositorios import RepositorioRefeicoes, RepositorioUsuarios
+
+COLUNAS_REFEICOES = ("id", "email_usuario", "alimento", "quantidade_gramas", "calorias", "data")
+COLUNAS_USUARIOS = ("email", "peso", "altura", "sexo", "dieta", "imc")
+
+FORMATOS = ("csv", "jsonl")
+
+
+def _formato_do_arquivo(destino):
+    """
+    Deduz o formato e a compressão pela extensão do arquivo
+
+    Returns:
+        tuple: (formato, comprimido), ex.: 'refeicoes.jsonl.gz' -> ('jsonl', True)
+    """
+    nome = destino.lower()
+    comprimido = nome.endswith(".gz")
+    if comprimido:
+        nome = nome[:-3]
+    formato = nome.rsplit(".", 1)[-1]
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato não suportado: use {', '.join('.' + f for f in FORMATOS)} (opcionalmente .gz)")
+    return formato, comprimido
+
+
+def _abrir(destino, comprimido):
+    """Abre o arquivo de destino para escrita de texto, com gzip se pedido"""
+    if comprimido:
+        return gzip.open(destino, "wt", encoding="utf-8", newline="")
+    return open(destino, "w", encoding="utf-8", newline="")
+
+
+def _gravar(destino, colunas, linhas):
+    """
+    Grava as linhas no destino, no formato indicado pela extensão
+
+    Args:
+        destino (str): Caminho do arquivo (.csv, .jsonl, .csv.gz ou .jsonl.gz)
+        colunas (tuple): Nomes das colunas
+        linhas (iterable): Tuplas na ordem das colunas
+
+    Returns:
+        int: Quantidade de linhas gravadas
+    """
+    formato, comprimido = _formato_do_arquivo(destino)
+    total = 0
+    with _abrir(destino, comprimido) as arquivo:
+        if formato == "csv":
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas)
+            for linha in linhas:
+                escritor.writerow(linha)
+                total += 1
+        else:
+            for linha in linhas:
+                arquivo.write(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False))
+                arquivo.write("\n")
+                total += 1
+    return total
+
+
+def exportar_refeicoes(destino, email_usuario=None, intervalo=None, tamanho_lote=1000):
+    """
+    Exporta as refeições registradas
+
+    Args:
+        destino (str): Caminho do arquivo (.csv, .jsonl, .csv.gz ou .jsonl.gz)
+        email_usuario (str, opcional): Apenas as refeições deste usuário
+        intervalo (tuple, opcional): Faixa (inicio, fim) de chaves de dia, ver repositorios.intervalo_dia
+        tamanho_lote (int): Linhas lidas do banco por vez
+
+    Returns:
+        int: Quantidade de refeições exportadas
+    """
+    linhas = RepositorioRefeicoes.iterar(email_usuario, intervalo, tamanho_lote)
+    return _gravar(destino, COLUNAS_REFEICOES, linhas)
+
+
+def exportar_usuarios(destino, tamanho_lote=1000):
+    """
+    Exporta os dados cadastrais dos usuários (sem senha nem resposta de segurança)
+
+    Args:
+        destino (str): Caminho do arquivo (.csv, .jsonl, .csv.gz ou .jsonl.gz)
+        tamanho_lote (int): Linhas lidas do banco por vez
+
+    Returns:
+        int: Quantidade de usuários exportados
+    """
+    return _gravar(destino, COLUNAS_USUARIOS, RepositorioUsuarios.iterar(tamanho_lote))
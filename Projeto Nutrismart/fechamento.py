@@ -0,0 +1,104 @@
+# Fechamento diário em lote: calcula, para todos os usuários de uma vez, o
+# resultado do dia (calorias, macronutrientes e situação em relação à meta da
+# dieta) e grava em fechamentos_diarios. Feito para rodar toda noite:
+#     python manutencao.py fechar-dia [--dia AAAA-MM-DD] [--processos N]
+# Os usuários são lidos em lotes por ordem de email, então a memória usada não
+# depende do número de usuários. Com processos > 1 a leitura dos lotes é
+# dividida entre processos (o WAL permite leituras em paralelo) e só o
+# processo principal grava.
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+from database import gerenciador
+from relatorios import meta_calorica, situacao_meta
+from repositorios import RepositorioFechamentos, RepositorioUsuarios, chave_dia
+
+TAMANHO_LOTE_FECHAMENTO = 500
+
+
+def _montar_fechamentos(chave, resumos, fechado_em):
+    """Transforma os resumos do dia (ver RepositorioFechamentos.resumo_do_dia) nas linhas de fechamentos_diarios"""
+    fechamentos = []
+    for email, dieta, peso, calorias, proteinas, carboidratos, gorduras, quantidade in resumos:
+        meta = meta_calorica(dieta, peso)
+        fechamentos.append((email, chave, dieta, meta, calorias, proteinas, carboidratos, gorduras,
+                            quantidade, situacao_meta(calorias, meta), fechado_em))
+    return fechamentos
+
+
+def _iniciar_processo(caminho, perfil):
+    """Aponta o gerenciador de cada processo do pool para o mesmo banco do processo principal"""
+    gerenciador.configurar(caminho=caminho, perfil=perfil)
+
+
+def _ler_lote(chave, apos, ate):
+    """Lê o resumo do dia de um lote de usuários (executado nos processos do pool)"""
+    return RepositorioFechamentos.resumo_do_dia(chave, apos, ate)
+
+
+def _lotes(tamanho_lote):
+    """Gera as faixas (apos, ate] de emails com 'tamanho_lote' usuários cada; a última termina em None"""
+    apos = ""
+    while True:
+        ate = RepositorioUsuarios.limite_lote(apos, tamanho_lote)
+        yield apos, ate
+        if ate is None:
+            return
+        apos = ate
+
+
+def fechar_dia(dia=None, tamanho_lote=TAMANHO_LOTE_FECHAMENTO, processos=1, progresso=None):
+    """
+    Fecha um dia para todos os usuários
+
+    Quem não registrou refeições no dia é fechado com zero calorias, abaixo da meta.
+    Pode ser executado de novo para o mesmo dia (ex.: refeições registradas
+    depois do fechamento): os fechamentos existentes são substituídos.
+
+    Args:
+        dia (date | str, opcional): Dia a fechar (padrão: ontem)
+        tamanho_lote (int): Usuários por lote (e por transação de gravação)
+        processos (int): Processos usados na leitura dos lotes (1 = no próprio processo)
+        progresso (callable, opcional): Chamada com o resultado parcial após cada lote com fechamentos gravados
+
+    Returns:
+        dict: dia (AAAAMMDD), usuarios fechados e quantos ficaram abaixo, dentro e acima da meta
+    """
+    chave = chave_dia(dia if dia is not None else date.today() - timedelta(days=1))
+    fechado_em = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    resultado = {"dia": chave, "usuarios": 0, "abaixo": 0, "dentro": 0, "acima": 0}
+
+    def gravar(resumos):
+        fechamentos = _montar_fechamentos(chave, resumos, fechado_em)
+        if not fechamentos:
+            return
+        RepositorioFechamentos.salvar_varios(fechamentos)
+        for fechamento in fechamentos:
+            resultado["usuarios"] += 1
+            resultado[("abaixo", "dentro", "acima")[fechamento[9] + 1]] += 1
+        if progresso:
+            progresso(resultado)
+
+    if processos <= 1:
+        apos = ""
+        while True:
+            resumos = RepositorioFechamentos.resumo_do_dia(chave, apos, limite=tamanho_lote)
+            gravar(resumos)
+            if len(resumos) < tamanho_lote:
+                return resultado
+            apos = resumos[-1][0]
+
+    # "spawn" (o padrão no Windows) evita herdar as conexões SQLite abertas neste processo
+    with ProcessPoolExecutor(processos, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_iniciar_processo,
+                             initargs=(gerenciador.caminho, gerenciador.perfil)) as pool:
+        # No máximo dois lotes por processo em andamento, para a memória não crescer com o número de usuários
+        pendentes = []
+        for apos, ate in _lotes(tamanho_lote):
+            pendentes.append(pool.submit(_ler_lote, chave, apos, ate))
+            if len(pendentes) >= 2 * processos:
+                gravar(pendentes.pop(0).result())
+        for futuro in pendentes:
+            gravar(futuro.result())
+    return resultado
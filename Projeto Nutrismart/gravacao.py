@@ -0,0 +1,192 @@
+# Gravação de refeições em segundo plano (write-behind)
+# A interface coloca as refeições numa fila em memória e volta a responder na
+# hora; uma thread própria esvazia a fila e grava vários pedidos num único
+# commit (a cada TAMANHO_GRUPO refeições ou INTERVALO_GRUPO_MS milissegundos,
+# o que vier primeiro). O resultado de cada pedido é devolvido por callback.
+import atexit
+import queue
+import threading
+import time
+from collections import deque
+
+from repositorios import RepositorioRefeicoes
+
+# Refeições gravadas por commit, no máximo
+TAMANHO_GRUPO = 50
+
+# Tempo máximo (ms) que um pedido espera por outros antes do commit
+INTERVALO_GRUPO_MS = 200
+
+# Latências de commit guardadas para as métricas
+AMOSTRAS_LATENCIA = 200
+
+_FIM = object()
+
+
+class FilaGravacao:
+    """
+    Fila de refeições a gravar, esvaziada por uma thread de gravação
+
+    Cada pedido (as refeições de um prato) é gravado inteiro ou não é gravado.
+    Os pedidos de um grupo vão juntos numa transação; se ela falhar, cada
+    pedido é tentado sozinho, para que um pedido com problema não derrube os
+    outros. Ao encerrar o programa a fila é esvaziada antes de sair.
+    """
+
+    def __init__(self, tamanho_grupo=TAMANHO_GRUPO, intervalo_grupo_ms=INTERVALO_GRUPO_MS,
+                 gravar=RepositorioRefeicoes.inserir_varios):
+        """
+        Cria a fila (a thread só começa em iniciar)
+
+        Args:
+            tamanho_grupo (int): Refeições por commit, no máximo
+            intervalo_grupo_ms (int): Espera máxima, em ms, para juntar pedidos num commit
+            gravar (callable): Grava uma lista de refeições numa transação
+        """
+        self.tamanho_grupo = tamanho_grupo
+        self.intervalo_grupo = intervalo_grupo_ms / 1000
+        self._gravar = gravar
+        self._fila = queue.Queue()
+        self._thread = None
+        self._trava = threading.Lock()
+        self._latencias = deque(maxlen=AMOSTRAS_LATENCIA)
+        self._contadores = {"pedidos": 0, "refeicoes": 0, "falhas": 0, "commits": 0, "maior_profundidade": 0}
+
+    def iniciar(self):
+        """Inicia a thread de gravação e garante que a fila seja esvaziada quando o programa terminar"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._executar, name="gravacao-refeicoes", daemon=True)
+        self._thread.start()
+        atexit.register(self.encerrar)
+
+    def enfileirar(self, refeicoes, ao_concluir=None):
+        """
+        Coloca um pedido na fila
+
+        Args:
+            refeicoes (list): Tuplas (email_usuario, alimento, quantidade, calorias, data)
+            ao_concluir (callable, opcional): Chamada na thread de gravação com
+                (sucesso, quantidade, erro) depois do commit
+        """
+        if self._thread is None or not self._thread.is_alive():
+            raise RuntimeError("A fila de gravação não está em execução")
+        self._fila.put((list(refeicoes), ao_concluir))
+        with self._trava:
+            self._contadores["maior_profundidade"] = max(self._contadores["maior_profundidade"], self._fila.qsize())
+
+    def esvaziar(self, timeout=None):
+        """
+        Espera até que todos os pedidos enfileirados até agora tenham sido gravados
+
+        Returns:
+            bool: True se a fila foi esvaziada dentro do tempo; False também se a
+                thread de gravação não estiver em execução (nada a esperar)
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        concluido = threading.Event()
+        self._fila.put((None, concluido.set))
+        return concluido.wait(timeout)
+
+    def encerrar(self, timeout=None):
+        """Grava o que ainda estiver na fila e para a thread de gravação"""
+        if self._thread is None:
+            return
+        self._fila.put(_FIM)
+        self._thread.join(timeout)
+        self._thread = None
+        atexit.unregister(self.encerrar)
+
+    def metricas(self):
+        """
+        Retorna as métricas da fila
+
+        Returns:
+            dict: profundidade (pedidos aguardando), maior_profundidade, pedidos, refeicoes,
+                falhas e commits gravados, e latência de commit média e p95 em ms
+        """
+        with self._trava:
+            latencias = sorted(self._latencias)
+            metricas = dict(self._contadores)
+        metricas["profundidade"] = self._fila.qsize()
+        metricas["latencia_media_ms"] = sum(latencias) / len(latencias) if latencias else 0.0
+        metricas["latencia_p95_ms"] = latencias[int(0.95 * (len(latencias) - 1))] if latencias else 0.0
+        return metricas
+
+    # --- Thread de gravação --- #
+
+    def _executar(self):
+        """Laço da thread: junta pedidos em grupos e grava cada grupo num commit"""
+        while True:
+            item = self._fila.get()
+            if item is _FIM:
+                return
+            grupo = [item]
+            quantidade = len(item[0] or ())
+            limite = time.monotonic() + self.intervalo_grupo
+            fim = False
+            while quantidade < self.tamanho_grupo:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    item = self._fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if item is _FIM:
+                    fim = True
+                    break
+                grupo.append(item)
+                quantidade += len(item[0] or ())
+
+            self._gravar_grupo(grupo)
+            if fim:
+                return
+
+    def _gravar_grupo(self, grupo):
+        """Grava os pedidos do grupo numa transação e avisa cada um do resultado"""
+        pedidos = [(refeicoes, ao_concluir) for refeicoes, ao_concluir in grupo if refeicoes is not None]
+        if pedidos:
+            try:
+                self._commit([refeicao for refeicoes, _ in pedidos for refeicao in refeicoes])
+                resultados = [(True, len(refeicoes), None) for refeicoes, _ in pedidos]
+            except Exception:
+                # Grava cada pedido sozinho para descobrir qual falhou
+                resultados = []
+                for refeicoes, _ in pedidos:
+                    try:
+                        self._commit(refeicoes)
+                        resultados.append((True, len(refeicoes), None))
+                    except Exception as e:
+                        resultados.append((False, 0, str(e)))
+
+            with self._trava:
+                for sucesso, quantidade, _ in resultados:
+                    self._contadores["pedidos"] += 1
+                    self._contadores["refeicoes"] += quantidade
+                    self._contadores["falhas"] += not sucesso
+            for (_, ao_concluir), resultado in zip(pedidos, resultados):
+                if ao_concluir:
+                    self._avisar(ao_concluir, *resultado)
+
+        # Marcadores de esvaziar(): avisados depois de tudo que veio antes deles
+        for refeicoes, ao_concluir in grupo:
+            if refeicoes is None:
+                ao_concluir()
+
+    @staticmethod
+    def _avisar(ao_concluir, *resultado):
+        """Chama o callback de um pedido sem deixar um erro nele parar a thread de gravação"""
+        try:
+            ao_concluir(*resultado)
+        except Exception as e:
+            print(f"Erro ao avisar o resultado da gravação: {e}")
+
+    def _commit(self, refeicoes):
+        """Grava as refeições numa transação, registrando a latência"""
+        inicio = time.perf_counter()
+        self._gravar(refeicoes)
+        with self._trava:
+            self._latencias.append((time.perf_counter() - inicio) * 1000)
+            self._contadores["commits"] += 1
@@ -0,0 +1,338 @@
+# Importação em massa (CSV/TSV) de tabelas de composição de alimentos e de
+# cadastros de usuários (ex.: pacientes de uma clínica ou funcionários de uma empresa)
+import csv
+
+from credenciais import SENHA_BLOQUEADA, e_hash, gerar_hashes
+from indice_nomes import normalizar
+from membros import Usuario
+from nutrientes import np
+from recalculo import atualizar_alimentos
+from relatorios import METAS_POR_KG
+from repositorios import RepositorioAlimentos, RepositorioUsuarios
+
+# Nomes de coluna aceitos para cada campo (sem acentos, minúsculos), incluindo
+# os cabeçalhos usuais da tabela TACO
+COLUNAS = {
+    "nome": ["nome", "alimento", "descricao", "descricao do alimento", "descricao_alimento"],
+    "calorias": ["calorias", "kcal", "energia", "energia_kcal", "energia (kcal)", "energia kcal"],
+    "proteinas": ["proteinas", "proteina", "proteina_g", "proteina (g)"],
+    "carboidratos": ["carboidratos", "carboidrato", "carboidrato_g", "carboidrato (g)"],
+    "gorduras": ["gorduras", "gordura", "lipideos", "lipideos_g", "lipideos (g)", "lipidios"],
+}
+
+# Marcações de "sem valor" usadas nas tabelas (traço, não analisado, etc.)
+VALORES_VAZIOS = {"", "na", "nd", "tr", "*", "-", "--"}
+
+# Nomes de coluna aceitos no cadastro de usuários
+COLUNAS_USUARIOS = {
+    "email": ["email", "e-mail", "e_mail"],
+    "peso": ["peso", "peso_kg", "peso (kg)"],
+    "altura": ["altura", "altura_m", "altura (m)"],
+    "sexo": ["sexo"],
+    "dieta": ["dieta"],
+    "senha": ["senha", "senha_hash"],
+    "pergunta": ["pergunta", "pergunta_seguranca", "pergunta de seguranca"],
+    "resposta": ["resposta", "resposta_seguranca", "resposta de seguranca"],
+}
+
+# Dietas aceitas, pelo nome sem acentos e minúsculo
+DIETAS = {normalizar(dieta): dieta for dieta in METAS_POR_KG}
+
+# IMC aceito na importação; fora da faixa, peso ou altura provavelmente estão em
+# outra unidade (ex.: altura em centímetros)
+FAIXA_IMC = (10, 80)
+
+
+def _mapear_colunas(cabecalho, colunas=COLUNAS, obrigatorias=("nome", "calorias")):
+    """
+    Descobre a posição de cada campo no cabeçalho do arquivo
+
+    Returns:
+        dict: campo -> índice da coluna
+
+    Raises:
+        ValueError: Se alguma coluna obrigatória não for encontrada
+    """
+    normalizado = [normalizar(coluna) for coluna in cabecalho]
+    posicoes = {}
+    for campo, nomes in colunas.items():
+        for i, coluna in enumerate(normalizado):
+            if coluna in nomes:
+                posicoes[campo] = i
+                break
+    if any(campo not in posicoes for campo in obrigatorias):
+        nomes = ", ".join(obrigatorias[:-1]) + " e " + obrigatorias[-1]
+        raise ValueError(f"O arquivo precisa ter colunas de {nomes}")
+    return posicoes
+
+
+def _detectar_delimitador(arquivo, caminho):
+    """Tabulação para .tsv/.txt; senão ',' ou ';', o que aparecer mais na primeira linha"""
+    if caminho.lower().endswith((".tsv", ".txt")):
+        return "\t"
+    amostra = arquivo.readline()
+    arquivo.seek(0)
+    return ";" if amostra.count(";") > amostra.count(",") else ","
+
+
+def _numero(valor):
+    """Converte um valor da tabela em float (aceita vírgula decimal); vazio vale 0"""
+    valor = valor.strip()
+    if valor.lower() in VALORES_VAZIOS:
+        return 0.0
+    try:
+        return float(valor.replace(",", "."))
+    except ValueError:
+        raise ValueError(f"valor numérico inválido: {valor!r}") from None
+
+
+def _ler_linhas(arquivo, delimitador):
+    """Gera (número da linha, alimento, erro) para cada linha de dados do arquivo"""
+    leitor = csv.reader(arquivo, delimiter=delimitador)
+    posicoes = _mapear_colunas(next(leitor))
+
+    for numero, linha in enumerate(leitor, start=2):
+        if not any(campo.strip() for campo in linha):
+            continue
+        try:
+            nome = linha[posicoes["nome"]].strip().lower()
+            if not nome:
+                raise ValueError("nome vazio")
+            valores = [
+                _numero(linha[posicoes[campo]]) if campo in posicoes else 0.0
+                for campo in ("calorias", "proteinas", "carboidratos", "gorduras")
+            ]
+            if any(v < 0 for v in valores):
+                raise ValueError("valores negativos")
+        except (IndexError, ValueError) as e:
+            yield numero, None, str(e)
+            continue
+        yield numero, (nome, *valores), None
+
+
+def importar_alimentos(caminho, tamanho_lote=1000, simular=False, delimitador=None,
+                       encoding="utf-8-sig", progresso=None):
+    """
+    Importa uma tabela de composição de alimentos para o catálogo
+
+    O arquivo é lido em lotes de 'tamanho_lote' linhas; cada lote é gravado
+    numa única transação com INSERT ... ON CONFLICT, então a memória usada não
+    depende do tamanho do arquivo.
+
+    Args:
+        caminho (str): Arquivo CSV ou TSV com cabeçalho
+        tamanho_lote (int): Linhas por transação
+        simular (bool): Se True, não grava nada e apenas relata o que mudaria
+        delimitador (str, opcional): Separador de colunas (padrão: tabulação para .tsv/.txt,
+            senão detectado entre ',' e ';')
+        encoding (str): Codificação do arquivo
+        progresso (callable, opcional): Chamada com o relatório parcial após cada lote
+
+    Returns:
+        dict: Relatório com linhas lidas, novos, atualizados, inalterados, a_recalcular
+            (alimentos com refeições a recalcular, ver recalculo.py), rejeitados [(linha, motivo)]
+            e conflitos [(nome, valores atuais, valores do arquivo)]
+    """
+    relatorio = {"lidas": 0, "novos": 0, "atualizados": 0, "inalterados": 0, "a_recalcular": 0,
+                 "rejeitados": [], "conflitos": []}
+
+    with open(caminho, newline="", encoding=encoding) as arquivo:
+        if delimitador is None:
+            delimitador = _detectar_delimitador(arquivo, caminho)
+
+        lote = {}
+        for numero, alimento, erro in _ler_linhas(arquivo, delimitador):
+            relatorio["lidas"] += 1
+            if erro:
+                relatorio["rejeitados"].append((numero, erro))
+                continue
+            lote[alimento[0]] = alimento  # repetido no mesmo lote: vale a última linha
+            if len(lote) >= tamanho_lote:
+                _processar_lote(lote, simular, relatorio)
+                lote = {}
+                if progresso:
+                    progresso(relatorio)
+
+        if lote:
+            _processar_lote(lote, simular, relatorio)
+            if progresso:
+                progresso(relatorio)
+
+    return relatorio
+
+
+def _processar_lote(lote, simular, relatorio):
+    """Compara um lote com o catálogo, atualiza o relatório e grava (se não for simulação)"""
+    atuais = RepositorioAlimentos.buscar_nutrientes_varios(lote)
+    gravar = []
+    for nome, alimento in lote.items():
+        valores = tuple(alimento[1:])
+        if nome not in atuais:
+            relatorio["novos"] += 1
+        elif tuple(v or 0 for v in atuais[nome]) == valores:
+            relatorio["inalterados"] += 1
+            continue
+        else:
+            relatorio["atualizados"] += 1
+            relatorio["conflitos"].append((nome, atuais[nome], valores))
+        gravar.append(alimento)
+
+    if gravar and not simular:
+        relatorio["a_recalcular"] += len(atualizar_alimentos(gravar))
+
+
+def _ler_usuario(linha, posicoes):
+    """
+    Valida uma linha do cadastro de usuários
+
+    Returns:
+        tuple: (email, senha, peso, altura, sexo, dieta, pergunta, resposta); senha,
+            pergunta e resposta podem vir vazias
+
+    Raises:
+        ValueError: Com o motivo da rejeição
+    """
+    def campo(nome):
+        return linha[posicoes[nome]].strip() if nome in posicoes else ""
+
+    email = campo("email")
+    if not Usuario.validar_email(email):
+        raise ValueError(f"e-mail inválido: {email!r}")
+    peso, altura = _numero(campo("peso")), _numero(campo("altura"))
+    if peso <= 0 or altura <= 0:
+        raise ValueError("peso e altura devem ser maiores que zero")
+    sexo = campo("sexo").upper()
+    if sexo not in ("M", "F"):
+        raise ValueError(f"sexo inválido: {sexo!r} (use M ou F)")
+    dieta = DIETAS.get(normalizar(campo("dieta")))
+    if dieta is None:
+        raise ValueError(f"dieta desconhecida: {campo('dieta')!r}")
+    pergunta, resposta = campo("pergunta"), campo("resposta").lower()
+    if bool(pergunta) != bool(resposta):
+        raise ValueError("pergunta e resposta de segurança devem vir juntas")
+    return email, campo("senha"), peso, altura, sexo, dieta, pergunta, resposta
+
+
+def _calcular_imc(pesos, alturas):
+    """IMC de todos os usuários do lote de uma vez (vetorizado com NumPy, se instalado)"""
+    if np is not None:
+        return np.round(np.asarray(pesos) / np.asarray(alturas) ** 2, 2).tolist()
+    return [round(peso / altura ** 2, 2) for peso, altura in zip(pesos, alturas)]
+
+
+def importar_usuarios(caminho, tamanho_lote=1000, simular=False, arquivo_rejeitados=None,
+                      delimitador=None, encoding="utf-8-sig", progresso=None):
+    """
+    Cadastra (ou atualiza) usuários em massa a partir de um CSV/TSV
+
+    O arquivo é lido em lotes de 'tamanho_lote' linhas: o IMC do lote é
+    calculado de uma vez, os e-mails já cadastrados são consultados numa só
+    busca e o lote é gravado numa única transação com INSERT ... ON CONFLICT,
+    então a memória usada não depende do tamanho do arquivo.
+
+    Colunas obrigatórias: email, peso (kg), altura (m), sexo (M/F) e dieta.
+    Opcionais: senha (texto puro, que vira hash, ou um hash no formato de
+    credenciais.gerar_hash), pergunta e resposta de segurança. Usuários novos
+    sem senha precisam de pergunta e resposta: entram com a senha bloqueada e a
+    definem pela recuperação de senha. Em usuários já cadastrados, senha,
+    pergunta e resposta vazias mantêm os valores atuais.
+
+    Args:
+        caminho (str): Arquivo CSV ou TSV com cabeçalho
+        tamanho_lote (int): Linhas por transação
+        simular (bool): Se True, não grava nada e apenas relata o que mudaria
+        arquivo_rejeitados (str, opcional): CSV onde gravar as linhas rejeitadas, com a
+            coluna 'motivo' ao final (pode ser corrigido e importado de novo)
+        delimitador (str, opcional): Separador de colunas (padrão: detectado)
+        encoding (str): Codificação do arquivo
+        progresso (callable, opcional): Chamada com o relatório parcial após cada lote
+
+    Returns:
+        dict: Relatório com linhas lidas, novos, atualizados, senhas_calculadas
+            (senhas em texto puro que viraram hash) e rejeitados [(linha, motivo)]
+    """
+    relatorio = {"lidas": 0, "novos": 0, "atualizados": 0, "senhas_calculadas": 0, "rejeitados": []}
+    saida_rejeitados = None
+
+    with open(caminho, newline="", encoding=encoding) as arquivo:
+        if delimitador is None:
+            delimitador = _detectar_delimitador(arquivo, caminho)
+        leitor = csv.reader(arquivo, delimiter=delimitador)
+        cabecalho = next(leitor)
+        posicoes = _mapear_colunas(cabecalho, COLUNAS_USUARIOS, ("email", "peso", "altura", "sexo", "dieta"))
+
+        try:
+            if arquivo_rejeitados:
+                saida_rejeitados = open(arquivo_rejeitados, "w", newline="", encoding="utf-8")
+                escritor = csv.writer(saida_rejeitados, delimiter=delimitador)
+                escritor.writerow(cabecalho + ["motivo"])
+
+            def rejeitar(numero, linha, motivo):
+                relatorio["rejeitados"].append((numero, motivo))
+                if saida_rejeitados:
+                    escritor.writerow(linha + [motivo])
+
+            lote = {}
+            for numero, linha in enumerate(leitor, start=2):
+                if not any(campo.strip() for campo in linha):
+                    continue
+                relatorio["lidas"] += 1
+                try:
+                    usuario = _ler_usuario(linha, posicoes)
+                except (IndexError, ValueError) as e:
+                    rejeitar(numero, linha, str(e))
+                    continue
+                lote[usuario[0]] = (numero, linha, usuario)  # repetido no mesmo lote: vale a última linha
+                if len(lote) >= tamanho_lote:
+                    _processar_usuarios(lote, simular, relatorio, rejeitar)
+                    lote = {}
+                    if progresso:
+                        progresso(relatorio)
+
+            if lote:
+                _processar_usuarios(lote, simular, relatorio, rejeitar)
+                if progresso:
+                    progresso(relatorio)
+        finally:
+            if saida_rejeitados:
+                saida_rejeitados.close()
+
+    return relatorio
+
+
+def _processar_usuarios(lote, simular, relatorio, rejeitar):
+    """Calcula o IMC do lote, confere quem já existe, atualiza o relatório e grava (se não for simulação)"""
+    linhas = list(lote.values())
+    imcs = _calcular_imc([usuario[2] for _, _, usuario in linhas], [usuario[3] for _, _, usuario in linhas])
+    existentes = RepositorioUsuarios.buscar_existentes(lote)
+
+    gravar = []
+    senhas_em_texto = []
+    for (numero, linha, usuario), imc in zip(linhas, imcs):
+        email, senha, peso, altura, sexo, dieta, pergunta, resposta = usuario
+        if not FAIXA_IMC[0] <= imc <= FAIXA_IMC[1]:
+            rejeitar(numero, linha, f"IMC {imc} fora da faixa {FAIXA_IMC[0]}-{FAIXA_IMC[1]} "
+                                    "(peso em kg e altura em metros?)")
+            continue
+        if email in existentes:
+            relatorio["atualizados"] += 1
+        elif not senha and not pergunta:
+            rejeitar(numero, linha, "usuário novo sem senha nem pergunta de segurança")
+            continue
+        else:
+            relatorio["novos"] += 1
+
+        if not senha:
+            senha = SENHA_BLOQUEADA
+        elif not e_hash(senha):
+            senhas_em_texto.append(len(gravar))
+        gravar.append([email, senha, peso, altura, sexo, dieta, imc, pergunta, resposta])
+
+    relatorio["senhas_calculadas"] += len(senhas_em_texto)
+    if not gravar or simular:
+        return
+
+    # O hash é a parte cara da importação; as threads do pool dividem o trabalho
+    for i, hash_senha in zip(senhas_em_texto, gerar_hashes([gravar[i][1] for i in senhas_em_texto])):
+        gravar[i][1] = hash_senha
+    RepositorioUsuarios.salvar_varios(gravar, SENHA_BLOQUEADA)
@@ -0,0 +1,173 @@
+# Índice em memória dos nomes de alimentos, para autocompletar e sugerir
+# nomes parecidos quando o digitado não está cadastrado
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+
+# Caracteres que separam as palavras de um nome ("arroz, integral, cozido")
+SEPARADORES = " ,-/()"
+
+# Fração dos trigramas digitados que um nome composto precisa conter para ser sugerido
+COBERTURA_MINIMA = 0.6
+
+
+def normalizar(texto):
+    """Remove acentos, espaços extras e maiúsculas de um texto"""
+    texto = unicodedata.normalize("NFKD", texto.strip().lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def _trigramas(texto):
+    """Retorna os trigramas de um texto, com espaços nas pontas para valorizar início e fim"""
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def distancia_ao_inicio(digitado, nome, maximo):
+    """
+    Menor distância de Levenshtein entre o texto digitado e algum começo do nome
+
+    Permite sugerir "arroz, integral, cozido" para "aroz": a distância até
+    "arroz" é 1, mesmo que até o nome completo seja bem maior.
+
+    Args:
+        digitado (str): Texto digitado
+        nome (str): Nome cadastrado
+        maximo (int): Para de calcular assim que a distância passar deste valor
+
+    Returns:
+        int: Número mínimo de edições (ou maximo + 1, se ultrapassado)
+    """
+    # Só as células a até 'maximo' da diagonal podem ficar dentro do limite
+    nome = nome[:len(digitado) + maximo]
+    fora = maximo + 1
+    anterior = [j if j <= maximo else fora for j in range(len(nome) + 1)]
+    for i, caractere in enumerate(digitado, 1):
+        atual = [i if i <= maximo else fora] + [fora] * len(nome)
+        menor = atual[0]
+        for j in range(max(1, i - maximo), min(len(nome), i + maximo) + 1):
+            custo = anterior[j - 1] + (caractere != nome[j - 1])
+            if anterior[j] + 1 < custo:
+                custo = anterior[j] + 1
+            if atual[j - 1] + 1 < custo:
+                custo = atual[j - 1] + 1
+            atual[j] = custo
+            if custo < menor:
+                menor = custo
+        if menor > maximo:
+            return fora
+        anterior = atual
+    return min(min(anterior), fora)
+
+
+class IndiceNomes:
+    """
+    Índice de nomes para busca por prefixo e por semelhança
+
+    - Prefixo: busca binária em duas listas ordenadas, uma com os nomes e
+      outra com cada "final de nome" que começa numa palavra ("arroz integral"
+      também entra como "integral"); responde em microssegundos mesmo com
+      dezenas de milhares de nomes.
+    - Semelhança: índice invertido de trigramas escolhe os candidatos que
+      compartilham mais pedaços com o texto digitado, e a distância de edição
+      decide a ordem final.
+
+    Acentos e maiúsculas são ignorados nas duas buscas.
+    """
+
+    def __init__(self, nomes):
+        """
+        Constrói o índice
+
+        Args:
+            nomes (iterable): Nomes dos alimentos, como estão cadastrados
+        """
+        self.nomes = sorted(set(nomes), key=normalizar)
+        self._normalizados = [normalizar(nome) for nome in self.nomes]
+
+        # Finais de nome que começam numa palavra, exceto a primeira (já coberta por _normalizados)
+        palavras = []
+        for posicao, normalizado in enumerate(self._normalizados):
+            for i in range(1, len(normalizado)):
+                if normalizado[i - 1] in SEPARADORES and normalizado[i] not in SEPARADORES:
+                    palavras.append((normalizado[i:], posicao))
+        palavras.sort()
+        self._palavras = [chave for chave, _ in palavras]
+        self._posicoes_palavras = [posicao for _, posicao in palavras]
+
+        self._por_trigrama = {}
+        for posicao, normalizado in enumerate(self._normalizados):
+            for trigrama in _trigramas(normalizado):
+                self._por_trigrama.setdefault(trigrama, []).append(posicao)
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def autocompletar(self, prefixo, limite=10):
+        """
+        Lista os nomes que começam pelo prefixo (no início do nome ou de uma de suas palavras)
+
+        Args:
+            prefixo (str): Texto digitado
+            limite (int): Quantidade máxima de nomes
+
+        Returns:
+            list: Nomes encontrados; os que começam pelo prefixo vêm primeiro, em ordem alfabética
+        """
+        prefixo = normalizar(prefixo)
+        if not prefixo:
+            return []
+
+        encontrados = []
+        i = bisect_left(self._normalizados, prefixo)
+        while i < len(self._normalizados) and len(encontrados) < limite and self._normalizados[i].startswith(prefixo):
+            encontrados.append(i)
+            i += 1
+
+        # Completa com os nomes em que uma palavra do meio começa pelo prefixo
+        por_palavra = []
+        vistos = set(encontrados)
+        i = bisect_left(self._palavras, prefixo)
+        while (i < len(self._palavras) and len(encontrados) + len(por_palavra) < limite
+               and self._palavras[i].startswith(prefixo)):
+            posicao = self._posicoes_palavras[i]
+            if posicao not in vistos:
+                vistos.add(posicao)
+                por_palavra.append(posicao)
+            i += 1
+
+        return [self.nomes[posicao] for posicao in encontrados + sorted(por_palavra)]
+
+    def parecidos(self, nome, limite=5, candidatos=30):
+        """
+        Sugere nomes cadastrados parecidos com o digitado ("você quis dizer")
+
+        Args:
+            nome (str): Texto digitado
+            limite (int): Quantidade máxima de sugestões
+            candidatos (int): Quantos nomes, pela contagem de trigramas, passam pela distância de edição
+
+        Returns:
+            list: Nomes mais parecidos primeiro
+        """
+        nome = normalizar(nome)
+        if not nome:
+            return []
+
+        trigramas = _trigramas(nome)
+        contagem = Counter()
+        for trigrama in trigramas:
+            contagem.update(self._por_trigrama.get(trigrama, ()))
+
+        # Aceita até ~1 erro a cada 3 letras (pelo menos 1) no nome ou no começo dele,
+        # ou nomes compostos que contenham a maior parte dos trigramas digitados
+        maximo = max(1, len(nome) // 3)
+        avaliados = []
+        for posicao, comuns in contagem.most_common(candidatos):
+            normalizado = self._normalizados[posicao]
+            distancia = distancia_ao_inicio(nome, normalizado, maximo)
+            if distancia <= maximo or comuns >= COBERTURA_MINIMA * len(trigramas):
+                avaliados.append((distancia, -comuns, self.nomes[posicao]))
+
+        avaliados.sort()
+        return [nome for _, _, nome in avaliados[:limite]]
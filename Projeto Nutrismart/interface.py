@@ -1,19 +1,48 @@
+import queue
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from datetime import datetime, date
-from database import cursor, conn
-from alimentacao import Comida
+from catalogo import catalogo
+from credenciais import autenticar_async, gerar_hash_async
+from database import FAIXAS_IMC, preparar_banco
+from relatorios import METAS_POR_KG, gerar_relatorio, relatorio_datas, relatorio_mes, relatorio_semana
+from repositorios import (RepositorioRefeicoes, RepositorioSuporte, RepositorioTotaisDiarios, RepositorioUsuarios,
+                          intervalo_datas, intervalo_ultimos_dias)
+from sessao import Sessao
+from alimentacao import Comida, Registros
+from analises import calcular_painel_async
+from gravacao import FilaGravacao
+from membros import ORDENS_LISTAGEM, TAMANHO_PAGINA_USUARIOS
 from suportinho import Suporte
 
+# Intervalo (ms) com que a interface confere os resultados da gravação em segundo plano
+INTERVALO_VERIFICACAO_GRAVACAO_MS = 100
+
+# Intervalo (ms) com que a interface confere se um cálculo em segundo plano (senha, painel) terminou
+INTERVALO_ESPERA_MS = 50
+
+# Tamanho (px) do histograma de IMC no painel da população
+LARGURA_HISTOGRAMA_PX = 700
+ALTURA_HISTOGRAMA_PX = 180
+
 class InterfaceNutrismart:
-    def __init__(self, root):
-        """Inicializa a aplicação principal com configurações básicas"""
+    def __init__(self, root, gravacao_em_segundo_plano=False):
+        """
+        Inicializa a aplicação principal com configurações básicas
+        
+        Args:
+            root (tk.Tk): Janela principal
+            gravacao_em_segundo_plano (bool): Se True, as refeições vão para uma fila
+                gravada por outra thread e a tela não espera o commit
+        """
         self.root = root
         self.root.title("Nutrismart - Sistema Nutricional")
         self.root.geometry("1000x700")
         self.root.configure(bg='#f0f0f0')
         
         self.usuario_atual = None
+        self.sessao = None  # Perfil do usuário logado, lido uma vez no login
         self.style = ttk.Style()
         self.style.theme_use('clam')
         
@@ -34,6 +63,16 @@ class InterfaceNutrismart:
             'pequena': ('Arial', 10)
         }
         
+        # Gravação em segundo plano: a thread de gravação devolve os resultados por esta fila,
+        # que é lida aqui na thread da interface (o Tkinter não pode ser usado de outra thread)
+        self.fila_gravacao = None
+        self.resultados_gravacao = queue.Queue()
+        if gravacao_em_segundo_plano:
+            self.fila_gravacao = FilaGravacao()
+            self.fila_gravacao.iniciar()
+            self.root.after(INTERVALO_VERIFICACAO_GRAVACAO_MS, self.verificar_gravacoes)
+        self.root.protocol("WM_DELETE_WINDOW", self.sair)
+        
         self.configurar_estilos()
         self.criar_menu_principal()
 
@@ -90,6 +129,7 @@ class InterfaceNutrismart:
                 ("Lembretes", "Alertas e recomendações", self.mostrar_lembretes),
                 ("Suporte", "Fale com nosso time", self.mostrar_suporte),
                 ("Editar Perfil", "Atualize seus dados", self.mostrar_edicao_perfil),
+                ("Relatórios", "Semanas e meses em números", self.mostrar_relatorios),
                 ("Sair", "Encerre sua sessão", self.fazer_logout)
             ]
         
@@ -113,11 +153,73 @@ class InterfaceNutrismart:
         # Rodapé
         rodape = ttk.Frame(frame_principal)
         rodape.pack(fill=tk.X, pady=10)
-        ttk.Button(rodape, text="Sair do Programa", command=self.root.quit).pack(side=tk.RIGHT)
+        ttk.Button(rodape, text="Sair do Programa", command=self.sair).pack(side=tk.RIGHT)
+
+    def sair(self):
+        """Grava as refeições que ainda estiverem na fila e fecha o programa"""
+        if self.fila_gravacao:
+            self.fila_gravacao.encerrar()
+            self.mostrar_resultados_gravacao()
+        self.root.destroy()
+
+    def verificar_gravacoes(self):
+        """Confere periodicamente os resultados da gravação em segundo plano"""
+        self.mostrar_resultados_gravacao()
+        if self.fila_gravacao:
+            self.atualizar_status_gravacao()
+        self.root.after(INTERVALO_VERIFICACAO_GRAVACAO_MS, self.verificar_gravacoes)
+
+    def mostrar_resultados_gravacao(self):
+        """Avisa o usuário das gravações em segundo plano que falharam"""
+        falhas = []
+        while True:
+            try:
+                sucesso, _, erro = self.resultados_gravacao.get_nowait()
+            except queue.Empty:
+                break
+            if not sucesso:
+                falhas.append(erro)
+        if falhas:
+            detalhes = "\n".join(f"- {erro}" for erro in falhas)
+            messagebox.showerror("Erro", f"{len(falhas)} refeição(ões) não foram gravadas:\n{detalhes}")
+
+    def atualizar_status_gravacao(self):
+        """Mostra na tela de registro a situação da fila de gravação"""
+        status = getattr(self, "status_gravacao", None)
+        if not status or not status.winfo_exists():
+            return
+        metricas = self.fila_gravacao.metricas()
+        status.config(text=f"Gravação em segundo plano: {metricas['profundidade']} pendente(s) | "
+                           f"commit médio {metricas['latencia_media_ms']:.1f} ms "
+                           f"(p95 {metricas['latencia_p95_ms']:.1f} ms)")
+
+    def aguardar(self, futuro, ao_concluir, botao=None):
+        """
+        Espera um cálculo feito em outra thread (senha, painel da população) sem travar a janela
+
+        Args:
+            futuro (concurrent.futures.Future): Cálculo em andamento
+            ao_concluir (callable): Chamada na thread da interface com (resultado, erro)
+            botao (ttk.Button, opcional): Desabilitado enquanto o cálculo não termina
+        """
+        if botao is not None and botao.winfo_exists():
+            botao.config(state=tk.DISABLED)
+
+        def conferir():
+            if not futuro.done():
+                self.root.after(INTERVALO_ESPERA_MS, conferir)
+                return
+            if botao is not None and botao.winfo_exists():
+                botao.config(state=tk.NORMAL)
+            erro = futuro.exception()
+            ao_concluir(None if erro else futuro.result(), erro)
+
+        conferir()
 
     def mostrar_tela_registro_refeicao(self):
         """Exibe a tela para registro de novas refeições"""
         self.limpar_tela()
+        self.prato_atual = []
         
         frame_principal = ttk.Frame(self.root)
         frame_principal.pack(expand=True, fill=tk.BOTH, padx=30, pady=20)
@@ -131,11 +233,30 @@ class InterfaceNutrismart:
         ttk.Label(frame_form, text="Alimento:").grid(row=0, column=0, padx=10, pady=10, sticky=tk.W)
         self.entrada_alimento = ttk.Entry(frame_form)
         self.entrada_alimento.grid(row=0, column=1, padx=10, pady=10, sticky=tk.EW)
+        self.entrada_alimento.bind("<KeyRelease>", self.atualizar_sugestoes_alimento)
+        self.entrada_alimento.bind("<Down>", lambda e: self.lista_sugestoes.focus_set())
+        
+        # Sugestões enquanto digita (autocompletar e "você quis dizer")
+        self.lista_sugestoes = tk.Listbox(frame_form, height=4)
+        self.lista_sugestoes.grid(row=1, column=1, padx=10, sticky=tk.EW)
+        self.lista_sugestoes.bind("<Double-Button-1>", self.escolher_sugestao_alimento)
+        self.lista_sugestoes.bind("<Return>", self.escolher_sugestao_alimento)
         
         # Campo Quantidade
-        ttk.Label(frame_form, text="Quantidade (gramas):").grid(row=1, column=0, padx=10, pady=10, sticky=tk.W)
+        ttk.Label(frame_form, text="Quantidade (gramas):").grid(row=2, column=0, padx=10, pady=10, sticky=tk.W)
         self.entrada_quantidade = ttk.Entry(frame_form)
-        self.entrada_quantidade.grid(row=1, column=1, padx=10, pady=10, sticky=tk.EW)
+        self.entrada_quantidade.grid(row=2, column=1, padx=10, pady=10, sticky=tk.EW)
+        
+        ttk.Button(frame_form, text="Adicionar ao prato",
+                command=self.adicionar_ao_prato).grid(row=3, column=1, padx=10, pady=10, sticky=tk.E)
+        
+        # Itens do prato ainda não registrados
+        self.tabela_prato = ttk.Treeview(frame_principal, columns=("Alimento", "Quantidade"), show="headings", height=6)
+        self.tabela_prato.heading("Alimento", text="Alimento")
+        self.tabela_prato.heading("Quantidade", text="Quantidade (g)")
+        self.tabela_prato.column("Alimento", width=250, anchor=tk.W)
+        self.tabela_prato.column("Quantidade", width=150, anchor=tk.CENTER)
+        self.tabela_prato.pack(padx=10, fill=tk.X)
         
         # Botões
         frame_botoes = ttk.Frame(frame_principal)
@@ -144,40 +265,106 @@ class InterfaceNutrismart:
         ttk.Button(frame_botoes, text="Registrar", style='BotaoPrimario.TButton',
                 command=self.registrar_refeicao).pack(side=tk.LEFT, padx=10)
         ttk.Button(frame_botoes, text="Voltar", command=self.criar_menu_principal).pack(side=tk.LEFT, padx=10)
+        
+        if self.fila_gravacao:
+            self.status_gravacao = ttk.Label(frame_principal, font=self.fontes['pequena'])
+            self.status_gravacao.pack()
+            self.atualizar_status_gravacao()
 
-    def registrar_refeicao(self):
-        """Processa o registro de uma nova refeição no banco de dados"""
+    def atualizar_sugestoes_alimento(self, event=None):
+        """Preenche a lista de sugestões com os alimentos que completam o texto digitado"""
+        texto = self.entrada_alimento.get().strip()
+        self.lista_sugestoes.delete(0, tk.END)
+        if not texto:
+            return
+        for nome in catalogo.autocompletar(texto, 8) or catalogo.sugerir(texto, 5):
+            self.lista_sugestoes.insert(tk.END, nome)
+
+    def escolher_sugestao_alimento(self, event=None):
+        """Copia a sugestão selecionada para o campo de alimento"""
+        selecao = self.lista_sugestoes.curselection()
+        if not selecao:
+            return
+        self.entrada_alimento.delete(0, tk.END)
+        self.entrada_alimento.insert(0, self.lista_sugestoes.get(selecao[0]))
+        self.lista_sugestoes.delete(0, tk.END)
+        self.entrada_quantidade.focus_set()
+
+    def ler_item_refeicao(self):
+        """Lê e valida os campos de alimento e quantidade; retorna (alimento, quantidade) ou None"""
         alimento = self.entrada_alimento.get().strip().lower()
         quantidade = self.entrada_quantidade.get().strip()
         
         if not alimento or not quantidade:
             messagebox.showerror("Erro", "Preencha todos os campos!")
-            return
+            return None
             
         try:
             quantidade = float(quantidade)
             if quantidade <= 0:
                 messagebox.showerror("Erro", "A quantidade deve ser maior que zero!")
-                return
+                return None
         except ValueError:
             messagebox.showerror("Erro", "Digite um valor numérico válido para a quantidade!")
+            return None
+        
+        if not catalogo.existe(alimento):
+            self.atualizar_sugestoes_alimento()
+            messagebox.showerror("Erro", catalogo.mensagem_nao_cadastrado(alimento))
+            return None
+        
+        return alimento, quantidade
+
+    def adicionar_ao_prato(self):
+        """Adiciona o alimento digitado à lista do prato e limpa os campos"""
+        item = self.ler_item_refeicao()
+        if not item:
             return
         
-        # Registra a refeição
+        self.prato_atual.append(item)
+        self.tabela_prato.insert("", tk.END, values=item)
+        self.entrada_alimento.delete(0, tk.END)
+        self.entrada_quantidade.delete(0, tk.END)
+        self.lista_sugestoes.delete(0, tk.END)
+        self.entrada_alimento.focus_set()
+
+    def registrar_refeicao(self):
+        """Registra de uma vez todos os alimentos do prato (e o que estiver digitado nos campos)"""
+        itens = list(self.prato_atual)
+        if self.entrada_alimento.get().strip() or self.entrada_quantidade.get().strip() or not itens:
+            item = self.ler_item_refeicao()
+            if not item:
+                return
+            itens.append(item)
+        
+        # Registra o prato
         try:
-            comida = Comida(self.usuario_atual)
-            sucesso, mensagem = comida.registrar_refeicao(alimento, quantidade)
+            comida = Comida(self.usuario_atual, self.sessao)
+            if self.fila_gravacao:
+                registrados, falhas = comida.registrar_refeicoes(
+                    itens, fila=self.fila_gravacao,
+                    ao_concluir=lambda *resultado: self.resultados_gravacao.put(resultado))
+            else:
+                registrados, falhas = comida.registrar_refeicoes(itens)
             
-            if sucesso:
-                messagebox.showinfo("Sucesso", mensagem)
-                self.criar_menu_principal()
+            if falhas:
+                detalhes = "\n".join(f"- {alimento}: {mensagem}" for alimento, mensagem in falhas)
+                messagebox.showerror("Erro", f"{registrados} alimento(s) registrado(s). Não registrados:\n{detalhes}")
+                
+                # Os itens válidos já foram gravados: esvazia o prato para que o usuário corrija o restante
+                self.prato_atual = []
+                self.tabela_prato.delete(*self.tabela_prato.get_children())
+                self.entrada_alimento.delete(0, tk.END)
+                self.entrada_quantidade.delete(0, tk.END)
             else:
-                messagebox.showerror("Erro", mensagem)
+                acao = "enviada para gravação" if self.fila_gravacao else "registrada com sucesso"
+                messagebox.showinfo("Sucesso", f"Refeição {acao} ({registrados} alimento(s))")
+                self.criar_menu_principal()
         except Exception as e:
             messagebox.showerror("Erro", f"Ocorreu um erro ao registrar a refeição: {str(e)}")
 
     def mostrar_historico_refeicoes(self):
-        """Exibe o histórico de refeições do usuário em formato de tabela"""
+        """Exibe o histórico de refeições do usuário em formato de tabela, carregado por páginas"""
         self.limpar_tela()
         
         frame_principal = ttk.Frame(self.root)
@@ -185,42 +372,90 @@ class InterfaceNutrismart:
         
         ttk.Label(frame_principal, text="Histórico de Refeições", style='Titulo.TLabel').pack(pady=10)
         
+        # Filtros
+        frame_filtros = ttk.Frame(frame_principal)
+        frame_filtros.pack(pady=5)
+        
+        ttk.Label(frame_filtros, text="Alimento:").pack(side=tk.LEFT)
+        self.filtro_alimento = ttk.Entry(frame_filtros, width=20)
+        self.filtro_alimento.pack(side=tk.LEFT, padx=5)
+        ttk.Label(frame_filtros, text="De (AAAA-MM-DD):").pack(side=tk.LEFT)
+        self.filtro_inicio = ttk.Entry(frame_filtros, width=12)
+        self.filtro_inicio.pack(side=tk.LEFT, padx=5)
+        ttk.Label(frame_filtros, text="Até:").pack(side=tk.LEFT)
+        self.filtro_fim = ttk.Entry(frame_filtros, width=12)
+        self.filtro_fim.pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_filtros, text="Filtrar", command=self.filtrar_historico).pack(side=tk.LEFT, padx=5)
+        
         frame_tabela = ttk.Frame(frame_principal, style='Card.TFrame')
         frame_tabela.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
         
         # Criar Treeview
         colunas = ("ID", "Alimento", "Quantidade (g)", "Calorias", "Data")
-        tabela = ttk.Treeview(frame_tabela, columns=colunas, show="headings", height=15)
+        self.tabela_historico = ttk.Treeview(frame_tabela, columns=colunas, show="headings", height=15)
         
         for col in colunas:
-            tabela.heading(col, text=col)
-            tabela.column(col, width=120, anchor=tk.CENTER)
+            self.tabela_historico.heading(col, text=col)
+            self.tabela_historico.column(col, width=120, anchor=tk.CENTER)
         
-        tabela.column("Alimento", width=200, anchor=tk.W)
-        tabela.column("Data", width=200)
+        self.tabela_historico.column("Alimento", width=200, anchor=tk.W)
+        self.tabela_historico.column("Data", width=200)
         
         # Barra de rolagem
-        scroll = ttk.Scrollbar(frame_tabela, orient=tk.VERTICAL, command=tabela.yview)
-        tabela.configure(yscroll=scroll.set)
+        scroll = ttk.Scrollbar(frame_tabela, orient=tk.VERTICAL, command=self.tabela_historico.yview)
+        self.tabela_historico.configure(yscroll=scroll.set)
         scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        tabela.pack(expand=True, fill=tk.BOTH)
-        
-        # Carregar dados
-        comida = Comida(self.usuario_atual)
-        refeicoes = comida.ver_refeicoes()
+        self.tabela_historico.pack(expand=True, fill=tk.BOTH)
         
-        if refeicoes:
-            for refeicao in refeicoes:
-                tabela.insert("", tk.END, values=refeicao)
-        else:
-            ttk.Label(frame_principal, text="Nenhuma refeição registrada ainda.").pack()
+        self.status_historico = ttk.Label(frame_principal, text="")
+        self.status_historico.pack()
         
         # Botões
         frame_botoes = ttk.Frame(frame_principal)
         frame_botoes.pack(pady=10)
         
+        self.botao_mais_historico = ttk.Button(frame_botoes, text="Carregar mais", command=self.carregar_pagina_historico)
+        self.botao_mais_historico.pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_botoes, text="Atualizar", command=self.mostrar_historico_refeicoes).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_botoes, text="Voltar", command=self.criar_menu_principal).pack(side=tk.LEFT, padx=5)
+        
+        # Carregar a primeira página
+        self.filtros_historico = {}
+        self.cursor_historico = None
+        self.carregar_pagina_historico()
+
+    def filtrar_historico(self):
+        """Aplica os filtros digitados e recarrega o histórico a partir da primeira página"""
+        alimento = self.filtro_alimento.get().strip().lower()
+        inicio = self.filtro_inicio.get().strip()
+        fim = self.filtro_fim.get().strip()
+        try:
+            intervalo = intervalo_datas(inicio or "1900-01-01", fim or date.today()) if inicio or fim else None
+        except ValueError:
+            messagebox.showerror("Erro", "Data inválida. Use o formato AAAA-MM-DD.")
+            return
+        
+        self.filtros_historico = {"alimento": alimento or None, "intervalo": intervalo}
+        self.cursor_historico = None
+        self.tabela_historico.delete(*self.tabela_historico.get_children())
+        self.carregar_pagina_historico()
+
+    def carregar_pagina_historico(self):
+        """Acrescenta a próxima página de refeições à tabela do histórico"""
+        comida = Comida(self.usuario_atual, self.sessao)
+        refeicoes, self.cursor_historico = comida.ver_refeicoes(apos=self.cursor_historico, **self.filtros_historico)
+        
+        for refeicao in refeicoes:
+            self.tabela_historico.insert("", tk.END, values=refeicao)
+        
+        total = len(self.tabela_historico.get_children())
+        if not total:
+            self.status_historico.config(text="Nenhuma refeição encontrada.")
+        elif self.cursor_historico is None:
+            self.status_historico.config(text=f"{total} refeição(ões) - fim do histórico.")
+        else:
+            self.status_historico.config(text=f"{total} refeição(ões) carregada(s).")
+        self.botao_mais_historico.config(state=tk.DISABLED if self.cursor_historico is None else tk.NORMAL)
 
     def mostrar_alimentos_recomendados(self):
         """Exibe alimentos recomendados baseados na dieta do usuário"""
@@ -234,17 +469,14 @@ class InterfaceNutrismart:
         frame_card = ttk.Frame(frame_principal, style='Card.TFrame')
         frame_card.pack(pady=20, padx=50, fill=tk.X)
         
-        # Obter recomendações
-        comida = Comida(self.usuario_atual)
-        
-        # Obter dieta do usuário
-        cursor.execute("SELECT dieta FROM usuarios WHERE email = ?", (self.usuario_atual,))
-        resultado = cursor.fetchone()
+        # Obter recomendações (e a dieta do usuário)
+        comida = Comida(self.usuario_atual, self.sessao)
+        resultado = comida.recomendar_alimentos()
         if not resultado:
             ttk.Label(frame_card, text="Usuário não encontrado.").pack()
             return
         
-        dieta_usuario = resultado[0]
+        dieta_usuario, recomendados = resultado
         
         # Mostrar dieta atual
         ttk.Label(frame_card, text=f"Dieta atual: {dieta_usuario}", font=self.fontes['subtitulo']).pack(pady=10)
@@ -252,52 +484,9 @@ class InterfaceNutrismart:
         # Mostrar alimentos recomendados
         ttk.Label(frame_card, text="\nAlimentos recomendados:", font=self.fontes['subtitulo']).pack(pady=5, anchor=tk.W)
         
-        recomendacoes = {
-            "Low carb": [
-                "Ovos", "Abacate", "Peixes", "Nozes", "Couve-flor", "Espinafre", "Brócolis", "Azeite de oliva",
-                "Amêndoas", "Queijo", "Cogumelos", "Carne bovina", "Salmão", "Aspargos", "Alface", "Cenoura",
-                "Tomate", "Pepino", "Pimentão", "Berinjela", "Abobrinha", "Castanha-do-pará", "Aipo", "Azeitona",
-                "Sementes de chia", "Sementes de linhaça", "Coco", "Framboesa", "Morango", "Repolho", "Alcachofra",
-                "Cebola", "Alho", "Rúcula", "Manjericão", "Salsinha", "Endívia", "Alcaparras", "Pimenta", "Ervilha-torta",
-                "Limão", "Laranja", "Carne de porco", "Frango", "Iogurte natural", "Ricota", "Chá verde", "Água com gás",
-                "Vinagre de maçã", "Café"
-            ],
-            "Cetogênica": [
-                "Bacon", "Queijo cheddar", "Carne de cordeiro", "Manteiga", "Nata", "Óleo de coco", "Salmão selvagem",
-                "Ovos caipiras", "Espinafre", "Couve", "Brócolis", "Couve-flor", "Abacate", "Nozes", "Castanhas",
-                "Sementes de abóbora", "Azeitonas", "Chá de hortelã", "Café sem açúcar", "Queijo parmesão",
-                "Frango caipira", "Carne moída", "Camarão", "Atum", "Aspargos", "Abobrinha", "Cogumelos", "Alho",
-                "Cebola", "Pimenta", "Ervas frescas", "Alface", "Rúcula", "Salsa", "Manjericão", "Nata fresca",
-                "Creme de leite", "Óleo MCT", "Chá de camomila", "Queijo mozzarella", "Carne bovina", "Carne de porco",
-                "Peixes gordurosos", "Sementes de chia", "Sementes de linhaça", "Abacate", "Limão", "Vinagre de maçã",
-                "Água mineral"
-            ],
-            "Hiperproteica": [
-                "Peito de frango", "Clara de ovo", "Carne magra", "Peixes", "Queijo cottage", "Iogurte grego",
-                "Atum", "Carne bovina magra", "Salmão", "Ovos inteiros", "Tofu", "Tempeh", "Lentilhas", "Feijão",
-                "Quinoa", "Amêndoas", "Nozes", "Sementes de abóbora", "Camarão", "Proteína isolada", "Leite desnatado",
-                "Ricota", "Brócolis", "Couve-flor", "Espinafre", "Cenoura", "Abobrinha", "Alface", "Tomate",
-                "Pepino", "Pimentão", "Azeite de oliva", "Chá verde", "Água"
-            ],
-            "Bulking": [
-                "Arroz integral", "Batata doce", "Aveia", "Massas integrais", "Carne vermelha", "Peito de frango",
-                "Ovos", "Salmão", "Atum", "Quinoa", "Feijão", "Grão-de-bico", "Lentilha", "Leite integral",
-                "Iogurte natural", "Queijo", "Nozes", "Amêndoas", "Castanha-do-pará", "Abacate", "Banana",
-                "Morangos", "Espinafre", "Brócolis", "Cenoura", "Abobrinha", "Tomate", "Pepino", "Pimentão",
-                "Azeite de oliva", "Manteiga de amendoim", "Chá verde", "Água", "Mel", "Chocolate amargo",
-                "Batata inglesa", "Milho", "Pão integral", "Sementes de chia", "Sementes de linhaça", "Ervilha"
-            ]
-        }
-        
-        alimentos_recomendados = recomendacoes.get(dieta_usuario, [])
-        
-        if alimentos_recomendados:
-            # Selecionar 4 aleatórios
-            import random
-            aleatorios = random.sample(alimentos_recomendados, k=min(4, len(alimentos_recomendados)))
-            
-            for alimento in aleatorios:
-                ttk.Label(frame_card, text=f"- {alimento}").pack(anchor=tk.W, pady=2)
+        if recomendados:
+            for alimento in recomendados:
+                ttk.Label(frame_card, text=f"- {alimento.capitalize()}").pack(anchor=tk.W, pady=2)
         else:
             ttk.Label(frame_card, text="Nenhuma recomendação disponível para esta dieta.").pack()
         
@@ -315,50 +504,38 @@ class InterfaceNutrismart:
         frame_card = ttk.Frame(frame_principal, style='Card.TFrame')
         frame_card.pack(pady=20, padx=50, fill=tk.X)
         
-        # Obter dados do usuário
-        cursor.execute("SELECT dieta, peso, altura FROM usuarios WHERE email = ?", (self.usuario_atual,))
-        resultado = cursor.fetchone()
-        if not resultado:
+        # Dados do usuário, já carregados na sessão
+        perfil = self.sessao.perfil
+        if not perfil:
             ttk.Label(frame_card, text="Usuário não encontrado.").pack()
             ttk.Button(frame_principal, text="Voltar", command=self.criar_menu_principal).pack(pady=20)
             return
         
-        dieta_usuario, peso, altura = resultado
+        dieta_usuario = perfil.dieta
         
-        # Obter refeições do dia
+        # Obter o total do dia
         hoje = date.today().strftime("%Y-%m-%d")
-        cursor.execute('''
-            SELECT r.alimento, r.quantidade_gramas, a.calorias
-            FROM refeicoes r
-            JOIN alimentos a ON r.alimento = a.nome
-            WHERE r.email_usuario = ? AND date(r.data) = ?
-        ''', (self.usuario_atual, hoje))
-        refeicoes_hoje = cursor.fetchall()
+        total_hoje = RepositorioTotaisDiarios.buscar(self.usuario_atual, hoje)
         
-        if not refeicoes_hoje:
+        if not total_hoje:
             ttk.Label(frame_card, text="Nenhuma refeição registrada para hoje.").pack()
             ttk.Button(frame_principal, text="Voltar", command=self.criar_menu_principal).pack(pady=20)
             return
         
-        # Calcular calorias totais
-        calorias_totais = 0
-        for alimento, quantidade, cal_100g in refeicoes_hoje:
-            calorias_totais += (cal_100g * quantidade) / 100
-        calorias_totais = round(calorias_totais, 2)
-        
-        # Calcular meta calórica
-        metas = {
-            "Low carb": 25 * peso,
-            "Cetogênica": 27 * peso,
-            "Hiperproteica": 30 * peso,
-            "Bulking": 35 * peso
-        }
-        meta_calorias = metas.get(dieta_usuario, 30 * peso)
+        calorias_totais = round(total_hoje[0], 2)
+        
+        # Meta calórica da dieta
+        meta_calorias = perfil.meta_calorias
         
         # Exibir resultados
         ttk.Label(frame_card, text=f"Dieta: {dieta_usuario}").pack(anchor=tk.W, pady=5)
         ttk.Label(frame_card, text=f"Calorias consumidas hoje: {calorias_totais} kcal").pack(anchor=tk.W, pady=5)
         ttk.Label(frame_card, text=f"Meta calórica diária: {meta_calorias} kcal").pack(anchor=tk.W, pady=5)
+
+        _, _, proteinas, carboidratos, gorduras = total_hoje
+        ttk.Label(frame_card, text=f"Proteínas: {proteinas:.1f} g").pack(anchor=tk.W, pady=5)
+        ttk.Label(frame_card, text=f"Carboidratos: {carboidratos:.1f} g").pack(anchor=tk.W, pady=5)
+        ttk.Label(frame_card, text=f"Gorduras: {gorduras:.1f} g").pack(anchor=tk.W, pady=5)
         
         # Avaliação
         if calorias_totais < meta_calorias * 0.9:
@@ -384,6 +561,24 @@ class InterfaceNutrismart:
         
         ttk.Label(frame_principal, text="Ranking de Alimentos", style='Titulo.TLabel').pack(pady=10)
         
+        # Seletor de período
+        periodos = {"Todo o período": None, "Últimos 7 dias": 7, "Últimos 30 dias": 30}
+        if not hasattr(self, 'periodo_ranking'):
+            self.periodo_ranking = "Todo o período"
+        
+        frame_periodo = ttk.Frame(frame_principal)
+        frame_periodo.pack(pady=5)
+        ttk.Label(frame_periodo, text="Período:").pack(side=tk.LEFT, padx=5)
+        combo_periodo = ttk.Combobox(frame_periodo, values=list(periodos), state="readonly")
+        combo_periodo.set(self.periodo_ranking)
+        combo_periodo.pack(side=tk.LEFT, padx=5)
+        
+        def trocar_periodo(event):
+            self.periodo_ranking = combo_periodo.get()
+            self.mostrar_ranking_alimentos()
+        
+        combo_periodo.bind("<<ComboboxSelected>>", trocar_periodo)
+        
         frame_tabela = ttk.Frame(frame_principal, style='Card.TFrame')
         frame_tabela.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
         
@@ -405,15 +600,9 @@ class InterfaceNutrismart:
         tabela.pack(expand=True, fill=tk.BOTH)
         
         # Carregar dados
-        cursor.execute('''
-            SELECT alimento, SUM(quantidade_gramas) as total_gramas
-            FROM refeicoes
-            WHERE email_usuario = ?
-            GROUP BY alimento
-            ORDER BY total_gramas DESC
-            LIMIT 10
-        ''', (self.usuario_atual,))
-        ranking = cursor.fetchall()
+        dias = periodos.get(self.periodo_ranking)
+        intervalo = intervalo_ultimos_dias(dias) if dias else None
+        ranking = RepositorioRefeicoes.ranking(self.usuario_atual, limite=10, intervalo=intervalo)
         
         if ranking:
             for i, (alimento, total) in enumerate(ranking, 1):
@@ -428,6 +617,116 @@ class InterfaceNutrismart:
         ttk.Button(frame_botoes, text="Atualizar", command=self.mostrar_ranking_alimentos).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_botoes, text="Voltar", command=self.criar_menu_principal).pack(side=tk.LEFT, padx=5)
 
+    def mostrar_relatorios(self):
+        """Exibe calorias e macronutrientes dia a dia de um período, com médias móveis e aderência à meta"""
+        self.limpar_tela()
+        
+        frame_principal = ttk.Frame(self.root)
+        frame_principal.pack(expand=True, fill=tk.BOTH, padx=20, pady=20)
+        
+        ttk.Label(frame_principal, text="Relatórios", style='Titulo.TLabel').pack(pady=10)
+        
+        # Seletor de período
+        periodos = {
+            "Esta semana": lambda: relatorio_semana(self.usuario_atual, perfil=self.sessao.perfil),
+            "Este mês": lambda: relatorio_mes(self.usuario_atual, perfil=self.sessao.perfil),
+            "Últimos 30 dias": lambda: gerar_relatorio(self.usuario_atual, intervalo_ultimos_dias(30),
+                                                       self.sessao.perfil),
+        }
+        if not hasattr(self, 'periodo_relatorio'):
+            self.periodo_relatorio = "Esta semana"
+        
+        frame_periodo = ttk.Frame(frame_principal)
+        frame_periodo.pack(pady=5)
+        ttk.Label(frame_periodo, text="Período:").pack(side=tk.LEFT, padx=5)
+        combo_periodo = ttk.Combobox(frame_periodo, values=list(periodos), state="readonly")
+        combo_periodo.set(self.periodo_relatorio if self.periodo_relatorio in periodos else "")
+        combo_periodo.pack(side=tk.LEFT, padx=5)
+        
+        def trocar_periodo(event):
+            self.periodo_relatorio = combo_periodo.get()
+            self.mostrar_relatorios()
+        
+        combo_periodo.bind("<<ComboboxSelected>>", trocar_periodo)
+        
+        # Período personalizado
+        ttk.Label(frame_periodo, text="De:").pack(side=tk.LEFT, padx=5)
+        entrada_inicio = ttk.Entry(frame_periodo, width=12)
+        entrada_inicio.pack(side=tk.LEFT)
+        ttk.Label(frame_periodo, text="Até:").pack(side=tk.LEFT, padx=5)
+        entrada_fim = ttk.Entry(frame_periodo, width=12)
+        entrada_fim.pack(side=tk.LEFT)
+        if isinstance(self.periodo_relatorio, tuple):
+            entrada_inicio.insert(0, self.periodo_relatorio[0])
+            entrada_fim.insert(0, self.periodo_relatorio[1])
+        
+        def aplicar_datas():
+            self.periodo_relatorio = (entrada_inicio.get().strip(), entrada_fim.get().strip())
+            self.mostrar_relatorios()
+        
+        ttk.Button(frame_periodo, text="Aplicar", command=aplicar_datas).pack(side=tk.LEFT, padx=5)
+        
+        # Carregar dados
+        try:
+            if isinstance(self.periodo_relatorio, tuple):
+                relatorio = relatorio_datas(self.usuario_atual, *self.periodo_relatorio, self.sessao.perfil)
+            else:
+                relatorio = periodos[self.periodo_relatorio]()
+        except ValueError:
+            messagebox.showerror("Erro", "Data inválida. Use o formato AAAA-MM-DD.")
+            self.periodo_relatorio = "Esta semana"
+            relatorio = periodos[self.periodo_relatorio]()
+        
+        if not relatorio:
+            ttk.Label(frame_principal, text="Usuário não encontrado.").pack()
+            ttk.Button(frame_principal, text="Voltar", command=self.criar_menu_principal).pack(pady=20)
+            return
+        
+        # Resumo
+        frame_resumo = ttk.Frame(frame_principal, style='Card.TFrame')
+        frame_resumo.pack(pady=5, padx=10, fill=tk.X)
+        ttk.Label(frame_resumo, text=f"Dieta: {relatorio['dieta']} | Meta diária: {relatorio['meta']:.0f} kcal").pack(anchor=tk.W, pady=2)
+        if relatorio["aderencia"] is None:
+            ttk.Label(frame_resumo, text="Nenhuma refeição registrada no período.").pack(anchor=tk.W, pady=2)
+        else:
+            ttk.Label(frame_resumo, text=f"Média do período: {relatorio['media_calorias']:.0f} kcal/dia").pack(anchor=tk.W, pady=2)
+            ttk.Label(frame_resumo, text=f"Aderência à meta: {relatorio['aderencia']:.0%} dos dias registrados").pack(anchor=tk.W, pady=2)
+        
+        frame_tabela = ttk.Frame(frame_principal, style='Card.TFrame')
+        frame_tabela.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        
+        # Criar Treeview
+        colunas = ("Dia", "Calorias", "Proteínas (g)", "Carboidratos (g)", "Gorduras (g)", "Média 7d", "Média 30d", "Meta")
+        tabela = ttk.Treeview(frame_tabela, columns=colunas, show="headings", height=12)
+        
+        for col in colunas:
+            tabela.heading(col, text=col)
+            tabela.column(col, width=100, anchor=tk.CENTER)
+        
+        # Barra de rolagem
+        scroll = ttk.Scrollbar(frame_tabela, orient=tk.VERTICAL, command=tabela.yview)
+        tabela.configure(yscroll=scroll.set)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        tabela.pack(expand=True, fill=tk.BOTH)
+        
+        for dia in relatorio["dias"]:
+            data = dia.dia.strftime("%d/%m/%Y")
+            if not dia.refeicoes:
+                tabela.insert("", tk.END, values=(data, "-", "-", "-", "-", "-", "-", "Sem registros"))
+                continue
+            tabela.insert("", tk.END, values=(
+                data, f"{dia.calorias:.0f}", f"{dia.proteinas:.1f}", f"{dia.carboidratos:.1f}", f"{dia.gorduras:.1f}",
+                f"{dia.media_7:.0f}" if dia.media_7 is not None else "-",
+                f"{dia.media_30:.0f}" if dia.media_30 is not None else "-",
+                "✅" if dia.na_meta else "⚠️"))
+        
+        # Botões
+        frame_botoes = ttk.Frame(frame_principal)
+        frame_botoes.pack(pady=10)
+        
+        ttk.Button(frame_botoes, text="Atualizar", command=self.mostrar_relatorios).pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_botoes, text="Voltar", command=self.criar_menu_principal).pack(side=tk.LEFT, padx=5)
+
     def mostrar_lembretes(self):
         """Exibe lembretes e alertas para o usuário"""
         self.limpar_tela()
@@ -440,16 +739,13 @@ class InterfaceNutrismart:
         frame_card = ttk.Frame(frame_principal, style='Card.TFrame')
         frame_card.pack(pady=20, padx=50, fill=tk.X)
         
-        # Obter registros do dia
-        hoje = date.today()
-        cursor.execute("SELECT * FROM refeicoes WHERE email_usuario = ? AND date(data) = ?", 
-                      (self.usuario_atual, str(hoje)))
-        registros = cursor.fetchall()
+        # Contar refeições do dia
+        refeicoes_hoje = Registros(self.usuario_atual, self.sessao).contar_refeicoes_do_dia()
         
-        if not registros:
+        if not refeicoes_hoje:
             ttk.Label(frame_card, text="Você ainda não registrou refeições hoje!").pack(pady=10)
         else:
-            ttk.Label(frame_card, text=f"Você registrou {len(registros)} refeições hoje").pack(pady=10)
+            ttk.Label(frame_card, text=f"Você registrou {refeicoes_hoje} refeições hoje").pack(pady=10)
         
         ttk.Label(frame_card, text="Lembrete: Beba pelo menos 2 litros de água ao longo do dia!").pack(pady=10)
         
@@ -517,11 +813,7 @@ class InterfaceNutrismart:
         try:
             data_hora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            cursor.execute("""
-                INSERT INTO suporte (email, mensagem, data_hora) 
-                VALUES (?, ?, ?)
-            """, (self.usuario_atual, mensagem, data_hora))
-            conn.commit()
+            RepositorioSuporte.inserir(self.usuario_atual, mensagem, data_hora)
             
             messagebox.showinfo("Sucesso", "Mensagem enviada com sucesso!")
             self.texto_mensagem.delete("1.0", tk.END)
@@ -534,14 +826,7 @@ class InterfaceNutrismart:
         for item in self.tabela_mensagens.get_children():
             self.tabela_mensagens.delete(item)
             
-        cursor.execute("""
-            SELECT data_hora, mensagem, resposta 
-            FROM suporte 
-            WHERE email = ?
-            ORDER BY data_hora DESC
-        """, (self.usuario_atual,))
-        
-        for linha in cursor.fetchall():
+        for linha in RepositorioSuporte.listar_por_usuario(self.usuario_atual):
             self.tabela_mensagens.insert("", tk.END, values=linha)
 
     def mostrar_edicao_perfil(self):
@@ -553,15 +838,14 @@ class InterfaceNutrismart:
         
         ttk.Label(frame_principal, text="Editar Perfil", style='Titulo.TLabel').pack(pady=10)
         
-        # Obter dados atuais do usuário
-        cursor.execute("SELECT peso, altura, dieta FROM usuarios WHERE email = ?", (self.usuario_atual,))
-        resultado = cursor.fetchone()
-        if not resultado:
+        # Dados atuais do usuário, já carregados na sessão
+        perfil = self.sessao.perfil
+        if not perfil:
             messagebox.showerror("Erro", "Usuário não encontrado!")
             self.criar_menu_principal()
             return
         
-        peso, altura, dieta = resultado
+        dieta, peso, altura = perfil.dieta, perfil.peso, perfil.altura
         
         frame_form = ttk.Frame(frame_principal, style='Card.TFrame')
         frame_form.pack(pady=20, padx=50, fill=tk.X)
@@ -605,12 +889,8 @@ class InterfaceNutrismart:
                 
             novo_imc = novo_peso / (nova_altura ** 2)
             
-            cursor.execute("""
-                UPDATE usuarios 
-                SET peso = ?, altura = ?, dieta = ?, imc = ?
-                WHERE email = ?
-            """, (novo_peso, nova_altura, nova_dieta, novo_imc, self.usuario_atual))
-            conn.commit()
+            RepositorioUsuarios.atualizar_dados(self.usuario_atual, novo_peso, nova_altura, nova_dieta, novo_imc)
+            self.sessao.invalidar()
             
             messagebox.showinfo("Sucesso", "Dados atualizados com sucesso!")
             self.criar_menu_principal()
@@ -649,8 +929,9 @@ class InterfaceNutrismart:
         frame_botoes = ttk.Frame(frame_principal)
         frame_botoes.pack(pady=20)
         
-        ttk.Button(frame_botoes, text="Cadastrar", style='BotaoPrimario.TButton',
-                command=self.cadastrar_usuario).pack(side=tk.LEFT, padx=10)
+        self.botao_cadastrar = ttk.Button(frame_botoes, text="Cadastrar", style='BotaoPrimario.TButton',
+                command=self.cadastrar_usuario)
+        self.botao_cadastrar.pack(side=tk.LEFT, padx=10)
         ttk.Button(frame_botoes, text="Voltar", command=self.criar_menu_principal).pack(side=tk.LEFT, padx=10)
 
     def cadastrar_usuario(self):
@@ -681,8 +962,7 @@ class InterfaceNutrismart:
             return
         
         # Verificar se email já existe
-        cursor.execute("SELECT email FROM usuarios WHERE email = ?", (email,))
-        if cursor.fetchone():
+        if RepositorioUsuarios.existe(email):
             messagebox.showerror("Erro", "E-mail já cadastrado!")
             return
         
@@ -699,18 +979,19 @@ class InterfaceNutrismart:
         # Calcular IMC
         imc = peso / (altura ** 2)
         
-        # Inserir no banco
-        try:
-            cursor.execute("""
-                INSERT INTO usuarios (email, senha, peso, altura, sexo, dieta, imc, pergunta_seguranca, resposta_seguranca)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (email, senha, peso, altura, sexo, dieta, imc, pergunta, resposta))
-            conn.commit()
-            
-            messagebox.showinfo("Sucesso", "Usuário cadastrado com sucesso!")
-            self.criar_menu_principal()
-        except Exception as e:
-            messagebox.showerror("Erro", f"Não foi possível cadastrar: {str(e)}")
+        # Inserir no banco, depois de calcular o hash da senha em outra thread
+        def inserir(hash_senha, erro):
+            try:
+                if erro:
+                    raise erro
+                RepositorioUsuarios.inserir(email, hash_senha, peso, altura, sexo, dieta, imc, pergunta, resposta)
+                
+                messagebox.showinfo("Sucesso", "Usuário cadastrado com sucesso!")
+                self.criar_menu_principal()
+            except Exception as e:
+                messagebox.showerror("Erro", f"Não foi possível cadastrar: {str(e)}")
+        
+        self.aguardar(gerar_hash_async(senha), inserir, self.botao_cadastrar)
 
     def selecionar_dieta(self):
         """Abre uma janela para seleção da dieta"""
@@ -805,8 +1086,9 @@ class InterfaceNutrismart:
         frame_botoes = ttk.Frame(frame_principal)
         frame_botoes.pack(pady=20)
         
-        ttk.Button(frame_botoes, text="Entrar", style='BotaoPrimario.TButton',
-                command=self.fazer_login).pack(side=tk.LEFT, padx=10)
+        self.botao_entrar = ttk.Button(frame_botoes, text="Entrar", style='BotaoPrimario.TButton',
+                command=self.fazer_login)
+        self.botao_entrar.pack(side=tk.LEFT, padx=10)
         ttk.Button(frame_botoes, text="Recuperar Senha",
                 command=self.mostrar_recuperacao_senha).pack(side=tk.LEFT, padx=10)
         ttk.Button(frame_botoes, text="Voltar", command=self.criar_menu_principal).pack(side=tk.LEFT, padx=10)
@@ -820,15 +1102,20 @@ class InterfaceNutrismart:
             messagebox.showerror("Erro", "Preencha todos os campos!")
             return
             
-        cursor.execute("SELECT senha FROM usuarios WHERE email = ?", (email,))
-        resultado = cursor.fetchone()
+        # A senha é conferida em outra thread; a janela continua respondendo
+        def concluir(autenticado, erro):
+            if erro:
+                messagebox.showerror("Erro", f"Não foi possível fazer o login: {str(erro)}")
+            elif autenticado:
+                self.usuario_atual = email
+                self.sessao = Sessao(email)
+                self.sessao.carregar()
+                messagebox.showinfo("Sucesso", "Login realizado com sucesso!")
+                self.criar_menu_principal()
+            else:
+                messagebox.showerror("Erro", "E-mail ou senha incorretos!")
         
-        if resultado and resultado[0] == senha:
-            self.usuario_atual = email
-            messagebox.showinfo("Sucesso", "Login realizado com sucesso!")
-            self.criar_menu_principal()
-        else:
-            messagebox.showerror("Erro", "E-mail ou senha incorretos!")
+        self.aguardar(autenticar_async(email, senha), concluir, self.botao_entrar)
 
     def mostrar_recuperacao_senha(self):
         """Exibe a tela de recuperação de senha"""
@@ -852,22 +1139,17 @@ class InterfaceNutrismart:
                 messagebox.showerror("Erro", "Digite seu e-mail!")
                 return
                 
-            cursor.execute("""
-                SELECT pergunta_seguranca, resposta_seguranca, senha 
-                FROM usuarios 
-                WHERE email = ?
-            """, (email,))
-            resultado = cursor.fetchone()
+            resultado = RepositorioUsuarios.buscar_recuperacao(email)
             
             if not resultado:
                 messagebox.showerror("Erro", "E-mail não encontrado!")
                 return
                 
-            pergunta, resposta, senha = resultado
+            pergunta, resposta = resultado
             
             janela_pergunta = tk.Toplevel(janela)
             janela_pergunta.title("Pergunta de Segurança")
-            janela_pergunta.geometry("500x300")
+            janela_pergunta.geometry("500x400")
             
             ttk.Label(janela_pergunta, text=pergunta, style='Titulo.TLabel').pack(pady=20)
             
@@ -875,16 +1157,32 @@ class InterfaceNutrismart:
             self.rec_resposta = ttk.Entry(janela_pergunta)
             self.rec_resposta.pack(pady=10, padx=20, fill=tk.X)
             
+            # A senha fica gravada como hash, então não há como mostrá-la: o usuário define outra
+            ttk.Label(janela_pergunta, text="Nova senha:").pack(pady=10)
+            self.rec_nova_senha = ttk.Entry(janela_pergunta, show="*")
+            self.rec_nova_senha.pack(pady=10, padx=20, fill=tk.X)
+            
+            def redefinir(hash_senha, erro):
+                if erro:
+                    messagebox.showerror("Erro", f"Não foi possível redefinir a senha: {str(erro)}")
+                    return
+                RepositorioUsuarios.atualizar_senha(email, hash_senha)
+                messagebox.showinfo("Sucesso", "Senha redefinida com sucesso!")
+                janela.destroy()
+            
             def verificar():
-                if self.rec_resposta.get().strip().lower() == resposta.lower():
-                    messagebox.showinfo("Sua Senha", f"Sua senha é: {senha}")
-                    janela_pergunta.destroy()
-                    janela.destroy()
-                else:
+                if self.rec_resposta.get().strip().lower() != resposta.lower():
                     messagebox.showerror("Erro", "Resposta incorreta!")
+                    return
+                nova_senha = self.rec_nova_senha.get().strip()
+                if not nova_senha:
+                    messagebox.showerror("Erro", "A senha não pode ser vazia!")
+                    return
+                self.aguardar(gerar_hash_async(nova_senha), redefinir, botao_verificar)
             
-            ttk.Button(janela_pergunta, text="Verificar", style='BotaoPrimario.TButton',
-                    command=verificar).pack(pady=20)
+            botao_verificar = ttk.Button(janela_pergunta, text="Redefinir Senha", style='BotaoPrimario.TButton',
+                    command=verificar)
+            botao_verificar.pack(pady=20)
         
         frame_botoes = ttk.Frame(janela)
         frame_botoes.pack(pady=20)
@@ -941,6 +1239,7 @@ class InterfaceNutrismart:
             ("Listar Usuários", "Veja todos os usuários", self.mostrar_lista_usuarios_admin),
             ("Excluir Alimento", "Remova alimentos", self.mostrar_exclusao_alimento),
             ("Gerenciar Suporte", "Responda mensagens", self.mostrar_suporte_admin),
+            ("Painel da População", "IMC, dietas, calorias e usuários ativos", self.mostrar_painel_admin),
             ("Voltar", "Retornar ao menu", self.criar_menu_principal)
         ]
         
@@ -1007,15 +1306,13 @@ class InterfaceNutrismart:
             return
         
         # Verificar se alimento já existe
-        cursor.execute("SELECT nome FROM alimentos WHERE nome = ?", (nome,))
-        if cursor.fetchone():
+        if catalogo.existe(nome):
             messagebox.showerror("Erro", "Alimento já cadastrado!")
             return
         
         # Inserir no banco
         try:
-            cursor.execute("INSERT INTO alimentos (nome, calorias) VALUES (?, ?)", (nome, calorias))
-            conn.commit()
+            catalogo.inserir(nome, calorias)
             messagebox.showinfo("Sucesso", "Alimento cadastrado com sucesso!")
             self.mostrar_menu_admin()
         except Exception as e:
@@ -1046,8 +1343,7 @@ class InterfaceNutrismart:
         scroll.pack(side=tk.RIGHT, fill=tk.Y)
         tabela.pack(expand=True, fill=tk.BOTH)
         
-        cursor.execute("SELECT nome, calorias FROM alimentos ORDER BY nome")
-        for linha in cursor.fetchall():
+        for linha in catalogo.listar():
             tabela.insert("", tk.END, values=linha)
         
         frame_botoes = ttk.Frame(frame_principal)
@@ -1057,7 +1353,7 @@ class InterfaceNutrismart:
         ttk.Button(frame_botoes, text="Voltar", command=self.mostrar_menu_admin).pack(side=tk.LEFT, padx=5)
 
     def mostrar_lista_usuarios_admin(self):
-        """Exibe a lista de usuários cadastrados (admin)"""
+        """Exibe a lista de usuários cadastrados (admin), carregada por páginas"""
         self.limpar_tela()
         
         frame_principal = ttk.Frame(self.root)
@@ -1065,33 +1361,203 @@ class InterfaceNutrismart:
         
         ttk.Label(frame_principal, text="Lista de Usuários", style='Titulo.TLabel').pack(pady=10)
         
+        # Filtros e ordenação
+        frame_filtros = ttk.Frame(frame_principal)
+        frame_filtros.pack(pady=5)
+        
+        ttk.Label(frame_filtros, text="Dieta:").pack(side=tk.LEFT)
+        self.filtro_dieta_usuarios = ttk.Combobox(frame_filtros, values=["Todas"] + list(METAS_POR_KG),
+                                                  state="readonly", width=13)
+        self.filtro_dieta_usuarios.set("Todas")
+        self.filtro_dieta_usuarios.pack(side=tk.LEFT, padx=5)
+        ttk.Label(frame_filtros, text="Sexo:").pack(side=tk.LEFT)
+        self.filtro_sexo_usuarios = ttk.Combobox(frame_filtros, values=["Todos", "M", "F"], state="readonly", width=6)
+        self.filtro_sexo_usuarios.set("Todos")
+        self.filtro_sexo_usuarios.pack(side=tk.LEFT, padx=5)
+        ttk.Label(frame_filtros, text="IMC:").pack(side=tk.LEFT)
+        self.filtro_faixa_usuarios = ttk.Combobox(frame_filtros, values=["Todas"] + [nome for nome, _, _ in FAIXAS_IMC],
+                                                  state="readonly", width=14)
+        self.filtro_faixa_usuarios.set("Todas")
+        self.filtro_faixa_usuarios.pack(side=tk.LEFT, padx=5)
+        ttk.Label(frame_filtros, text="Ordenar por:").pack(side=tk.LEFT)
+        self.ordem_usuarios = ttk.Combobox(frame_filtros, values=[texto for texto, _ in ORDENS_LISTAGEM],
+                                           state="readonly", width=8)
+        self.ordem_usuarios.set(ORDENS_LISTAGEM[0][0])
+        self.ordem_usuarios.pack(side=tk.LEFT, padx=5)
+        self.decrescente_usuarios = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame_filtros, text="Decrescente", variable=self.decrescente_usuarios).pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_filtros, text="Filtrar", command=self.filtrar_usuarios_admin).pack(side=tk.LEFT, padx=5)
+        
         frame_tabela = ttk.Frame(frame_principal, style='Card.TFrame')
         frame_tabela.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
         
         colunas = ("Email", "Peso", "Altura", "Sexo", "Dieta", "IMC")
-        tabela = ttk.Treeview(frame_tabela, columns=colunas, show="headings", height=15)
+        self.tabela_usuarios = ttk.Treeview(frame_tabela, columns=colunas, show="headings", height=15)
         
         for col in colunas:
-            tabela.heading(col, text=col)
-            tabela.column(col, width=120, anchor=tk.CENTER)
+            self.tabela_usuarios.heading(col, text=col)
+            self.tabela_usuarios.column(col, width=120, anchor=tk.CENTER)
         
-        tabela.column("Email", width=200, anchor=tk.W)
-        tabela.column("Dieta", width=120)
+        self.tabela_usuarios.column("Email", width=200, anchor=tk.W)
+        self.tabela_usuarios.column("Dieta", width=120)
         
-        scroll = ttk.Scrollbar(frame_tabela, orient=tk.VERTICAL, command=tabela.yview)
-        tabela.configure(yscroll=scroll.set)
+        scroll = ttk.Scrollbar(frame_tabela, orient=tk.VERTICAL, command=self.tabela_usuarios.yview)
+        self.tabela_usuarios.configure(yscroll=scroll.set)
         scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        tabela.pack(expand=True, fill=tk.BOTH)
+        self.tabela_usuarios.pack(expand=True, fill=tk.BOTH)
         
-        cursor.execute("SELECT email, peso, altura, sexo, dieta, imc FROM usuarios")
-        for linha in cursor.fetchall():
-            tabela.insert("", tk.END, values=linha)
+        self.status_usuarios = ttk.Label(frame_principal, text="")
+        self.status_usuarios.pack()
         
         frame_botoes = ttk.Frame(frame_principal)
         frame_botoes.pack(pady=10)
         
+        self.botao_mais_usuarios = ttk.Button(frame_botoes, text="Carregar mais", command=self.carregar_pagina_usuarios)
+        self.botao_mais_usuarios.pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_botoes, text="Atualizar", command=self.mostrar_lista_usuarios_admin).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_botoes, text="Voltar", command=self.mostrar_menu_admin).pack(side=tk.LEFT, padx=5)
+        
+        # Carregar a primeira página
+        self.filtrar_usuarios_admin()
+
+    def filtrar_usuarios_admin(self):
+        """Aplica os filtros e a ordem escolhidos e recarrega a lista a partir da primeira página"""
+        dieta = self.filtro_dieta_usuarios.get()
+        sexo = self.filtro_sexo_usuarios.get()
+        faixas = [nome for nome, _, _ in FAIXAS_IMC]
+        faixa = self.filtro_faixa_usuarios.get()
+        
+        self.filtros_usuarios = {
+            "dieta": dieta if dieta != "Todas" else None,
+            "sexo": sexo if sexo != "Todos" else None,
+            "faixa_imc": faixas.index(faixa) if faixa in faixas else None,
+        }
+        self.ordem_listagem_usuarios = dict(ORDENS_LISTAGEM)[self.ordem_usuarios.get()]
+        self.decrescente_listagem_usuarios = self.decrescente_usuarios.get()
+        # O total vem da contagem por grupo, sem contar a tabela de usuários
+        self.total_usuarios = RepositorioUsuarios.contar(**self.filtros_usuarios)
+        self.cursor_usuarios = None
+        self.tabela_usuarios.delete(*self.tabela_usuarios.get_children())
+        self.carregar_pagina_usuarios()
+
+    def carregar_pagina_usuarios(self):
+        """Acrescenta a próxima página de usuários à tabela"""
+        usuarios, self.cursor_usuarios = RepositorioUsuarios.pagina(
+            TAMANHO_PAGINA_USUARIOS, self.cursor_usuarios, self.ordem_listagem_usuarios,
+            self.decrescente_listagem_usuarios, **self.filtros_usuarios)
+        
+        for linha in usuarios:
+            self.tabela_usuarios.insert("", tk.END, values=linha)
+        
+        carregados = len(self.tabela_usuarios.get_children())
+        if not carregados:
+            self.status_usuarios.config(text="Nenhum usuário encontrado.")
+        else:
+            self.status_usuarios.config(text=f"{carregados} de {self.total_usuarios} usuário(s) carregado(s).")
+        self.botao_mais_usuarios.config(state=tk.DISABLED if self.cursor_usuarios is None else tk.NORMAL)
+
+    def mostrar_painel_admin(self, atualizar=False):
+        """
+        Exibe o painel da população (admin), calculado em segundo plano
+
+        Args:
+            atualizar (bool): Ignora o painel em cache e consulta o banco de novo
+        """
+        self.limpar_tela()
+        
+        frame_principal = ttk.Frame(self.root)
+        frame_principal.pack(expand=True, fill=tk.BOTH, padx=20, pady=20)
+        
+        ttk.Label(frame_principal, text="Painel da População", style='Titulo.TLabel').pack(pady=10)
+        
+        self.status_painel = ttk.Label(frame_principal, text="Calculando...")
+        self.status_painel.pack()
+        
+        self.frame_painel = ttk.Frame(frame_principal)
+        self.frame_painel.pack(expand=True, fill=tk.BOTH)
+        
+        frame_botoes = ttk.Frame(frame_principal)
+        frame_botoes.pack(pady=10)
+        
+        botao_atualizar = ttk.Button(frame_botoes, text="Atualizar", command=lambda: self.mostrar_painel_admin(True))
+        botao_atualizar.pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_botoes, text="Voltar", command=self.mostrar_menu_admin).pack(side=tk.LEFT, padx=5)
+        
+        frame_painel = self.frame_painel
+        self.aguardar(calcular_painel_async(usar_cache=not atualizar),
+                      lambda painel, erro: self.exibir_painel_admin(frame_painel, painel, erro), botao_atualizar)
+
+    def exibir_painel_admin(self, frame, painel, erro):
+        """Preenche a tela do painel da população com o resultado do cálculo"""
+        if frame is not self.frame_painel or not frame.winfo_exists():
+            return  # O administrador saiu da tela (ou a abriu de novo) antes do cálculo terminar
+        if erro:
+            self.status_painel.config(text=f"Erro ao calcular o painel: {erro}")
+            return
+        if not painel.usuarios:
+            self.status_painel.config(text="Nenhum usuário cadastrado.")
+            return
+        
+        self.status_painel.config(text=f"{painel.usuarios} usuário(s) | calculado às "
+                                       f"{painel.gerado_em.strftime('%H:%M:%S')} em {painel.duracao:.1f}s")
+        
+        # Histograma de IMC
+        frame_imc = ttk.Frame(frame, style='Card.TFrame')
+        frame_imc.pack(fill=tk.X, padx=10, pady=5)
+        resumo = ""
+        if painel.imc:
+            resumo = (f" (média {painel.imc['media']:.1f} | mediana {painel.imc['p50']:.1f} | "
+                      f"10% {painel.imc['p10']:.1f} | 90% {painel.imc['p90']:.1f})")
+        ttk.Label(frame_imc, text="IMC" + resumo, font=self.fontes['subtitulo']).pack(anchor=tk.W, padx=10, pady=5)
+        
+        canvas = tk.Canvas(frame_imc, width=LARGURA_HISTOGRAMA_PX, height=ALTURA_HISTOGRAMA_PX + 20,
+                           bg=self.cores['card'], highlightthickness=0)
+        canvas.pack(padx=10, pady=5)
+        maior = max(quantidade for _, _, quantidade in painel.histograma_imc)
+        largura_barra = LARGURA_HISTOGRAMA_PX / len(painel.histograma_imc)
+        for i, (inicio, fim, quantidade) in enumerate(painel.histograma_imc):
+            altura = quantidade / maior * ALTURA_HISTOGRAMA_PX
+            x = i * largura_barra
+            canvas.create_rectangle(x + 1, ALTURA_HISTOGRAMA_PX - altura, x + largura_barra - 1, ALTURA_HISTOGRAMA_PX,
+                                    fill=self.cores['primaria'], outline="")
+            if i % 5 == 0 and inicio is not None:
+                canvas.create_text(x, ALTURA_HISTOGRAMA_PX + 10, text=f"{inicio:.0f}", anchor=tk.W)
+        
+        ttk.Label(frame_imc, text=" | ".join(f"{nome}: {quantidade} ({fracao:.0%})"
+                                             for nome, quantidade, fracao in painel.faixas_imc)).pack(pady=5)
+        
+        # Dietas, calorias contra a meta e usuários ativos
+        frame_tabelas = ttk.Frame(frame)
+        frame_tabelas.pack(expand=True, fill=tk.BOTH, padx=10, pady=5)
+        
+        # Dietas que ainda têm dias fechados no período, mas nenhum usuário hoje, entram com zero
+        calorias = {linha[0]: linha for linha in painel.calorias_por_dieta}
+        dietas = painel.dietas + [(dieta, 0, 0.0) for dieta in calorias
+                                  if dieta not in {nome for nome, _, _ in painel.dietas}]
+        
+        colunas = ("Dieta", "Usuários", "Kcal/dia", "Meta", "% da meta", "Dentro da meta")
+        tabela = ttk.Treeview(frame_tabelas, columns=colunas, show="headings", height=len(dietas))
+        for col in colunas:
+            tabela.heading(col, text=col)
+            tabela.column(col, width=110, anchor=tk.CENTER)
+        for dieta, quantidade, fracao in dietas:
+            linha = calorias.get(dieta)
+            if linha:
+                _, _, media, meta, fracao_meta, aderencia = linha
+                valores = (f"{media:.0f}", f"{meta:.0f}", f"{fracao_meta:.0%}", f"{aderencia:.0%}")
+            else:
+                valores = ("-", "-", "-", "-")
+            tabela.insert("", tk.END, values=(dieta, f"{quantidade} ({fracao:.0%})", *valores))
+        tabela.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        
+        frame_ativos = ttk.Frame(frame_tabelas, style='Card.TFrame')
+        frame_ativos.pack(side=tk.LEFT, fill=tk.Y, padx=10)
+        ttk.Label(frame_ativos, text="Usuários ativos", font=self.fontes['subtitulo']).pack(padx=10, pady=5)
+        for janela, quantidade in painel.ativos.items():
+            ttk.Label(frame_ativos, text=f"Últimos {janela} dia(s): {quantidade} "
+                                         f"({quantidade / painel.usuarios:.0%})").pack(anchor=tk.W, padx=10, pady=2)
+        ttk.Label(frame_ativos, text=f"Calorias: dias fechados dos\núltimos {painel.dias} dias",
+                  justify=tk.LEFT).pack(anchor=tk.W, padx=10, pady=5)
 
     def mostrar_exclusao_alimento(self):
         """Exibe a tela de exclusão de alimentos (admin)"""
@@ -1124,15 +1590,13 @@ class InterfaceNutrismart:
             messagebox.showerror("Erro", "Digite o nome do alimento!")
             return
             
-        cursor.execute("SELECT nome FROM alimentos WHERE nome = ?", (nome,))
-        if not cursor.fetchone():
+        if not catalogo.existe(nome):
             messagebox.showerror("Erro", "Alimento não encontrado!")
             return
             
         if messagebox.askyesno("Confirmar", f"Tem certeza que deseja excluir o alimento '{nome}'?"):
             try:
-                cursor.execute("DELETE FROM alimentos WHERE nome = ?", (nome,))
-                conn.commit()
+                catalogo.excluir(nome)
                 messagebox.showinfo("Sucesso", "Alimento excluído com sucesso!")
                 self.mostrar_menu_admin()
             except Exception as e:
@@ -1188,13 +1652,7 @@ class InterfaceNutrismart:
         for item in self.tabela_suporte_admin.get_children():
             self.tabela_suporte_admin.delete(item)
             
-        cursor.execute("""
-            SELECT id, email, mensagem, resposta 
-            FROM suporte 
-            ORDER BY data_hora DESC
-        """)
-        
-        for linha in cursor.fetchall():
+        for linha in RepositorioSuporte.listar_todos():
             self.tabela_suporte_admin.insert("", tk.END, values=linha)
 
     def selecionar_mensagem_suporte(self, event):
@@ -1220,12 +1678,7 @@ class InterfaceNutrismart:
             return
             
         try:
-            cursor.execute("""
-                UPDATE suporte 
-                SET resposta = ? 
-                WHERE id = ?
-            """, (resposta, self.id_mensagem_selecionada))
-            conn.commit()
+            RepositorioSuporte.responder(self.id_mensagem_selecionada, resposta)
             messagebox.showinfo("Sucesso", "Resposta enviada com sucesso!")
             self.carregar_suporte_admin()
         except Exception as e:
@@ -1234,9 +1687,11 @@ class InterfaceNutrismart:
     def fazer_logout(self):
         """Realiza o logout do usuário atual"""
         self.usuario_atual = None
+        self.sessao = None
         self.criar_menu_principal()
 
 if __name__ == "__main__":
+    preparar_banco()
     root = tk.Tk()
-    app = InterfaceNutrismart(root)
-    root.mainloop()
\ No newline at end of file
+    app = InterfaceNutrismart(root, gravacao_em_segundo_plano="--gravacao-em-segundo-plano" in sys.argv)
+    root.mainloop()
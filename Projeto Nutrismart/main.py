@@ -1,4 +1,6 @@
+from database import preparar_banco
 from sistema import menu_principal
 
 if __name__ == "__main__":
+    preparar_banco()
     menu_principal()
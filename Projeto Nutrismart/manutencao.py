@@ -0,0 +1,219 @@
+# Comandos de manutenção do banco de dados, sem interação com o usuário
+# Uso: python manutencao.py <comando> [opções]
+import argparse
+import sys
+import time
+from datetime import date
+
+from database import (TAMANHO_LOTE_MIGRACAO, VERSAO_ATUAL, migrar, preparar_banco, reconstruir_consumo_alimentos,
+                      reconstruir_totais_diarios, versao_banco)
+from exportacao import exportar_refeicoes, exportar_usuarios
+from fechamento import TAMANHO_LOTE_FECHAMENTO, fechar_dia
+from importacao import importar_alimentos, importar_usuarios
+from recalculo import TAMANHO_LOTE_RECALCULO, recalcular_pendentes
+from repositorios import RepositorioRecalculos, RepositorioRecomendacoes, intervalo_datas
+
+
+def comando_migrar(args):
+    """Aplica as migrações pendentes do esquema, mostrando o andamento dos preenchimentos em lote"""
+    print(f"Versão do banco: {versao_banco()} (atual: {VERSAO_ATUAL})")
+
+    def progresso(versao, ultimo, limite):
+        print(f"... migração {versao}: {ultimo}/{limite} refeições")
+
+    aplicadas = migrar(tamanho_lote=args.lote, progresso=progresso)
+    for versao, descricao, segundos in aplicadas:
+        print(f"✅ Migração {versao} ({descricao}) aplicada em {segundos:.2f}s")
+    if not aplicadas:
+        print("✅ Nenhuma migração pendente.")
+
+
+def comando_reconstruir_totais(args):
+    """Recalcula as tabelas totais_diarios e consumo_alimentos a partir de todas as refeições"""
+    inicio = time.perf_counter()
+    linhas = reconstruir_totais_diarios()
+    print(f"✅ Totais diários reconstruídos: {linhas} linha(s) em {time.perf_counter() - inicio:.2f}s")
+
+    inicio = time.perf_counter()
+    linhas = reconstruir_consumo_alimentos()
+    print(f"✅ Consumo por alimento reconstruído: {linhas} linha(s) em {time.perf_counter() - inicio:.2f}s")
+
+
+def comando_importar_alimentos(args):
+    """Importa uma tabela de composição de alimentos (CSV/TSV) para o catálogo"""
+    def progresso(relatorio):
+        print(f"... {relatorio['lidas']} linha(s) lidas, {relatorio['novos']} novo(s), "
+              f"{relatorio['atualizados']} atualizado(s)")
+
+    inicio = time.perf_counter()
+    relatorio = importar_alimentos(args.arquivo, tamanho_lote=args.lote, simular=args.simular,
+                                   delimitador=args.delimitador, encoding=args.encoding,
+                                   progresso=progresso)
+
+    for linha, motivo in relatorio["rejeitados"]:
+        print(f"⚠️ Linha {linha} rejeitada: {motivo}")
+    for nome, atuais, novos in relatorio["conflitos"]:
+        print(f"🔁 {nome}: {atuais} -> {novos}")
+
+    prefixo = "🔎 Simulação" if args.simular else "✅ Importação"
+    print(f"{prefixo} concluída em {time.perf_counter() - inicio:.2f}s: {relatorio['lidas']} linha(s) lidas, "
+          f"{relatorio['novos']} novo(s), {relatorio['atualizados']} atualizado(s), "
+          f"{relatorio['inalterados']} inalterado(s), {len(relatorio['rejeitados'])} rejeitada(s)")
+    if relatorio["a_recalcular"]:
+        _recalcular_alimentos(TAMANHO_LOTE_RECALCULO)
+
+
+def comando_importar_usuarios(args):
+    """Cadastra ou atualiza usuários em massa a partir de um CSV/TSV"""
+    def progresso(relatorio):
+        print(f"... {relatorio['lidas']} linha(s) lidas, {relatorio['novos']} novo(s), "
+              f"{relatorio['atualizados']} atualizado(s)")
+
+    inicio = time.perf_counter()
+    relatorio = importar_usuarios(args.arquivo, tamanho_lote=args.lote, simular=args.simular,
+                                  arquivo_rejeitados=args.rejeitados, delimitador=args.delimitador,
+                                  encoding=args.encoding, progresso=progresso)
+
+    for linha, motivo in relatorio["rejeitados"][:20]:
+        print(f"⚠️ Linha {linha} rejeitada: {motivo}")
+    if len(relatorio["rejeitados"]) > 20:
+        print(f"... e mais {len(relatorio['rejeitados']) - 20} linha(s) rejeitada(s)"
+              + (f", todas em {args.rejeitados}" if args.rejeitados else " (use --rejeitados para gravá-las)"))
+
+    prefixo = "🔎 Simulação" if args.simular else "✅ Importação"
+    print(f"{prefixo} concluída em {time.perf_counter() - inicio:.2f}s: {relatorio['lidas']} linha(s) lidas, "
+          f"{relatorio['novos']} novo(s), {relatorio['atualizados']} atualizado(s), "
+          f"{relatorio['senhas_calculadas']} senha(s) com hash calculado, "
+          f"{len(relatorio['rejeitados'])} rejeitada(s)")
+
+
+def comando_exportar(args):
+    """Exporta refeições ou usuários para CSV/JSONL, opcionalmente comprimido com gzip"""
+    inicio = time.perf_counter()
+    try:
+        if args.tabela == "usuarios":
+            linhas = exportar_usuarios(args.destino, tamanho_lote=args.lote)
+        else:
+            intervalo = None
+            if args.inicio or args.fim:
+                intervalo = intervalo_datas(args.inicio or "1900-01-01", args.fim or date.today())
+            linhas = exportar_refeicoes(args.destino, email_usuario=args.email, intervalo=intervalo,
+                                        tamanho_lote=args.lote)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    print(f"✅ {linhas} linha(s) exportada(s) para {args.destino} em {time.perf_counter() - inicio:.2f}s")
+
+
+def comando_fechar_dia(args):
+    """Fecha um dia (padrão: ontem) para todos os usuários, gravando em fechamentos_diarios"""
+    def progresso(resultado):
+        print(f"... {resultado['usuarios']} usuário(s) fechado(s)")
+
+    inicio = time.perf_counter()
+    try:
+        resultado = fechar_dia(args.dia, tamanho_lote=args.lote, processos=args.processos, progresso=progresso)
+    except ValueError:
+        sys.exit("❌ Data inválida. Use o formato AAAA-MM-DD.")
+    print(f"✅ Dia {resultado['dia']} fechado em {time.perf_counter() - inicio:.2f}s: "
+          f"{resultado['usuarios']} usuário(s), {resultado['dentro']} dentro da meta, "
+          f"{resultado['abaixo']} abaixo e {resultado['acima']} acima")
+
+
+def comando_recalcular_alimentos(args):
+    """Recalcula as refeições dos alimentos alterados (recálculos pendentes ou interrompidos)"""
+    _recalcular_alimentos(args.lote)
+
+
+def _recalcular_alimentos(tamanho_lote):
+    """Executa os recálculos pendentes mostrando o andamento"""
+    pendentes = RepositorioRecalculos.listar()
+    if not pendentes:
+        print("✅ Nenhum recálculo pendente.")
+        return
+    print(f"🔄 {len(pendentes)} alimento(s) com refeições a recalcular")
+
+    def progresso(alimento, recalculadas, concluido):
+        print(f"... {alimento}: {recalculadas} refeição(ões) recalculada(s){' ✅' if concluido else ''}")
+
+    inicio = time.perf_counter()
+    recalculadas = recalcular_pendentes(tamanho_lote=tamanho_lote, progresso=progresso)
+    print(f"✅ {sum(recalculadas.values())} refeição(ões) de {len(recalculadas)} alimento(s) "
+          f"recalculada(s) em {time.perf_counter() - inicio:.2f}s")
+
+
+def comando_verificar_dietas(args):
+    """Lista as regras de recomendação cujo alimento não está no catálogo (e por isso não são usadas)"""
+    faltando = RepositorioRecomendacoes.fora_do_catalogo()
+    for dieta, alimento in faltando:
+        print(f"⚠️ {dieta}: '{alimento}' não está cadastrado")
+    if faltando:
+        print(f"{len(faltando)} regra(s) ignorada(s); cadastre os alimentos ou importe uma tabela de composição.")
+    else:
+        print("✅ Todos os alimentos das regras de dieta estão cadastrados.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção do banco de dados do Nutrismart")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    migracao = subparsers.add_parser("migrar", help="Aplica as migrações pendentes do esquema")
+    migracao.add_argument("--lote", type=int, default=TAMANHO_LOTE_MIGRACAO, help="Refeições processadas por commit")
+    migracao.set_defaults(funcao=comando_migrar)
+
+    reconstruir = subparsers.add_parser("reconstruir-totais",
+                                        help="Recalcula os totais diários e o consumo por alimento")
+    reconstruir.set_defaults(funcao=comando_reconstruir_totais)
+
+    importar = subparsers.add_parser("importar-alimentos",
+                                     help="Importa uma tabela de alimentos em CSV/TSV (ex.: TACO)")
+    importar.add_argument("arquivo")
+    importar.add_argument("--lote", type=int, default=1000, help="Linhas gravadas por transação")
+    importar.add_argument("--simular", action="store_true", help="Apenas relata o que mudaria, sem gravar")
+    importar.add_argument("--delimitador", help="Separador de colunas (padrão: detectado)")
+    importar.add_argument("--encoding", default="utf-8-sig")
+    importar.set_defaults(funcao=comando_importar_alimentos)
+
+    usuarios = subparsers.add_parser("importar-usuarios",
+                                     help="Cadastra ou atualiza usuários em massa a partir de um CSV/TSV")
+    usuarios.add_argument("arquivo", help="Colunas: email, peso, altura, sexo, dieta [, senha, pergunta, resposta]")
+    usuarios.add_argument("--lote", type=int, default=1000, help="Linhas gravadas por transação")
+    usuarios.add_argument("--simular", action="store_true", help="Apenas relata o que mudaria, sem gravar")
+    usuarios.add_argument("--rejeitados", help="CSV onde gravar as linhas rejeitadas, com o motivo")
+    usuarios.add_argument("--delimitador", help="Separador de colunas (padrão: detectado)")
+    usuarios.add_argument("--encoding", default="utf-8-sig")
+    usuarios.set_defaults(funcao=comando_importar_usuarios)
+
+    exportar = subparsers.add_parser("exportar",
+                                     help="Exporta refeições ou usuários para .csv/.jsonl (opcionalmente .gz)")
+    exportar.add_argument("tabela", choices=["refeicoes", "usuarios"])
+    exportar.add_argument("destino", help="Arquivo de saída, ex.: refeicoes.jsonl.gz")
+    exportar.add_argument("--email", help="Apenas as refeições deste usuário")
+    exportar.add_argument("--inicio", help="Primeiro dia das refeições (AAAA-MM-DD)")
+    exportar.add_argument("--fim", help="Último dia das refeições (AAAA-MM-DD)")
+    exportar.add_argument("--lote", type=int, default=1000, help="Linhas lidas do banco por vez")
+    exportar.set_defaults(funcao=comando_exportar)
+
+    fechar = subparsers.add_parser("fechar-dia",
+                                   help="Fecha o dia de todos os usuários (para rodar toda noite)")
+    fechar.add_argument("--dia", help="Dia a fechar (AAAA-MM-DD; padrão: ontem)")
+    fechar.add_argument("--lote", type=int, default=TAMANHO_LOTE_FECHAMENTO, help="Usuários por lote")
+    fechar.add_argument("--processos", type=int, default=1, help="Processos usados na leitura dos lotes")
+    fechar.set_defaults(funcao=comando_fechar_dia)
+
+    recalcular = subparsers.add_parser("recalcular-alimentos",
+                                       help="Recalcula as refeições dos alimentos alterados")
+    recalcular.add_argument("--lote", type=int, default=TAMANHO_LOTE_RECALCULO, help="Refeições por commit")
+    recalcular.set_defaults(funcao=comando_recalcular_alimentos)
+
+    dietas = subparsers.add_parser("verificar-dietas",
+                                   help="Lista os alimentos das regras de dieta que não estão no catálogo")
+    dietas.set_defaults(funcao=comando_verificar_dietas)
+
+    args = parser.parse_args()
+    if args.funcao is not comando_migrar:
+        preparar_banco()
+    args.funcao(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,19 @@
 # Importações necessárias para o código
 import re  
-from database import cursor, conn  
+from datetime import datetime
+from analises import calcular_painel
+from credenciais import autenticar, gerar_hash
+from database import FAIXAS_IMC
+from exportacao import exportar_refeicoes, exportar_usuarios
+from relatorios import METAS_POR_KG
+from repositorios import RepositorioFechamentos, RepositorioUsuarios, data_da_chave, intervalo_datas, intervalo_ultimos_dias
+from sessao import Sessao
+
+# Usuários por página na listagem do administrador
+TAMANHO_PAGINA_USUARIOS = 20
+
+# Ordens da listagem do administrador: (texto, chave de RepositorioUsuarios.pagina)
+ORDENS_LISTAGEM = [("E-mail", "email"), ("IMC", "imc"), ("Peso", "peso"), ("Dieta", "dieta")]
 
 class Usuario:
     """Classe que representa um usuário do sistema de saúde e nutrição."""
@@ -12,6 +25,7 @@ class Usuario:
             email (str): Endereço de e-mail do usuário.
         """
         self.email = email
+        self.sessao = Sessao(email)  # Perfil guardado em memória durante o login
 
     @staticmethod
     def validar_email(email):
@@ -68,8 +82,7 @@ class Usuario:
                 print("❌ E-mail inválido!")
                 continue
             # Verifica se e-mail já existe
-            cursor.execute("SELECT * FROM usuarios WHERE email = ?", (email,))
-            if cursor.fetchone():
+            if RepositorioUsuarios.existe(email):
                 print("❌ E-mail já está cadastrado!")
                 continue
             break
@@ -122,32 +135,36 @@ class Usuario:
 
         resposta = input("Digite a resposta para a pergunta de segurança: ").strip().lower()
 
-        # Insere todos os dados no banco de dados
-        cursor.execute('''
-            INSERT INTO usuarios (email, senha, peso, altura, sexo, dieta, imc, pergunta_seguranca, resposta_seguranca)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (email, senha, peso, altura, sexo, dieta, imc, pergunta, resposta))
-        conn.commit()
+        # Insere todos os dados no banco de dados (a senha é gravada como hash)
+        RepositorioUsuarios.inserir(email, gerar_hash(senha), peso, altura, sexo, dieta, imc, pergunta, resposta)
         print(f"✅ Usuário cadastrado com sucesso! Seu IMC é {imc}")
 
     @staticmethod
     def recuperar_senha():
-        """Permite ao usuário recuperar sua senha respondendo à pergunta de segurança."""
+        """Permite ao usuário definir uma nova senha respondendo à pergunta de segurança."""
         print("\n🔐 Recuperação de Senha")
         email = input("Digite seu e-mail cadastrado: ").strip()
-        cursor.execute("SELECT pergunta_seguranca, resposta_seguranca, senha FROM usuarios WHERE email = ?", (email,))
-        resultado = cursor.fetchone()
+        resultado = RepositorioUsuarios.buscar_recuperacao(email)
         if not resultado:
             print("❌ E-mail não encontrado!")
             return
 
-        pergunta, resposta_correta, senha = resultado
+        pergunta, resposta_correta = resultado
         print(f"Pergunta de segurança: {pergunta}")
         resposta_usuario = input("Sua resposta: ").strip().lower()
-        if resposta_usuario == resposta_correta:
-            print(f"✅ Sua senha é: {senha}")
-        else:
+        if resposta_usuario != resposta_correta:
             print("❌ Resposta incorreta!")
+            return
+
+        # A senha fica gravada como hash, então não há como mostrá-la: o usuário define outra
+        while True:
+            nova_senha = input("Nova senha: ").strip()
+            if nova_senha == "":
+                print("❌ A senha não pode ser vazia!")
+            else:
+                break
+        RepositorioUsuarios.atualizar_senha(email, gerar_hash(nova_senha))
+        print("✅ Senha redefinida com sucesso!")
 
     @staticmethod
     def login():
@@ -159,14 +176,12 @@ class Usuario:
         print("\n=== Login ===")
         while True:
             email = input("E-mail: ").strip()
-            cursor.execute("SELECT senha FROM usuarios WHERE email = ?", (email,))
-            resultado = cursor.fetchone()
-            if not resultado:
+            if not RepositorioUsuarios.existe(email):
                 print("❌ E-mail não encontrado. Tente novamente.")
                 return None
 
             senha_digitada = input("Senha: ").strip()
-            if senha_digitada != resultado[0]:
+            if not autenticar(email, senha_digitada):
                 print("❌ Senha incorreta.")
                 escolha = input("Deseja recuperar sua senha? (s/n): ").strip().lower()
                 if escolha == 's':
@@ -176,7 +191,9 @@ class Usuario:
                 continue
 
             print("✅ Login realizado com sucesso!")
-            return Usuario(email)  # Retorna uma instância do usuário
+            usuario = Usuario(email)
+            usuario.sessao.carregar()  # Lê o perfil uma vez para as telas seguintes
+            return usuario  # Retorna uma instância do usuário
 
     def editar_meus_dados(self):
         """Permite ao usuário editar seus dados pessoais (peso, altura, dieta) e recalcula o IMC."""
@@ -195,12 +212,8 @@ class Usuario:
         novo_imc = Usuario.calcular_imc(novo_peso, nova_altura)
 
         # Atualiza os dados no banco de dados
-        cursor.execute('''
-            UPDATE usuarios
-            SET peso = ?, altura = ?, dieta = ?, imc = ?
-            WHERE email = ?
-        ''', (novo_peso, nova_altura, nova_dieta, novo_imc, self.email))
-        conn.commit()
+        RepositorioUsuarios.atualizar_dados(self.email, novo_peso, nova_altura, nova_dieta, novo_imc)
+        self.sessao.invalidar()
 
         print("✅ Dados atualizados com sucesso!")
         print(f"📊 Novo IMC: {novo_imc}")
@@ -209,14 +222,140 @@ class Usuario:
 class Adm(Usuario):
     """Classe que representa um administrador do sistema, com funcionalidades adicionais."""
     
+    @staticmethod
+    def _escolher_opcao(titulo, opcoes):
+        """Mostra opções numeradas e retorna a posição da escolhida, ou None se o administrador apertar Enter."""
+        print(f"\n{titulo}:")
+        for i, opcao in enumerate(opcoes, 1):
+            print(f"{i}. {opcao}")
+        while True:
+            escolha = input("Digite o número (Enter para todos): ").strip()
+            if not escolha:
+                return None
+            if escolha.isdigit() and 1 <= int(escolha) <= len(opcoes):
+                return int(escolha) - 1
+            print("❌ Opção inválida! Tente novamente.")
+
     @staticmethod
     def ver_usuarios():
-        """Exibe todos os usuários cadastrados no sistema com seus dados principais."""
+        """Exibe os usuários cadastrados, uma página por vez, com filtros e ordenação opcionais."""
         print("\n=== Usuários Cadastrados ===")
-        cursor.execute("SELECT email, peso, altura, sexo, dieta, imc FROM usuarios")
-        usuarios = cursor.fetchall()
-        if usuarios:
+        dietas = list(METAS_POR_KG)
+        indice_dieta = Adm._escolher_opcao("Filtrar por dieta", dietas)
+        filtros = {
+            "dieta": dietas[indice_dieta] if indice_dieta is not None else None,
+            "faixa_imc": Adm._escolher_opcao("Filtrar por faixa de IMC", [nome for nome, _, _ in FAIXAS_IMC]),
+        }
+        sexo = input("Filtrar por sexo (M/F, Enter para todos): ").strip().upper()
+        if sexo and sexo not in ("M", "F"):
+            print("❌ Sexo inválido! Use apenas 'M' ou 'F'.")
+            return
+        filtros["sexo"] = sexo or None
+
+        indice_ordem = Adm._escolher_opcao("Ordenar por", [texto for texto, _ in ORDENS_LISTAGEM])
+        ordem = ORDENS_LISTAGEM[indice_ordem or 0][1]
+        decrescente = input("Do maior para o menor? (s/n): ").strip().lower() == "s"
+
+        # O total vem da contagem por grupo, sem contar a tabela de usuários
+        total = RepositorioUsuarios.contar(**filtros)
+        if not total:
+            print("❌ Nenhum usuário encontrado.")
+            return
+
+        cursor = None
+        pagina = 1
+        paginas = -(-total // TAMANHO_PAGINA_USUARIOS)
+        while True:
+            usuarios, cursor = RepositorioUsuarios.pagina(TAMANHO_PAGINA_USUARIOS, cursor, ordem, decrescente, **filtros)
+            print(f"\n--- Página {pagina} de {paginas} ({total} usuário(s)) ---")
             for u in usuarios:
                 print(f"- Email: {u[0]} | Peso: {u[1]} kg | Altura: {u[2]} m | Sexo: {u[3]} | Dieta: {u[4]} | IMC: {u[5]}")
-        else:
-            print("❌ Nenhum usuário cadastrado.")
\ No newline at end of file
+
+            if cursor is None:
+                print("✅ Fim da lista.")
+                return
+            if input("Enter para a próxima página, 's' para sair: ").strip().lower() == "s":
+                return
+            pagina += 1
+
+    @staticmethod
+    def exportar_dados():
+        """Exporta refeições ou usuários para um arquivo .csv/.jsonl (opcionalmente .gz)."""
+        print("\n=== Exportar dados ===")
+        print("1. Refeições")
+        print("2. Usuários")
+        escolha = input("O que deseja exportar? ")
+        if escolha not in ("1", "2"):
+            print("❌ Opção inválida!")
+            return
+
+        destino = input("Arquivo de destino (ex.: refeicoes.csv, refeicoes.jsonl.gz): ").strip()
+        try:
+            if escolha == "2":
+                total = exportar_usuarios(destino)
+            else:
+                email = input("E-mail do usuário (Enter para todos): ").strip() or None
+                inicio = input("Primeiro dia AAAA-MM-DD (Enter para todo o histórico): ").strip()
+                intervalo = None
+                if inicio:
+                    fim = input("Último dia AAAA-MM-DD (Enter para hoje): ").strip() or datetime.now()
+                    intervalo = intervalo_datas(inicio, fim)
+                total = exportar_refeicoes(destino, email_usuario=email, intervalo=intervalo)
+        except (ValueError, OSError) as e:
+            print(f"❌ Não foi possível exportar: {e}")
+            return
+        print(f"✅ {total} registro(s) exportado(s) para {destino}.")
+
+    @staticmethod
+    def ver_aderencia(dias=30):
+        """Exibe, para cada dia fechado dos últimos dias, quantos usuários ficaram abaixo, dentro e acima da meta."""
+        print(f"\n=== Aderência à meta (últimos {dias} dias fechados) ===")
+        linhas = RepositorioFechamentos.aderencia_por_dia(intervalo_ultimos_dias(dias))
+        if not linhas:
+            print("❌ Nenhum dia fechado no período (rode: python manutencao.py fechar-dia).")
+            return
+        for dia, usuarios, abaixo, dentro, acima in linhas:
+            print(f"- {data_da_chave(dia).strftime('%d/%m/%Y')}: {usuarios} usuário(s) | "
+                  f"dentro: {dentro} ({dentro / usuarios:.0%}) | abaixo: {abaixo} | acima: {acima}")
+
+    @staticmethod
+    def ver_painel(largura_barra=40):
+        """Exibe o painel da população: IMC, dietas, calorias médias contra a meta e usuários ativos."""
+        painel = calcular_painel()
+        print(f"\n=== Painel da população ({painel.usuarios} usuário(s), "
+              f"calculado às {painel.gerado_em.strftime('%H:%M:%S')}) ===")
+        if not painel.usuarios:
+            print("❌ Nenhum usuário cadastrado.")
+            return
+
+        print("\n📊 IMC")
+        maior = max(quantidade for _, _, quantidade in painel.histograma_imc)
+        for inicio, fim, quantidade in painel.histograma_imc:
+            if inicio is None:
+                faixa = f"< {fim:.1f}"
+            elif fim is None:
+                faixa = f">= {inicio:.1f}"
+            else:
+                faixa = f"{inicio:.1f}-{fim:.1f}"
+            barra = "█" * round(quantidade / maior * largura_barra)
+            print(f"{faixa:>11} {barra:<{largura_barra}} {quantidade}")
+        if painel.imc:
+            print(f"Média: {painel.imc['media']:.1f} | Mediana: {painel.imc['p50']:.1f} | "
+                  f"10%: {painel.imc['p10']:.1f} | 90%: {painel.imc['p90']:.1f}")
+        for nome, quantidade, fracao in painel.faixas_imc:
+            print(f"- {nome}: {quantidade} ({fracao:.0%})")
+
+        print("\n🥗 Dietas")
+        for dieta, quantidade, fracao in painel.dietas:
+            print(f"- {dieta}: {quantidade} ({fracao:.0%})")
+
+        print(f"\n🔥 Calorias por dia x meta (dias fechados dos últimos {painel.dias} dias)")
+        if not painel.calorias_por_dieta:
+            print("Nenhum dia fechado no período (rode: python manutencao.py fechar-dia).")
+        for dieta, dias, calorias, meta, fracao_meta, aderencia in painel.calorias_por_dieta:
+            print(f"- {dieta}: {calorias:.0f} kcal de {meta:.0f} kcal ({fracao_meta:.0%} da meta) | "
+                  f"dentro da meta em {aderencia:.0%} de {dias} dia(s)")
+
+        print("\n👥 Usuários ativos (com refeições registradas)")
+        for janela, quantidade in painel.ativos.items():
+            print(f"- Últimos {janela} dia(s): {quantidade} ({quantidade / painel.usuarios:.0%})")
@@ -0,0 +1,90 @@
+# Cálculo de nutrientes (calorias, proteínas, carboidratos e gorduras) de conjuntos de refeições
+# Cada refeição vira uma linha (quantidade, alimento); os valores por 100g dos
+# alimentos formam uma matriz, e os totais por refeição, dia ou usuário saem de
+# uma única passada: quantidades × linhas da matriz, somadas por grupo.
+# Com NumPy instalado a passada é vetorizada; sem ele, um laço em Python faz a mesma conta.
+# As telas e os relatórios não passam por aqui: usam os nutrientes gravados em
+# cada refeição, somados pelo banco. Este cálculo fica como referência, medido
+# por: python benchmark.py nutrientes
+from catalogo import Nutrientes, catalogo
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+NUTRIENTES = Nutrientes._fields
+ZERADO = Nutrientes(0.0, 0.0, 0.0, 0.0)
+
+# Abaixo desta quantidade de refeições o laço em Python é mais rápido que o
+# NumPy (o custo de converter as listas em arrays domina); ver benchmark.py nutrientes
+MINIMO_NUMPY = 60_000
+
+
+def _somar_python(grupos, alimentos, quantidades, buscar):
+    """Soma os nutrientes de cada grupo com um laço em Python"""
+    totais = {}
+    por_100g = {}
+    for grupo, alimento, quantidade in zip(grupos, alimentos, quantidades):
+        valores = por_100g.get(alimento)
+        if valores is None:
+            valores = por_100g[alimento] = buscar(alimento) or ZERADO
+        calorias, proteinas, carboidratos, gorduras = valores
+        fator = quantidade / 100
+        soma = totais.get(grupo)
+        if soma is None:
+            totais[grupo] = [calorias * fator, proteinas * fator, carboidratos * fator, gorduras * fator]
+        else:
+            soma[0] += calorias * fator
+            soma[1] += proteinas * fator
+            soma[2] += carboidratos * fator
+            soma[3] += gorduras * fator
+    return {grupo: Nutrientes(*soma) for grupo, soma in totais.items()}
+
+
+def _somar_numpy(grupos, alimentos, quantidades, buscar):
+    """Soma os nutrientes de cada grupo com operações vetorizadas do NumPy"""
+    # Numera os alimentos com um dicionário (mais rápido que ordenar strings no NumPy)
+    codigos = {}
+    indice_alimento = np.fromiter((codigos.setdefault(nome, len(codigos)) for nome in alimentos),
+                                  dtype=np.intp, count=len(alimentos))
+    matriz = np.array([buscar(nome) or ZERADO for nome in codigos], dtype=float).reshape(-1, len(NUTRIENTES))
+
+    chaves, indice_grupo = np.unique(np.asarray(grupos), return_inverse=True)
+    fatores = np.asarray(quantidades, dtype=float) / 100
+    totais = np.column_stack([
+        np.bincount(indice_grupo, weights=fatores * matriz[indice_alimento, coluna], minlength=len(chaves))
+        for coluna in range(len(NUTRIENTES))
+    ])
+    return {chave.item() if hasattr(chave, "item") else chave: Nutrientes(*linha)
+            for chave, linha in zip(chaves, totais.tolist())}
+
+
+def somar_nutrientes(grupos, alimentos, quantidades, usar_numpy=None, buscar=None):
+    """
+    Soma os nutrientes de um conjunto de refeições, agrupando pela chave de cada uma
+
+    Args:
+        grupos (sequence): Chave de cada refeição (ex.: dia AAAAMMDD ou email); valores
+            do mesmo tipo, para que possam ser ordenados
+        alimentos (sequence): Nome do alimento de cada refeição
+        quantidades (sequence): Gramas de cada refeição
+        usar_numpy (bool, opcional): Força (True) ou dispensa (False) o NumPy; padrão: usa se
+            instalado e se houver pelo menos MINIMO_NUMPY refeições
+        buscar (callable, opcional): nome -> Nutrientes por 100g; padrão: catalogo.buscar.
+            Alimentos não encontrados (ex.: excluídos do catálogo) contam como zero
+
+    Returns:
+        dict: chave -> Nutrientes com os totais do grupo
+    """
+    if not len(quantidades):
+        return {}
+    if buscar is None:
+        buscar = catalogo.buscar
+    if usar_numpy is None:
+        usar_numpy = np is not None and len(quantidades) >= MINIMO_NUMPY
+    if usar_numpy:
+        if np is None:
+            raise RuntimeError("NumPy não está instalado")
+        return _somar_numpy(grupos, alimentos, quantidades, buscar)
+    return _somar_python(grupos, alimentos, quantidades, buscar)
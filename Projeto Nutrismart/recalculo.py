@@ -0,0 +1,126 @@
+# Recálculo das refeições quando os valores de um alimento mudam
+# Calorias e macronutrientes ficam gravados em cada refeição (e somados em
+# totais_diarios), então os relatórios não precisam consultar alimentos. Ao
+# alterar um alimento, o recálculo fica registrado em recalculos_pendentes e
+# as refeições dele são atualizadas em lotes, com um commit por lote; os
+# gatilhos ajustam totais_diarios e os fechamentos já feitos dos dias afetados
+# são atualizados no mesmo commit. Um recálculo interrompido continua de onde
+# parou em: python manutencao.py recalcular-alimentos
+import threading
+
+from catalogo import catalogo
+from database import gerenciador
+from relatorios import TOLERANCIA_META
+from repositorios import RepositorioAlimentos, RepositorioFechamentos, RepositorioRecalculos, RepositorioRefeicoes
+
+TAMANHO_LOTE_RECALCULO = 1000
+
+
+def atualizar_alimentos(alimentos):
+    """
+    Insere ou altera alimentos e agenda o recálculo das refeições já registradas deles
+
+    A alteração e o agendamento são gravados juntos; o recálculo em si é feito
+    por recalcular_pendentes (ou iniciar_recalculo, em segundo plano).
+
+    Args:
+        alimentos (list): Tuplas (nome, calorias, proteinas, carboidratos, gorduras) por 100g
+
+    Returns:
+        list: Nomes dos alimentos com refeições a recalcular
+    """
+    with gerenciador.transacao(imediata=True):
+        catalogo.salvar_varios(alimentos)
+        return [alimento[0] for alimento in alimentos if RepositorioRecalculos.registrar(alimento[0])]
+
+
+def atualizar_alimento(nome, calorias, proteinas=0, carboidratos=0, gorduras=0):
+    """
+    Altera os valores por 100g de um alimento e agenda o recálculo das refeições dele
+
+    Returns:
+        bool: True se há refeições a recalcular
+    """
+    return bool(atualizar_alimentos([(nome, calorias, proteinas, carboidratos, gorduras)]))
+
+
+def _recalcular_lote(tamanho_lote):
+    """
+    Recalcula um lote do primeiro recálculo pendente
+
+    Tudo é lido e gravado na mesma transação, reservada desde o início: se o
+    alimento for alterado de novo enquanto isso, o próximo lote já usa os
+    valores novos e recomeça do início.
+
+    Returns:
+        tuple: (alimento, refeições recalculadas, concluído), ou None se não houver pendências
+    """
+    with gerenciador.transacao(imediata=True):
+        pendente = RepositorioRecalculos.proximo()
+        if not pendente:
+            return None
+        alimento, ultimo, limite = pendente
+
+        valores = RepositorioAlimentos.buscar_nutrientes_varios([alimento]).get(alimento)
+        if valores is None:
+            # Alimento excluído do catálogo: as refeições ficam com os últimos valores gravados
+            RepositorioRecalculos.concluir(alimento)
+            return alimento, 0, True
+
+        fim = RepositorioRefeicoes.limite_lote_alimento(alimento, ultimo, limite, tamanho_lote)
+        recalculadas, dias = RepositorioRefeicoes.recalcular_nutrientes(alimento, valores, ultimo, fim)
+        RepositorioFechamentos.atualizar_totais(dias, TOLERANCIA_META)
+        if fim >= limite:
+            RepositorioRecalculos.concluir(alimento)
+        else:
+            RepositorioRecalculos.avancar(alimento, fim)
+        return alimento, recalculadas, fim >= limite
+
+
+def recalcular_pendentes(tamanho_lote=TAMANHO_LOTE_RECALCULO, progresso=None):
+    """
+    Executa todos os recálculos pendentes, um lote por commit
+
+    Args:
+        tamanho_lote (int): Refeições recalculadas por commit
+        progresso (callable, opcional): Chamada com (alimento, refeições recalculadas
+            do alimento até agora, concluído) após cada lote
+
+    Returns:
+        dict: alimento -> refeições recalculadas
+    """
+    recalculadas = {}
+    while (lote := _recalcular_lote(tamanho_lote)) is not None:
+        alimento, quantidade, concluido = lote
+        recalculadas[alimento] = recalculadas.get(alimento, 0) + quantidade
+        if progresso:
+            progresso(alimento, recalculadas[alimento], concluido)
+    return recalculadas
+
+
+def iniciar_recalculo(tamanho_lote=TAMANHO_LOTE_RECALCULO, ao_concluir=None):
+    """
+    Executa recalcular_pendentes numa thread, sem bloquear quem chamou
+
+    A thread não é daemon: ao sair, o programa espera o lote em andamento (e
+    os seguintes) terminarem. O que não for concluído continua pendente.
+
+    Args:
+        tamanho_lote (int): Refeições recalculadas por commit
+        ao_concluir (callable, opcional): Chamada na thread com o resultado de
+            recalcular_pendentes, ou com a exceção se ele falhar
+
+    Returns:
+        threading.Thread: Thread iniciada
+    """
+    def executar():
+        try:
+            resultado = recalcular_pendentes(tamanho_lote)
+        except Exception as e:
+            resultado = e
+        if ao_concluir:
+            ao_concluir(resultado)
+
+    thread = threading.Thread(target=executar, name="recalculo-refeicoes")
+    thread.start()
+    return thread
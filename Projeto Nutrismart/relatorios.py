@@ -0,0 +1,159 @@
+# Relatórios de vários dias: calorias e macronutrientes por dia, médias móveis
+# de 7 e 30 dias e aderência à meta calórica da dieta.
+# Os totais saem de uma única consulta agrupada por dia; as médias móveis são
+# calculadas depois, sobre as colunas, com NumPy se estiver instalado.
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import accumulate
+
+from nutrientes import np
+from repositorios import (RepositorioRefeicoes, RepositorioUsuarios, chave_dia, data_da_chave, intervalo_datas,
+                          intervalo_mes, intervalo_semana)
+
+# Meta calórica diária por kg de peso corporal, conforme a dieta
+METAS_POR_KG = {
+    "Low carb": 25,
+    "Cetogênica": 27,
+    "Hiperproteica": 30,
+    "Bulking": 35,
+}
+META_PADRAO_POR_KG = 30
+
+# Variação aceita em torno da meta para o dia contar como "dentro da meta"
+TOLERANCIA_META = 0.1
+
+# Janelas das médias móveis, em dias
+JANELAS = (7, 30)
+
+DiaRelatorio = namedtuple(
+    "DiaRelatorio", "dia calorias proteinas carboidratos gorduras refeicoes media_7 media_30 na_meta")
+
+
+def meta_calorica(dieta, peso):
+    """
+    Calcula a meta calórica diária aproximada
+
+    Args:
+        dieta (str): Dieta do usuário
+        peso (float): Peso em kg
+
+    Returns:
+        float: Meta em kcal
+    """
+    return METAS_POR_KG.get(dieta, META_PADRAO_POR_KG) * peso
+
+
+def situacao_meta(calorias, meta):
+    """
+    Compara as calorias de um dia com a meta
+
+    Returns:
+        int: -1 abaixo, 0 dentro ou 1 acima da faixa de tolerância
+    """
+    if calorias < meta * (1 - TOLERANCIA_META):
+        return -1
+    if calorias > meta * (1 + TOLERANCIA_META):
+        return 1
+    return 0
+
+
+def _medias_moveis(calorias, registrados, janela):
+    """
+    Média de calorias dos dias com refeições registradas na janela que termina em cada dia
+
+    Dias sem nenhum registro não entram na média (não significam que a pessoa
+    não comeu, só que não anotou).
+
+    Args:
+        calorias (list): Calorias de cada dia consecutivo (0 nos dias sem registro)
+        registrados (list): 1 nos dias com refeições, 0 nos demais
+        janela (int): Tamanho da janela em dias
+
+    Returns:
+        list: Média de cada dia, ou None se a janela não tiver nenhum dia registrado
+    """
+    if np is not None:
+        somas = np.concatenate(([0.0], np.cumsum(calorias, dtype=float)))
+        contagens = np.concatenate(([0], np.cumsum(registrados)))
+        inicio = np.maximum(np.arange(1, len(calorias) + 1) - janela, 0)
+        soma_janela = somas[1:] - somas[inicio]
+        dias_janela = contagens[1:] - contagens[inicio]
+        medias = np.divide(soma_janela, dias_janela, out=np.zeros(len(calorias)), where=dias_janela > 0)
+        return [float(m) if d else None for m, d in zip(medias, dias_janela)]
+
+    somas = [0.0, *accumulate(calorias)]
+    contagens = [0, *accumulate(registrados)]
+    medias = []
+    for i in range(1, len(calorias) + 1):
+        inicio = max(i - janela, 0)
+        dias = contagens[i] - contagens[inicio]
+        medias.append((somas[i] - somas[inicio]) / dias if dias else None)
+    return medias
+
+
+def gerar_relatorio(email_usuario, intervalo, perfil=None):
+    """
+    Monta o relatório diário de um período
+
+    Args:
+        email_usuario (str): Email do usuário
+        intervalo (tuple): Faixa (inicio, fim) de chaves de dia, ver repositorios.intervalo_datas
+        perfil (tuple, opcional): (dieta, peso, ...) já carregados, ex.: Sessao.perfil
+            (padrão: lidos do banco)
+
+    Returns:
+        dict: dieta, meta, dias (lista de DiaRelatorio, um por dia do período, inclusive
+            os sem registro), media_calorias e aderencia (fração dos dias registrados
+            dentro da meta); ou None se o usuário não for encontrado
+    """
+    if perfil is None:
+        perfil = RepositorioUsuarios.buscar_perfil(email_usuario)
+    if not perfil:
+        return None
+    dieta, peso = perfil[:2]
+    meta = meta_calorica(dieta, peso)
+
+    inicio, fim = data_da_chave(intervalo[0]), data_da_chave(intervalo[1])
+    # A consulta começa antes do período para que as médias dos primeiros dias tenham janela completa
+    inicio_consulta = inicio - timedelta(days=max(JANELAS) - 1)
+    totais = {linha[0]: linha[1:] for linha in
+              RepositorioRefeicoes.resumo_por_dia(email_usuario, (chave_dia(inicio_consulta), intervalo[1]))}
+
+    dias = [inicio_consulta + timedelta(days=i) for i in range((fim - inicio_consulta).days)]
+    linhas = [totais.get(chave_dia(dia), (0.0, 0.0, 0.0, 0.0, 0)) for dia in dias]
+    calorias = [linha[0] for linha in linhas]
+    registrados = [1 if linha[4] else 0 for linha in linhas]
+    medias = {janela: _medias_moveis(calorias, registrados, janela) for janela in JANELAS}
+
+    inicio_periodo = (inicio - inicio_consulta).days
+    relatorio_dias = []
+    for i in range(inicio_periodo, len(dias)):
+        calorias_dia, proteinas, carboidratos, gorduras, refeicoes = linhas[i]
+        relatorio_dias.append(DiaRelatorio(
+            dias[i], calorias_dia, proteinas, carboidratos, gorduras, refeicoes,
+            medias[7][i], medias[30][i],
+            situacao_meta(calorias_dia, meta) == 0 if refeicoes else None))
+
+    com_registro = [d for d in relatorio_dias if d.refeicoes]
+    return {
+        "dieta": dieta,
+        "meta": meta,
+        "dias": relatorio_dias,
+        "media_calorias": sum(d.calorias for d in com_registro) / len(com_registro) if com_registro else None,
+        "aderencia": sum(d.na_meta for d in com_registro) / len(com_registro) if com_registro else None,
+    }
+
+
+def relatorio_semana(email_usuario, dia=None, perfil=None):
+    """Relatório da semana (segunda a domingo) que contém o dia (padrão: hoje)"""
+    return gerar_relatorio(email_usuario, intervalo_semana(dia or date.today()), perfil)
+
+
+def relatorio_mes(email_usuario, dia=None, perfil=None):
+    """Relatório do mês que contém o dia (padrão: hoje)"""
+    return gerar_relatorio(email_usuario, intervalo_mes(dia or date.today()), perfil)
+
+
+def relatorio_datas(email_usuario, inicio, fim, perfil=None):
+    """Relatório do dia 'inicio' ao dia 'fim', inclusive (date ou AAAA-MM-DD)"""
+    return gerar_relatorio(email_usuario, intervalo_datas(inicio, fim), perfil)
@@ -0,0 +1,1080 @@
+# Camada de acesso a dados: todas as consultas SQL do sistema ficam aqui
+from datetime import date, datetime, timedelta
+
+from database import FAIXAS_IMC, gerenciador
+
+
+# --- Faixas de dias --- #
+# Os filtros por período comparam a coluna indexada refeicoes.dia (AAAAMMDD)
+# com uma faixa [inicio, fim), em vez de aplicar date() sobre cada linha.
+
+def _como_data(dia):
+    """Converte date, datetime ou texto 'AAAA-MM-DD[ HH:MM:SS]' em date"""
+    if isinstance(dia, datetime):
+        return dia.date()
+    if isinstance(dia, date):
+        return dia
+    return datetime.strptime(str(dia)[:10], "%Y-%m-%d").date()
+
+
+def chave_dia(dia):
+    """
+    Converte um dia na chave numérica usada pela coluna refeicoes.dia
+
+    Args:
+        dia (date | datetime | str): Dia desejado
+
+    Returns:
+        int: Chave no formato AAAAMMDD
+    """
+    dia = _como_data(dia)
+    return dia.year * 10000 + dia.month * 100 + dia.day
+
+
+def data_da_chave(chave):
+    """Converte uma chave AAAAMMDD de volta em date"""
+    return date(chave // 10000, chave // 100 % 100, chave % 100)
+
+
+def intervalo_dia(dia):
+    """Retorna a faixa (inicio, fim) de chaves que cobre apenas o dia informado"""
+    dia = _como_data(dia)
+    return chave_dia(dia), chave_dia(dia + timedelta(days=1))
+
+
+def intervalo_semana(dia):
+    """Retorna a faixa (inicio, fim) de chaves da semana (segunda a domingo) que contém o dia"""
+    dia = _como_data(dia)
+    segunda = dia - timedelta(days=dia.weekday())
+    return chave_dia(segunda), chave_dia(segunda + timedelta(days=7))
+
+
+def intervalo_mes(dia):
+    """Retorna a faixa (inicio, fim) de chaves do mês que contém o dia"""
+    dia = _como_data(dia)
+    primeiro = dia.replace(day=1)
+    proximo = (primeiro + timedelta(days=32)).replace(day=1)
+    return chave_dia(primeiro), chave_dia(proximo)
+
+
+def intervalo_datas(inicio, fim):
+    """Retorna a faixa (inicio, fim) de chaves que vai do dia 'inicio' ao dia 'fim', inclusive"""
+    return chave_dia(inicio), chave_dia(_como_data(fim) + timedelta(days=1))
+
+
+def intervalo_ultimos_dias(dias, hoje=None):
+    """Retorna a faixa (inicio, fim) de chaves dos últimos 'dias' dias, incluindo hoje"""
+    hoje = _como_data(hoje) if hoje is not None else date.today()
+    return chave_dia(hoje - timedelta(days=dias - 1)), chave_dia(hoje + timedelta(days=1))
+
+
+# Máximo de parâmetros por consulta "IN (...)"
+TAMANHO_LOTE_PARAMETROS = 500
+
+
+class RepositorioAlimentos:
+    """Consultas e alterações na tabela de alimentos"""
+
+    @staticmethod
+    def buscar_nutrientes_varios(nomes):
+        """
+        Busca os valores nutricionais completos de vários alimentos de uma vez
+
+        Args:
+            nomes (iterable): Nomes dos alimentos
+
+        Returns:
+            dict: nome -> (calorias, proteinas, carboidratos, gorduras), apenas para os cadastrados
+        """
+        nomes = list(dict.fromkeys(nomes))
+        nutrientes = {}
+        with gerenciador.conexao() as conexao:
+            for inicio in range(0, len(nomes), TAMANHO_LOTE_PARAMETROS):
+                lote = nomes[inicio:inicio + TAMANHO_LOTE_PARAMETROS]
+                marcadores = ", ".join("?" * len(lote))
+                for nome, *valores in conexao.execute(f'''
+                    SELECT nome, calorias, proteinas, carboidratos, gorduras
+                    FROM alimentos
+                    WHERE nome IN ({marcadores})
+                ''', lote):
+                    nutrientes[nome] = tuple(valores)
+        return nutrientes
+
+    @staticmethod
+    def salvar_varios(alimentos):
+        """
+        Insere ou atualiza vários alimentos numa única transação
+
+        Args:
+            alimentos (list): Tuplas (nome, calorias, proteinas, carboidratos, gorduras)
+        """
+        with gerenciador.transacao() as conexao:
+            conexao.executemany('''
+                INSERT INTO alimentos (nome, calorias, proteinas, carboidratos, gorduras)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (nome) DO UPDATE SET
+                    calorias = excluded.calorias,
+                    proteinas = excluded.proteinas,
+                    carboidratos = excluded.carboidratos,
+                    gorduras = excluded.gorduras
+            ''', alimentos)
+
+    @staticmethod
+    def inserir(nome, calorias):
+        """Cadastra um novo alimento com suas calorias por 100g"""
+        with gerenciador.transacao() as conexao:
+            conexao.execute("INSERT INTO alimentos (nome, calorias) VALUES (?, ?)", (nome, calorias))
+
+    @staticmethod
+    def listar():
+        """
+        Lista todos os alimentos cadastrados
+
+        Returns:
+            list: Tuplas (nome, calorias) ordenadas por nome
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute("SELECT nome, calorias FROM alimentos ORDER BY nome").fetchall()
+
+    @staticmethod
+    def listar_nutrientes():
+        """
+        Lista todos os alimentos com os valores nutricionais completos
+
+        Returns:
+            list: Tuplas (nome, calorias, proteinas, carboidratos, gorduras)
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(
+                "SELECT nome, calorias, proteinas, carboidratos, gorduras FROM alimentos").fetchall()
+
+    @staticmethod
+    def revisao():
+        """Retorna o contador de alterações do catálogo, incrementado por gatilhos em alimentos"""
+        with gerenciador.conexao() as conexao:
+            return conexao.execute("SELECT revisao FROM revisao_catalogo WHERE id = 1").fetchone()[0]
+
+    @staticmethod
+    def excluir(nome):
+        """Remove um alimento do catálogo"""
+        with gerenciador.transacao() as conexao:
+            conexao.execute("DELETE FROM alimentos WHERE nome = ?", (nome,))
+
+
+# Grava uma refeição com as calorias informadas e os macronutrientes calculados
+# pelos valores por 100g do alimento (zero se ele não estiver cadastrado)
+_INSERIR_REFEICAO = '''
+    INSERT INTO refeicoes (email_usuario, alimento, quantidade_gramas, calorias, data,
+                           proteinas, carboidratos, gorduras)
+    VALUES (?1, ?2, ?3, ?4, ?5,
+            ?3 * COALESCE((SELECT proteinas FROM alimentos WHERE nome = ?2), 0) / 100,
+            ?3 * COALESCE((SELECT carboidratos FROM alimentos WHERE nome = ?2), 0) / 100,
+            ?3 * COALESCE((SELECT gorduras FROM alimentos WHERE nome = ?2), 0) / 100)
+'''
+
+
+class RepositorioRefeicoes:
+    """Consultas e alterações na tabela de refeições"""
+
+    @staticmethod
+    def inserir(email_usuario, alimento, quantidade, calorias, data):
+        """Registra uma refeição já com as calorias calculadas (os macronutrientes vêm do catálogo)"""
+        with gerenciador.transacao() as conexao:
+            conexao.execute(_INSERIR_REFEICAO, (email_usuario, alimento, quantidade, calorias, data))
+
+    @staticmethod
+    def inserir_varios(refeicoes):
+        """
+        Registra várias refeições numa única transação
+
+        Args:
+            refeicoes (list): Tuplas (email_usuario, alimento, quantidade, calorias, data)
+        """
+        with gerenciador.transacao() as conexao:
+            conexao.executemany(_INSERIR_REFEICAO, refeicoes)
+
+    @staticmethod
+    def iterar(email_usuario=None, intervalo=None, tamanho_lote=1000):
+        """
+        Percorre as refeições sem carregar todas na memória (lê 'tamanho_lote' linhas por vez)
+
+        Args:
+            email_usuario (str, opcional): Apenas as refeições deste usuário, em ordem de data
+            intervalo (tuple, opcional): Faixa (inicio, fim) de chaves de dia
+            tamanho_lote (int): Linhas buscadas por chamada a fetchmany
+
+        Yields:
+            tuple: (id, email_usuario, alimento, quantidade_gramas, calorias, data)
+        """
+        condicoes, parametros = [], []
+        if email_usuario is not None:
+            condicoes.append("email_usuario = ?")
+            parametros.append(email_usuario)
+        if intervalo is not None:
+            condicoes.append("dia >= ? AND dia < ?")
+            parametros.extend(intervalo)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        # Por usuário, o índice (email_usuario, data) já entrega as linhas em ordem;
+        # para todos os usuários, a ordem física (id) evita ordenar a tabela inteira
+        ordem = "data" if email_usuario is not None else "id"
+
+        with gerenciador.conexao() as conexao:
+            cursor = conexao.execute(f'''
+                SELECT id, email_usuario, alimento, quantidade_gramas, calorias, data
+                FROM refeicoes
+                {where}
+                ORDER BY {ordem}
+            ''', parametros)
+            while lote := cursor.fetchmany(tamanho_lote):
+                yield from lote
+
+    @staticmethod
+    def ranking(email_usuario, limite=10, intervalo=None):
+        """
+        Lista os alimentos mais consumidos pelo usuário (em gramas)
+
+        Sem intervalo, lê os N primeiros da tabela consumo_alimentos pelo
+        índice de ranking. Com intervalo, soma apenas as refeições do período.
+
+        Args:
+            email_usuario (str): Email do usuário
+            limite (int): Quantidade de alimentos no ranking
+            intervalo (tuple, opcional): Faixa (inicio, fim) de chaves de dia, ver intervalo_ultimos_dias
+
+        Returns:
+            list: Tuplas (alimento, total_gramas) em ordem decrescente
+        """
+        with gerenciador.conexao() as conexao:
+            if intervalo is None:
+                return conexao.execute('''
+                    SELECT alimento, total_gramas
+                    FROM consumo_alimentos
+                    WHERE email_usuario = ?
+                    ORDER BY total_gramas DESC
+                    LIMIT ?
+                ''', (email_usuario, limite)).fetchall()
+
+            inicio, fim = intervalo
+            return conexao.execute('''
+                SELECT alimento, SUM(quantidade_gramas) as total_gramas
+                FROM refeicoes
+                WHERE email_usuario = ? AND dia >= ? AND dia < ?
+                GROUP BY alimento
+                ORDER BY total_gramas DESC
+                LIMIT ?
+            ''', (email_usuario, inicio, fim, limite)).fetchall()
+
+    @staticmethod
+    def resumo_por_dia(email_usuario, intervalo):
+        """
+        Soma calorias e macronutrientes do usuário em cada dia de um período, numa única consulta
+
+        Usa os valores gravados em cada refeição, sem consultar alimentos
+        (recalculo.py os mantém em dia quando um alimento é alterado).
+
+        Args:
+            email_usuario (str): Email do usuário
+            intervalo (tuple): Faixa (inicio, fim) de chaves de dia
+
+        Returns:
+            list: Tuplas (dia, calorias, proteinas, carboidratos, gorduras, quantidade_refeicoes)
+                em ordem de dia, apenas para os dias com refeições
+        """
+        inicio, fim = intervalo
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT dia, SUM(calorias), SUM(proteinas), SUM(carboidratos), SUM(gorduras), COUNT(*)
+                FROM refeicoes
+                WHERE email_usuario = ? AND dia >= ? AND dia < ?
+                GROUP BY dia
+                ORDER BY dia
+            ''', (email_usuario, inicio, fim)).fetchall()
+
+    @staticmethod
+    def pagina(email_usuario, limite=50, apos=None, intervalo=None, alimento=None):
+        """
+        Lista uma página do histórico do usuário, mais recentes primeiro
+
+        Paginação por chave: em vez de OFFSET (que relê todas as páginas
+        anteriores), cada página continua a partir da (data, id) da última
+        linha da página anterior, então a página 1000 custa o mesmo que a 1ª.
+
+        Args:
+            email_usuario (str): Email do usuário
+            limite (int): Quantidade de refeições na página
+            apos (tuple, opcional): Cursor (data, id) devolvido pela página anterior
+            intervalo (tuple, opcional): Faixa (inicio, fim) de chaves de dia, ver intervalo_datas
+            alimento (str, opcional): Apenas as refeições deste alimento
+
+        Returns:
+            tuple: (linhas, cursor), com linhas (id, alimento, quantidade_gramas, calorias, data)
+                e o cursor da próxima página, ou None se esta for a última
+        """
+        condicoes, parametros = ["email_usuario = ?"], [email_usuario]
+        if alimento is not None:
+            condicoes.append("alimento = ?")
+            parametros.append(alimento)
+        if intervalo is not None:
+            # Mesma faixa em texto sobre data, para usar o índice que já está na ordem do histórico
+            condicoes.append("data >= ? AND data < ?")
+            parametros.extend(data_da_chave(chave).isoformat() for chave in intervalo)
+        if apos is not None:
+            condicoes.append("(data, id) < (?, ?)")
+            parametros.extend(apos)
+
+        with gerenciador.conexao() as conexao:
+            linhas = conexao.execute(f'''
+                SELECT id, alimento, quantidade_gramas, calorias, data
+                FROM refeicoes
+                WHERE {' AND '.join(condicoes)}
+                ORDER BY data DESC, id DESC
+                LIMIT ?
+            ''', (*parametros, limite + 1)).fetchall()
+
+        if len(linhas) <= limite:
+            return linhas, None
+        linhas = linhas[:limite]
+        return linhas, (linhas[-1][4], linhas[-1][0])
+
+    @staticmethod
+    def contar_do_dia(email_usuario, dia):
+        """
+        Conta as refeições registradas pelo usuário no dia, lendo apenas o índice (email_usuario, dia)
+
+        Args:
+            email_usuario (str): Email do usuário
+            dia (date | str): Dia desejado
+
+        Returns:
+            int: Quantidade de refeições
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(
+                "SELECT COUNT(*) FROM refeicoes WHERE email_usuario = ? AND dia = ?",
+                (email_usuario, chave_dia(dia))).fetchone()[0]
+
+    @staticmethod
+    def limite_lote_alimento(alimento, apos, ate, tamanho_lote):
+        """
+        Encontra o último id de um lote de refeições de um alimento, em ordem de id
+
+        Args:
+            alimento (str): Nome do alimento
+            apos (int): O lote começa depois deste id
+            ate (int): Maior id considerado
+            tamanho_lote (int): Quantidade de refeições no lote
+
+        Returns:
+            int: Id da última refeição do lote ('ate' se restarem menos de 'tamanho_lote' refeições)
+        """
+        with gerenciador.conexao() as conexao:
+            linha = conexao.execute('''
+                SELECT id FROM refeicoes
+                WHERE alimento = ? AND id > ? AND id <= ?
+                ORDER BY id
+                LIMIT 1 OFFSET ?
+            ''', (alimento, apos, ate, tamanho_lote - 1)).fetchone()
+        return linha[0] if linha else ate
+
+    @staticmethod
+    def recalcular_nutrientes(alimento, nutrientes, apos, ate):
+        """
+        Recalcula calorias e macronutrientes das refeições de um alimento numa faixa de ids
+
+        Os gatilhos de refeicoes ajustam totais_diarios na mesma transação.
+
+        Args:
+            alimento (str): Nome do alimento
+            nutrientes (tuple): (calorias, proteinas, carboidratos, gorduras) por 100g
+            apos (int): Primeiro id da faixa (exclusivo)
+            ate (int): Último id da faixa (inclusivo)
+
+        Returns:
+            tuple: (int, list) Quantidade de refeições recalculadas e os pares
+                (email_usuario, dia) que elas afetaram
+        """
+        calorias, proteinas, carboidratos, gorduras = nutrientes
+        with gerenciador.transacao() as conexao:
+            dias = conexao.execute('''
+                SELECT DISTINCT email_usuario, dia
+                FROM refeicoes
+                WHERE alimento = ? AND id > ? AND id <= ?
+            ''', (alimento, apos, ate)).fetchall()
+            recalculadas = conexao.execute('''
+                UPDATE refeicoes
+                SET calorias = quantidade_gramas * ? / 100,
+                    proteinas = quantidade_gramas * ? / 100,
+                    carboidratos = quantidade_gramas * ? / 100,
+                    gorduras = quantidade_gramas * ? / 100
+                WHERE alimento = ? AND id > ? AND id <= ?
+            ''', (calorias, proteinas or 0, carboidratos or 0, gorduras or 0, alimento, apos, ate)).rowcount
+        return recalculadas, dias
+
+
+class RepositorioTotaisDiarios:
+    """Leituras da tabela totais_diarios, mantida por gatilhos sobre refeicoes"""
+
+    @staticmethod
+    def buscar(email_usuario, dia):
+        """
+        Obtém o total consolidado do usuário em um dia
+
+        Args:
+            email_usuario (str): Email do usuário
+            dia (date | str): Dia desejado
+
+        Returns:
+            tuple: (calorias, quantidade_refeicoes, proteinas, carboidratos, gorduras),
+                ou None se não houver refeições no dia
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT calorias, quantidade_refeicoes, proteinas, carboidratos, gorduras
+                FROM totais_diarios
+                WHERE email_usuario = ? AND dia = ?
+            ''', (email_usuario, chave_dia(dia))).fetchone()
+
+    @staticmethod
+    def ultimos_dias_ativos(intervalo):
+        """
+        Obtém o último dia com refeições de cada usuário ativo no período, pelo índice (dia, email_usuario)
+
+        Returns:
+            list: Chaves de dia (uma por usuário que registrou refeições no período)
+        """
+        inicio, fim = intervalo
+        with gerenciador.conexao() as conexao:
+            return [dia for dia, in conexao.execute('''
+                SELECT MAX(dia)
+                FROM totais_diarios
+                WHERE dia >= ? AND dia < ?
+                GROUP BY email_usuario
+            ''', (inicio, fim))]
+
+
+class RepositorioRecomendacoes:
+    """Consultas sobre a tabela dietas_alimentos (alimentos indicados para cada dieta)"""
+
+    @staticmethod
+    def recomendar(email_usuario, dieta, intervalo_recente, limite=4):
+        """
+        Escolhe os alimentos recomendados para o usuário numa única consulta
+
+        Considera só as regras da dieta cujo alimento está no catálogo, descarta
+        os alimentos que o usuário comeu no intervalo recente (anti-join em
+        refeicoes) e pontua os demais pelo peso da regra dividido pelo número de
+        vezes que o usuário já os comeu, favorecendo variedade. Empates são
+        desfeitos ao acaso.
+
+        Args:
+            email_usuario (str): Email do usuário
+            dieta (str): Dieta do usuário
+            intervalo_recente (tuple): Faixa (inicio, fim) de chaves de dia considerada recente
+            limite (int): Quantidade de alimentos
+
+        Returns:
+            list: Tuplas (alimento, pontuacao), da maior para a menor pontuação
+        """
+        inicio, fim = intervalo_recente
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT d.alimento, d.peso / (1 + COALESCE(c.quantidade_refeicoes, 0)) AS pontuacao
+                FROM dietas_alimentos d
+                JOIN alimentos a ON a.nome = d.alimento
+                LEFT JOIN consumo_alimentos c ON c.email_usuario = ? AND c.alimento = d.alimento
+                WHERE d.dieta = ?
+                  AND d.alimento NOT IN (
+                      SELECT alimento FROM refeicoes
+                      WHERE email_usuario = ? AND dia >= ? AND dia < ?
+                  )
+                ORDER BY pontuacao DESC, random()
+                LIMIT ?
+            ''', (email_usuario, dieta, email_usuario, inicio, fim, limite)).fetchall()
+
+    @staticmethod
+    def fora_do_catalogo():
+        """
+        Lista as regras que apontam para alimentos não cadastrados
+
+        Returns:
+            list: Tuplas (dieta, alimento) ordenadas por dieta e alimento
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT d.dieta, d.alimento
+                FROM dietas_alimentos d
+                WHERE NOT EXISTS (SELECT 1 FROM alimentos a WHERE a.nome = d.alimento)
+                ORDER BY d.dieta, d.alimento
+            ''').fetchall()
+
+
+# Ordens da listagem de usuários: colunas do ORDER BY, sempre terminando no
+# e-mail (único), que desempata e completa o cursor da paginação
+ORDENS_USUARIOS = {
+    "email": ("email",),
+    "imc": ("imc", "email"),
+    "peso": ("peso", "email"),
+    "dieta": ("dieta", "imc", "email"),
+}
+_COLUNAS_LISTAGEM_USUARIOS = ("email", "peso", "altura", "sexo", "dieta", "imc")
+
+
+class RepositorioUsuarios:
+    """Consultas e alterações na tabela de usuários"""
+
+    @staticmethod
+    def existe(email):
+        """Indica se já existe um usuário com o e-mail informado"""
+        with gerenciador.conexao() as conexao:
+            return conexao.execute("SELECT 1 FROM usuarios WHERE email = ?", (email,)).fetchone() is not None
+
+    @staticmethod
+    def inserir(email, senha, peso, altura, sexo, dieta, imc, pergunta, resposta):
+        """Cadastra um novo usuário"""
+        with gerenciador.transacao() as conexao:
+            conexao.execute('''
+                INSERT INTO usuarios (email, senha, peso, altura, sexo, dieta, imc, pergunta_seguranca, resposta_seguranca)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (email, senha, peso, altura, sexo, dieta, imc, pergunta, resposta))
+
+    @staticmethod
+    def buscar_existentes(emails):
+        """
+        Indica quais dos e-mails já estão cadastrados, com uma consulta por lote de parâmetros
+
+        Args:
+            emails (iterable): E-mails a conferir
+
+        Returns:
+            set: E-mails já cadastrados
+        """
+        emails = list(dict.fromkeys(emails))
+        existentes = set()
+        with gerenciador.conexao() as conexao:
+            for inicio in range(0, len(emails), TAMANHO_LOTE_PARAMETROS):
+                lote = emails[inicio:inicio + TAMANHO_LOTE_PARAMETROS]
+                marcadores = ", ".join("?" * len(lote))
+                existentes.update(email for email, in conexao.execute(
+                    f"SELECT email FROM usuarios WHERE email IN ({marcadores})", lote))
+        return existentes
+
+    @staticmethod
+    def salvar_varios(usuarios, senha_vazia):
+        """
+        Insere ou atualiza vários usuários numa única transação
+
+        Em usuários já cadastrados, senha, pergunta e resposta só são trocadas
+        quando vierem preenchidas (senha diferente de 'senha_vazia' e pergunta não vazia).
+
+        Args:
+            usuarios (list): Tuplas (email, senha, peso, altura, sexo, dieta, imc, pergunta, resposta)
+            senha_vazia (str): Valor de senha que significa "manter a atual"
+        """
+        with gerenciador.transacao() as conexao:
+            conexao.executemany('''
+                INSERT INTO usuarios (email, senha, peso, altura, sexo, dieta, imc, pergunta_seguranca, resposta_seguranca)
+                VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9)
+                ON CONFLICT (email) DO UPDATE SET
+                    senha = CASE WHEN excluded.senha = ?10 THEN usuarios.senha ELSE excluded.senha END,
+                    peso = excluded.peso,
+                    altura = excluded.altura,
+                    sexo = excluded.sexo,
+                    dieta = excluded.dieta,
+                    imc = excluded.imc,
+                    pergunta_seguranca = CASE WHEN excluded.pergunta_seguranca = ''
+                        THEN usuarios.pergunta_seguranca ELSE excluded.pergunta_seguranca END,
+                    resposta_seguranca = CASE WHEN excluded.pergunta_seguranca = ''
+                        THEN usuarios.resposta_seguranca ELSE excluded.resposta_seguranca END
+            ''', [(*usuario, senha_vazia) for usuario in usuarios])
+
+    @staticmethod
+    def buscar_senha(email):
+        """Retorna a senha (hash) cadastrada do usuário, ou None se o e-mail não existir"""
+        with gerenciador.conexao() as conexao:
+            resultado = conexao.execute("SELECT senha FROM usuarios WHERE email = ?", (email,)).fetchone()
+        return resultado[0] if resultado else None
+
+    @staticmethod
+    def atualizar_senha(email, senha, anterior=None):
+        """
+        Grava uma nova senha (hash) para o usuário
+
+        Args:
+            email (str): E-mail do usuário
+            senha (str): Hash da nova senha (ver credenciais.gerar_hash)
+            anterior (str, opcional): Só altera se o valor gravado ainda for este
+
+        Returns:
+            bool: True se a senha foi alterada
+        """
+        with gerenciador.transacao() as conexao:
+            if anterior is None:
+                cursor = conexao.execute("UPDATE usuarios SET senha = ? WHERE email = ?", (senha, email))
+            else:
+                cursor = conexao.execute("UPDATE usuarios SET senha = ? WHERE email = ? AND senha = ?",
+                                         (senha, email, anterior))
+            return cursor.rowcount > 0
+
+    @staticmethod
+    def buscar_recuperacao(email):
+        """
+        Obtém os dados de recuperação de senha
+
+        Returns:
+            tuple: (pergunta_seguranca, resposta_seguranca), ou None se o e-mail não existir
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(
+                "SELECT pergunta_seguranca, resposta_seguranca FROM usuarios WHERE email = ?",
+                (email,)).fetchone()
+
+    @staticmethod
+    def buscar_perfil(email):
+        """
+        Obtém os dados da dieta do usuário
+
+        Returns:
+            tuple: (dieta, peso, altura), ou None se o e-mail não existir
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(
+                "SELECT dieta, peso, altura FROM usuarios WHERE email = ?", (email,)).fetchone()
+
+    @staticmethod
+    def buscar_dados(email):
+        """
+        Obtém o perfil completo do usuário (usado pela sessão, ver sessao.Sessao)
+
+        Returns:
+            tuple: (dieta, peso, altura, sexo, imc), ou None se o e-mail não existir
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(
+                "SELECT dieta, peso, altura, sexo, imc FROM usuarios WHERE email = ?", (email,)).fetchone()
+
+    @staticmethod
+    def atualizar_dados(email, peso, altura, dieta, imc):
+        """Atualiza peso, altura, dieta e IMC do usuário"""
+        with gerenciador.transacao() as conexao:
+            conexao.execute('''
+                UPDATE usuarios
+                SET peso = ?, altura = ?, dieta = ?, imc = ?
+                WHERE email = ?
+            ''', (peso, altura, dieta, imc, email))
+
+    @staticmethod
+    def _filtros(dieta, sexo, faixa_imc, coluna_faixa):
+        """Monta as condições dos filtros da listagem; a faixa de IMC vira um teste sobre 'coluna_faixa'"""
+        condicoes, parametros = [], []
+        if dieta is not None:
+            condicoes.append("dieta = ?")
+            parametros.append(dieta)
+        if sexo is not None:
+            condicoes.append("sexo = ?")
+            parametros.append(sexo)
+        if faixa_imc is not None:
+            if coluna_faixa == "faixa_imc":
+                condicoes.append("faixa_imc = ?")
+                parametros.append(faixa_imc)
+            else:
+                _, minimo, maximo = FAIXAS_IMC[faixa_imc]
+                if minimo is not None:
+                    condicoes.append(f"{coluna_faixa} >= ?")
+                    parametros.append(minimo)
+                if maximo is not None:
+                    condicoes.append(f"{coluna_faixa} < ?")
+                    parametros.append(maximo)
+        return condicoes, parametros
+
+    @staticmethod
+    def pagina(limite=50, apos=None, ordem="email", decrescente=False, dieta=None, sexo=None, faixa_imc=None):
+        """
+        Lista uma página de usuários para o administrador
+
+        Paginação por chave, como em RepositorioRefeicoes.pagina: cada página
+        continua a partir dos valores de ordenação da última linha da anterior,
+        lendo o índice da ordem escolhida em vez de ordenar a tabela inteira.
+
+        Args:
+            limite (int): Quantidade de usuários na página
+            apos (tuple, opcional): Cursor devolvido pela página anterior
+            ordem (str): Chave de ORDENS_USUARIOS ('email', 'imc', 'peso' ou 'dieta')
+            decrescente (bool): Se True, do maior para o menor
+            dieta (str, opcional): Apenas usuários desta dieta
+            sexo (str, opcional): Apenas usuários deste sexo ('M' ou 'F')
+            faixa_imc (int, opcional): Apenas usuários nesta faixa (posição em database.FAIXAS_IMC)
+
+        Returns:
+            tuple: (linhas, cursor), com linhas (email, peso, altura, sexo, dieta, imc)
+                e o cursor da próxima página, ou None se esta for a última
+
+        Raises:
+            ValueError: Se a ordem não existir
+        """
+        if ordem not in ORDENS_USUARIOS:
+            raise ValueError(f"Ordem desconhecida: {ordem}")
+        colunas = ORDENS_USUARIOS[ordem]
+        condicoes, parametros = RepositorioUsuarios._filtros(dieta, sexo, faixa_imc, "imc")
+        if apos is not None:
+            condicoes.append(f"({', '.join(colunas)}) {'<' if decrescente else '>'} "
+                             f"({', '.join('?' * len(colunas))})")
+            parametros.extend(apos)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        direcao = " DESC" if decrescente else ""
+
+        with gerenciador.conexao() as conexao:
+            linhas = conexao.execute(f'''
+                SELECT {', '.join(_COLUNAS_LISTAGEM_USUARIOS)}
+                FROM usuarios
+                {where}
+                ORDER BY {', '.join(coluna + direcao for coluna in colunas)}
+                LIMIT ?
+            ''', (*parametros, limite + 1)).fetchall()
+
+        if len(linhas) <= limite:
+            return linhas, None
+        linhas = linhas[:limite]
+        return linhas, tuple(linhas[-1][_COLUNAS_LISTAGEM_USUARIOS.index(coluna)] for coluna in colunas)
+
+    @staticmethod
+    def contar(dieta=None, sexo=None, faixa_imc=None):
+        """
+        Conta os usuários que atendem aos filtros da listagem
+
+        Lê a tabela contagem_usuarios (uma linha por dieta, sexo e faixa de IMC,
+        mantida por gatilhos) em vez de contar a tabela usuarios.
+
+        Returns:
+            int: Quantidade de usuários
+        """
+        condicoes, parametros = RepositorioUsuarios._filtros(dieta, sexo, faixa_imc, "faixa_imc")
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(
+                f"SELECT COALESCE(SUM(quantidade), 0) FROM contagem_usuarios {where}", parametros).fetchone()[0]
+
+    @staticmethod
+    def contagem_por_grupo():
+        """
+        Lê a tabela contagem_usuarios inteira (poucas linhas, mantidas por gatilhos)
+
+        Returns:
+            list: Tuplas (dieta, sexo, faixa_imc, quantidade)
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(
+                "SELECT dieta, sexo, faixa_imc, quantidade FROM contagem_usuarios").fetchall()
+
+    @staticmethod
+    def histograma_imc(largura):
+        """
+        Conta os usuários por faixa de IMC de largura fixa, lendo apenas o índice idx_usuarios_imc
+
+        Args:
+            largura (float): Largura de cada faixa (a faixa k vai de k * largura até (k + 1) * largura)
+
+        Returns:
+            list: Tuplas (k, quantidade, soma_imc) em ordem de k, só das faixas com usuários
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT CAST(imc / ? AS INTEGER), COUNT(*), SUM(imc)
+                FROM usuarios
+                GROUP BY 1
+                ORDER BY 1
+            ''', (largura,)).fetchall()
+
+    @staticmethod
+    def iterar(tamanho_lote=1000):
+        """
+        Percorre os usuários sem carregar a tabela inteira na memória
+
+        Yields:
+            tuple: (email, peso, altura, sexo, dieta, imc)
+        """
+        with gerenciador.conexao() as conexao:
+            cursor = conexao.execute("SELECT email, peso, altura, sexo, dieta, imc FROM usuarios")
+            while lote := cursor.fetchmany(tamanho_lote):
+                yield from lote
+
+    @staticmethod
+    def limite_lote(apos, tamanho_lote):
+        """
+        Encontra o último email de um lote de usuários, em ordem de email
+
+        Args:
+            apos (str): O lote começa depois deste email ('' para o início)
+            tamanho_lote (int): Quantidade de usuários no lote
+
+        Returns:
+            str: Email do último usuário do lote, ou None se restarem menos de 'tamanho_lote' usuários
+        """
+        with gerenciador.conexao() as conexao:
+            linha = conexao.execute(
+                "SELECT email FROM usuarios WHERE email > ? ORDER BY email LIMIT 1 OFFSET ?",
+                (apos, tamanho_lote - 1)).fetchone()
+        return linha[0] if linha else None
+
+
+class RepositorioFechamentos:
+    """Consultas e alterações na tabela fechamentos_diarios (ver fechamento.py)"""
+
+    @staticmethod
+    def resumo_do_dia(dia, apos="", ate=None, limite=None):
+        """
+        Totais de um dia para um lote de usuários, junto com a dieta e o peso de cada um
+
+        Uma única consulta percorre os usuários em ordem de email e busca a
+        linha do dia de cada um em totais_diarios pela chave (email_usuario, dia).
+        Usuários sem refeições no dia aparecem com totais zerados.
+
+        Args:
+            dia (int): Chave do dia (AAAAMMDD)
+            apos (str): Apenas usuários com email depois deste
+            ate (str, opcional): Apenas usuários com email até este (inclusive)
+            limite (int, opcional): Quantidade máxima de usuários retornados
+
+        Returns:
+            list: Tuplas (email, dieta, peso, calorias, proteinas, carboidratos, gorduras,
+                quantidade_refeicoes) em ordem de email
+        """
+        condicoes, parametros = ["u.email > ?"], [dia, apos]
+        if ate is not None:
+            condicoes.append("u.email <= ?")
+            parametros.append(ate)
+        parametros.append(-1 if limite is None else limite)
+
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(f'''
+                SELECT u.email, u.dieta, u.peso,
+                       COALESCE(t.calorias, 0), COALESCE(t.proteinas, 0), COALESCE(t.carboidratos, 0),
+                       COALESCE(t.gorduras, 0), COALESCE(t.quantidade_refeicoes, 0)
+                FROM usuarios u
+                LEFT JOIN totais_diarios t ON t.email_usuario = u.email AND t.dia = ?
+                WHERE {' AND '.join(condicoes)}
+                ORDER BY u.email
+                LIMIT ?
+            ''', parametros).fetchall()
+
+    @staticmethod
+    def salvar_varios(fechamentos):
+        """
+        Grava (ou regrava) os fechamentos de vários usuários numa única transação
+
+        Args:
+            fechamentos (list): Tuplas (email_usuario, dia, dieta, meta, calorias, proteinas,
+                carboidratos, gorduras, quantidade_refeicoes, situacao, fechado_em)
+        """
+        with gerenciador.transacao() as conexao:
+            conexao.executemany('''
+                INSERT INTO fechamentos_diarios (email_usuario, dia, dieta, meta, calorias, proteinas,
+                                                 carboidratos, gorduras, quantidade_refeicoes, situacao, fechado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (email_usuario, dia) DO UPDATE SET
+                    dieta = excluded.dieta,
+                    meta = excluded.meta,
+                    calorias = excluded.calorias,
+                    proteinas = excluded.proteinas,
+                    carboidratos = excluded.carboidratos,
+                    gorduras = excluded.gorduras,
+                    quantidade_refeicoes = excluded.quantidade_refeicoes,
+                    situacao = excluded.situacao,
+                    fechado_em = excluded.fechado_em
+            ''', fechamentos)
+
+    @staticmethod
+    def atualizar_totais(dias, tolerancia):
+        """
+        Copia os totais diários atuais para os fechamentos já feitos desses dias e refaz a situação
+
+        Usado depois de recalcular refeições (ver recalculo.py); a dieta e a meta
+        do fechamento são mantidas.
+
+        Args:
+            dias (list): Pares (email_usuario, dia)
+            tolerancia (float): Variação aceita em torno da meta, ver relatorios.TOLERANCIA_META
+        """
+        with gerenciador.transacao() as conexao:
+            conexao.executemany('''
+                UPDATE fechamentos_diarios
+                SET (calorias, proteinas, carboidratos, gorduras, quantidade_refeicoes) = (
+                    SELECT t.calorias, t.proteinas, t.carboidratos, t.gorduras, t.quantidade_refeicoes
+                    FROM totais_diarios t
+                    WHERE t.email_usuario = fechamentos_diarios.email_usuario AND t.dia = fechamentos_diarios.dia
+                )
+                WHERE email_usuario = ? AND dia = ?
+                  AND EXISTS (SELECT 1 FROM totais_diarios t WHERE t.email_usuario = ? AND t.dia = ?)
+            ''', [(email, dia, email, dia) for email, dia in dias])
+            conexao.executemany('''
+                UPDATE fechamentos_diarios
+                SET situacao = CASE WHEN calorias < meta * (1 - ?) THEN -1
+                                    WHEN calorias > meta * (1 + ?) THEN 1
+                                    ELSE 0 END
+                WHERE email_usuario = ? AND dia = ?
+            ''', [(tolerancia, tolerancia, email, dia) for email, dia in dias])
+
+    @staticmethod
+    def listar_por_usuario(email_usuario, intervalo):
+        """
+        Lista os dias fechados do usuário num período
+
+        Args:
+            email_usuario (str): Email do usuário
+            intervalo (tuple): Faixa (inicio, fim) de chaves de dia
+
+        Returns:
+            list: Tuplas (dia, dieta, meta, calorias, proteinas, carboidratos, gorduras, situacao) em ordem de dia
+        """
+        inicio, fim = intervalo
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT dia, dieta, meta, calorias, proteinas, carboidratos, gorduras, situacao
+                FROM fechamentos_diarios
+                WHERE email_usuario = ? AND dia >= ? AND dia < ?
+                ORDER BY dia
+            ''', (email_usuario, inicio, fim)).fetchall()
+
+    @staticmethod
+    def aderencia_por_dia(intervalo):
+        """
+        Conta, para cada dia fechado do período, quantos usuários ficaram abaixo, dentro e acima da meta
+
+        Returns:
+            list: Tuplas (dia, usuarios, abaixo, dentro, acima) em ordem de dia
+        """
+        inicio, fim = intervalo
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT dia, COUNT(*), SUM(situacao < 0), SUM(situacao = 0), SUM(situacao > 0)
+                FROM fechamentos_diarios
+                WHERE dia >= ? AND dia < ?
+                GROUP BY dia
+                ORDER BY dia
+            ''', (inicio, fim)).fetchall()
+
+    @staticmethod
+    def resumo_por_dieta(intervalo):
+        """
+        Soma os dias fechados do período por dieta, lendo apenas o índice idx_fechamentos_dia_dieta
+
+        Returns:
+            list: Tuplas (dieta, dias_fechados, soma_calorias, soma_metas, dias_dentro_da_meta)
+        """
+        inicio, fim = intervalo
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT dieta, COUNT(*), SUM(calorias), SUM(meta), SUM(situacao = 0)
+                FROM fechamentos_diarios
+                WHERE dia >= ? AND dia < ?
+                GROUP BY dieta
+            ''', (inicio, fim)).fetchall()
+
+
+class RepositorioRecalculos:
+    """Fila persistente de recálculos de refeições (tabela recalculos_pendentes, ver recalculo.py)"""
+
+    @staticmethod
+    def registrar(alimento):
+        """
+        Agenda o recálculo de todas as refeições já registradas do alimento
+
+        Refeições registradas depois disso já saem com os valores novos. Se o
+        alimento já tinha um recálculo pendente, ele recomeça do início.
+
+        Returns:
+            bool: True se havia refeições a recalcular
+        """
+        with gerenciador.transacao() as conexao:
+            return conexao.execute('''
+                INSERT INTO recalculos_pendentes (alimento, ultimo_id, limite_id)
+                SELECT ?, 0, MAX(id) FROM refeicoes WHERE alimento = ? HAVING MAX(id) IS NOT NULL
+                ON CONFLICT (alimento) DO UPDATE SET ultimo_id = 0, limite_id = excluded.limite_id
+            ''', (alimento, alimento)).rowcount > 0
+
+    @staticmethod
+    def listar():
+        """
+        Lista os recálculos pendentes
+
+        Returns:
+            list: Tuplas (alimento, ultimo_id, limite_id) em ordem de alimento
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(
+                "SELECT alimento, ultimo_id, limite_id FROM recalculos_pendentes ORDER BY alimento").fetchall()
+
+    @staticmethod
+    def proximo():
+        """Retorna o primeiro recálculo pendente (alimento, ultimo_id, limite_id), ou None"""
+        with gerenciador.conexao() as conexao:
+            return conexao.execute(
+                "SELECT alimento, ultimo_id, limite_id FROM recalculos_pendentes ORDER BY alimento LIMIT 1").fetchone()
+
+    @staticmethod
+    def avancar(alimento, ultimo_id):
+        """Grava até onde o recálculo do alimento chegou"""
+        with gerenciador.transacao() as conexao:
+            conexao.execute("UPDATE recalculos_pendentes SET ultimo_id = ? WHERE alimento = ?", (ultimo_id, alimento))
+
+    @staticmethod
+    def concluir(alimento):
+        """Remove o recálculo concluído"""
+        with gerenciador.transacao() as conexao:
+            conexao.execute("DELETE FROM recalculos_pendentes WHERE alimento = ?", (alimento,))
+
+
+class RepositorioSuporte:
+    """Consultas e alterações na tabela de suporte"""
+
+    @staticmethod
+    def inserir(email, mensagem, data_hora=None):
+        """Registra uma mensagem de suporte (data/hora atual do banco se não informada)"""
+        with gerenciador.transacao() as conexao:
+            if data_hora is None:
+                conexao.execute("INSERT INTO suporte (email, mensagem) VALUES (?, ?)", (email, mensagem))
+            else:
+                conexao.execute("INSERT INTO suporte (email, mensagem, data_hora) VALUES (?, ?, ?)",
+                                (email, mensagem, data_hora))
+
+    @staticmethod
+    def listar_por_usuario(email):
+        """
+        Lista as mensagens enviadas pelo usuário
+
+        Returns:
+            list: Tuplas (data_hora, mensagem, resposta), mais recentes primeiro
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT data_hora, mensagem, resposta
+                FROM suporte
+                WHERE email = ?
+                ORDER BY data_hora DESC, id DESC
+            ''', (email,)).fetchall()
+
+    @staticmethod
+    def listar_todos():
+        """
+        Lista as mensagens de todos os usuários
+
+        Returns:
+            list: Tuplas (id, email, mensagem, resposta), mais recentes primeiro
+        """
+        with gerenciador.conexao() as conexao:
+            return conexao.execute('''
+                SELECT id, email, mensagem, resposta
+                FROM suporte
+                ORDER BY data_hora DESC
+            ''').fetchall()
+
+    @staticmethod
+    def existe(id_mensagem):
+        """Indica se existe uma mensagem com o ID informado"""
+        with gerenciador.conexao() as conexao:
+            return conexao.execute("SELECT 1 FROM suporte WHERE id = ?", (id_mensagem,)).fetchone() is not None
+
+    @staticmethod
+    def responder(id_mensagem, resposta):
+        """Grava a resposta do administrador para uma mensagem"""
+        with gerenciador.transacao() as conexao:
+            conexao.execute("UPDATE suporte SET resposta = ? WHERE id = ?", (resposta, id_mensagem))
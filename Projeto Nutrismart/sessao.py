@@ -0,0 +1,51 @@
+# Sessão do usuário logado: o perfil (dieta, peso, altura, sexo, IMC) é lido do
+# banco uma vez, no login, junto com os valores derivados que as telas usam
+# (meta calórica diária). Quem altera o perfil chama invalidar() e a próxima
+# leitura busca os dados de novo.
+from collections import namedtuple
+
+from relatorios import meta_calorica
+from repositorios import RepositorioUsuarios
+
+# dieta e peso vêm primeiro, na mesma ordem de RepositorioUsuarios.buscar_perfil
+PerfilUsuario = namedtuple("PerfilUsuario", "dieta peso altura sexo imc meta_calorias")
+
+
+class Sessao:
+    """Dados do usuário logado, guardados em memória enquanto durar o login"""
+
+    def __init__(self, email):
+        """
+        Cria a sessão (o perfil é lido no primeiro acesso, ou em carregar)
+
+        Args:
+            email (str): E-mail do usuário logado
+        """
+        self.email = email
+        self._perfil = None
+
+    def carregar(self):
+        """
+        Lê o perfil do banco
+
+        Returns:
+            PerfilUsuario: Perfil do usuário, ou None se o e-mail não existir
+        """
+        dados = RepositorioUsuarios.buscar_dados(self.email)
+        if dados is None:
+            self._perfil = None
+        else:
+            dieta, peso, altura, sexo, imc = dados
+            self._perfil = PerfilUsuario(dieta, peso, altura, sexo, imc, meta_calorica(dieta, peso))
+        return self._perfil
+
+    @property
+    def perfil(self):
+        """PerfilUsuario do usuário logado (lido do banco só se ainda não estiver carregado)"""
+        if self._perfil is None:
+            return self.carregar()
+        return self._perfil
+
+    def invalidar(self):
+        """Descarta o perfil guardado; usar depois de alterar os dados do usuário"""
+        self._perfil = None
@@ -1,6 +1,6 @@
 # Importações necessárias para o código
-from membros import Usuario
-from alimentacao import Comida
+from membros import Adm, Usuario
+from alimentacao import Adm_alimentar, Registros
 from suportinho import Suporte
 
 # ----------------- Menu do Administrador ----------------- #
@@ -19,20 +19,32 @@ def menu_administrador():
         print("3. Ver usuários")
         print("4. Excluir alimento")
         print("5. Suporte")  
-        print("6. Sair")
+        print("6. Exportar dados")
+        print("7. Aderência dos usuários")
+        print("8. Atualizar alimento")
+        print("9. Painel da população")
+        print("10. Sair")
         escolha = input("Escolha uma opção: ")
 
         if escolha == "1":
-            Comida.cadastrar_alimento()
+            Adm_alimentar.cadastrar_alimento()
         elif escolha == "2":
-            Comida.ver_alimentos()
+            Adm_alimentar.ver_alimentos()
         elif escolha == "3":
-            Comida.ver_usuarios()
+            Adm.ver_usuarios()
         elif escolha == "4":
-            Comida.excluir_alimento()
+            Adm_alimentar.excluir_alimento()
         elif escolha == "5":
-            Comida.submenu_suporte_administrador()
+            Suporte.submenu_suporte_administrador()
         elif escolha == "6":
+            Adm.exportar_dados()
+        elif escolha == "7":
+            Adm.ver_aderencia()
+        elif escolha == "8":
+            Adm_alimentar.atualizar_alimento()
+        elif escolha == "9":
+            Adm.ver_painel()
+        elif escolha == "10":
             print("Saindo do menu administrador...")
             break
         else:
@@ -43,7 +55,7 @@ def menu_administrador():
 def menu_usuario_logado(usuario):
     """Menu principal com as funcionalidades disponíveis para o usuário logado."""
     email_usuario = usuario.email
-    comida = Comida(email_usuario)
+    comida = Registros(email_usuario, usuario.sessao)
 
     while True:
         print(f"\n=== Bem-vindo {email_usuario} ===")
@@ -55,13 +67,14 @@ def menu_usuario_logado(usuario):
         print("6. Lembretes e alertas")
         print("7. Ajuda e suporte")
         print("8. Editar meus dados")
-        print("9. Logout")
+        print("9. Relatórios")
+        print("10. Logout")
         escolha = input("Escolha uma opção: ")
 
         if escolha == "1":
-            comida.registrar_refeicao()
+            comida.registrar_refeicao_interativa()
         elif escolha == "2":
-            comida.ver_refeicoes()
+            comida.ver_historico()
         elif escolha == "3":
             comida.ver_alimentos_recomendados()
         elif escolha == "4":
@@ -75,6 +88,8 @@ def menu_usuario_logado(usuario):
         elif escolha == "8":
             usuario.editar_meus_dados()
         elif escolha == "9":
+            comida.ver_relatorio()
+        elif escolha == "10":
             print("Logout realizado.")
             break
         else:
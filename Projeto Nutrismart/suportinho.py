@@ -1,5 +1,5 @@
 # Importações necessárias para o código
-from database import cursor, conn
+from repositorios import RepositorioSuporte
 
 class Suporte:
     @staticmethod
@@ -21,9 +21,7 @@ class Suporte:
             return
 
         # Insere a mensagem no banco de dados
-        cursor.execute("INSERT INTO suporte (email, mensagem) VALUES (?, ?)", 
-                        (email_usuario, mensagem))
-        conn.commit()
+        RepositorioSuporte.inserir(email_usuario, mensagem)
 
         print("✅ Mensagem enviada com sucesso! O administrador responderá em breve.")
 
@@ -38,15 +36,13 @@ class Suporte:
         print("\n--- Respostas do Administrador ---")
         
         # Busca todas as interações do usuário com o suporte
-        cursor.execute("SELECT mensagem, resposta FROM suporte WHERE email = ?", 
-                        (email_usuario,))
-        registros = cursor.fetchall()
+        registros = list(reversed(RepositorioSuporte.listar_por_usuario(email_usuario)))
 
         if not registros:
             print("📭 Você ainda não enviou nenhuma mensagem ao administrador.")
         else:
             # Exibe cada mensagem com seu status de resposta
-            for i, (mensagem, resposta) in enumerate(registros, start=1):
+            for i, (_, mensagem, resposta) in enumerate(registros, start=1):
                 print(f"\n📨 Mensagem {i}: {mensagem}")
                 if resposta:
                     print(f"🟢 Resposta: {resposta}")
@@ -103,8 +99,7 @@ class Suporte:
     def visualizar_contatos_usuarios():
         """Exibe todas as mensagens de suporte recebidas dos usuários."""
         # Busca todas as interações de suporte registradas
-        cursor.execute("SELECT id, email, mensagem, resposta FROM suporte")
-        contatos = cursor.fetchall()
+        contatos = RepositorioSuporte.listar_todos()
 
         if not contatos:
             print("\nNenhuma mensagem de usuários no momento.")
@@ -138,14 +133,11 @@ class Suporte:
             return
         
         # Valida se o ID existe
-        cursor.execute("SELECT id FROM suporte WHERE id = ?", (id_resposta,))
-        if not cursor.fetchone():
+        if not RepositorioSuporte.existe(id_resposta):
             print("ID inválido.")
             return
 
         # Coleta e registra a resposta
         resposta = input("Digite a resposta para o usuário: ")
-        cursor.execute("UPDATE suporte SET resposta = ? WHERE id = ?", 
-                        (resposta, id_resposta))
-        conn.commit()
-        print("Resposta enviada com sucesso.")
\ No newline at end of file
+        RepositorioSuporte.responder(id_resposta, resposta)
+        print("Resposta enviada com sucesso.")
\ No newline at end of file
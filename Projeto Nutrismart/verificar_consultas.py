@@ -0,0 +1,204 @@
+# Verificação dos planos de consulta do sistema
+# Executa cada operação dos repositórios num banco temporário, captura o SQL
+# gerado e roda EXPLAIN QUERY PLAN em cada instrução. Termina com erro se
+# alguma consulta varrer uma tabela inteira em vez de usar um índice.
+# Uso: python verificar_consultas.py
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime
+
+from database import gerenciador, preparar_banco
+from repositorios import (RepositorioAlimentos, RepositorioFechamentos, RepositorioRecalculos, RepositorioRecomendacoes,
+                          RepositorioRefeicoes, RepositorioSuporte, RepositorioTotaisDiarios, RepositorioUsuarios,
+                          intervalo_mes, intervalo_ultimos_dias)
+
+EMAIL = "planos@nutrismart.com"
+HOJE = datetime.now().strftime("%Y-%m-%d")
+AGORA = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+# Operações do sistema com argumentos de exemplo, na ordem em que são executadas
+CONSULTAS = [
+    ("RepositorioUsuarios.inserir",
+     lambda: RepositorioUsuarios.inserir(EMAIL, "senha", 70, 1.75, "M", "Bulking", 22.86, "pergunta", "resposta")),
+    ("RepositorioUsuarios.existe", lambda: RepositorioUsuarios.existe(EMAIL)),
+    ("RepositorioUsuarios.buscar_senha", lambda: RepositorioUsuarios.buscar_senha(EMAIL)),
+    ("RepositorioUsuarios.buscar_recuperacao", lambda: RepositorioUsuarios.buscar_recuperacao(EMAIL)),
+    ("RepositorioUsuarios.atualizar_senha",
+     lambda: RepositorioUsuarios.atualizar_senha(EMAIL, "novo hash", anterior="senha")),
+    ("RepositorioUsuarios.buscar_perfil", lambda: RepositorioUsuarios.buscar_perfil(EMAIL)),
+    ("RepositorioUsuarios.buscar_dados", lambda: RepositorioUsuarios.buscar_dados(EMAIL)),
+    ("RepositorioUsuarios.buscar_existentes",
+     lambda: RepositorioUsuarios.buscar_existentes([EMAIL, "outro@nutrismart.com"])),
+    ("RepositorioUsuarios.salvar_varios",
+     lambda: RepositorioUsuarios.salvar_varios([(EMAIL, "!", 71, 1.75, "M", "Bulking", 23.18, "", "")], "!")),
+    ("RepositorioUsuarios.atualizar_dados",
+     lambda: RepositorioUsuarios.atualizar_dados(EMAIL, 72, 1.75, "Bulking", 23.51)),
+    ("RepositorioUsuarios.pagina", lambda: RepositorioUsuarios.pagina()),
+    ("RepositorioUsuarios.pagina (cursor)", lambda: RepositorioUsuarios.pagina(apos=(EMAIL,))),
+    ("RepositorioUsuarios.pagina (imc)",
+     lambda: RepositorioUsuarios.pagina(ordem="imc", decrescente=True, apos=(25.0, EMAIL))),
+    ("RepositorioUsuarios.pagina (peso, sexo)", lambda: RepositorioUsuarios.pagina(ordem="peso", sexo="M")),
+    ("RepositorioUsuarios.pagina (dieta)",
+     lambda: RepositorioUsuarios.pagina(ordem="dieta", apos=("Bulking", 25.0, EMAIL))),
+    ("RepositorioUsuarios.pagina (imc, dieta)",
+     lambda: RepositorioUsuarios.pagina(ordem="imc", dieta="Bulking", apos=(25.0, EMAIL))),
+    ("RepositorioUsuarios.pagina (peso, dieta)", lambda: RepositorioUsuarios.pagina(ordem="peso", dieta="Bulking")),
+    ("RepositorioUsuarios.pagina (faixa de IMC)", lambda: RepositorioUsuarios.pagina(ordem="imc", faixa_imc=1)),
+    ("RepositorioUsuarios.contar", lambda: RepositorioUsuarios.contar()),
+    ("RepositorioUsuarios.contar (filtros)",
+     lambda: RepositorioUsuarios.contar(dieta="Bulking", sexo="M", faixa_imc=1)),
+    ("RepositorioUsuarios.contagem_por_grupo", lambda: RepositorioUsuarios.contagem_por_grupo()),
+    ("RepositorioUsuarios.histograma_imc", lambda: RepositorioUsuarios.histograma_imc(1.0)),
+    ("RepositorioUsuarios.iterar", lambda: list(RepositorioUsuarios.iterar())),
+    ("RepositorioAlimentos.inserir", lambda: RepositorioAlimentos.inserir("arroz", 130)),
+    ("RepositorioAlimentos.listar", lambda: RepositorioAlimentos.listar()),
+    ("RepositorioAlimentos.listar_nutrientes", lambda: RepositorioAlimentos.listar_nutrientes()),
+    ("RepositorioAlimentos.revisao", lambda: RepositorioAlimentos.revisao()),
+    ("RepositorioAlimentos.buscar_nutrientes_varios",
+     lambda: RepositorioAlimentos.buscar_nutrientes_varios(["arroz", "feijao"])),
+    ("RepositorioAlimentos.salvar_varios",
+     lambda: RepositorioAlimentos.salvar_varios([("arroz", 128, 2.5, 28.1, 0.2), ("feijao", 76, 4.8, 13.6, 0.5)])),
+    ("RepositorioRefeicoes.inserir", lambda: RepositorioRefeicoes.inserir(EMAIL, "arroz", 100, 130, AGORA)),
+    ("RepositorioRefeicoes.iterar (usuário)", lambda: list(RepositorioRefeicoes.iterar(EMAIL))),
+    ("RepositorioRefeicoes.iterar (usuário e período)",
+     lambda: list(RepositorioRefeicoes.iterar(EMAIL, intervalo_mes(HOJE)))),
+    ("RepositorioRefeicoes.iterar (todos)", lambda: list(RepositorioRefeicoes.iterar())),
+    ("RepositorioRefeicoes.iterar (período)", lambda: list(RepositorioRefeicoes.iterar(intervalo=intervalo_mes(HOJE)))),
+    ("RepositorioRefeicoes.ranking", lambda: RepositorioRefeicoes.ranking(EMAIL)),
+    ("RepositorioRefeicoes.ranking (período)",
+     lambda: RepositorioRefeicoes.ranking(EMAIL, intervalo=intervalo_ultimos_dias(30))),
+    ("RepositorioRefeicoes.resumo_por_dia",
+     lambda: RepositorioRefeicoes.resumo_por_dia(EMAIL, intervalo_mes(HOJE))),
+    ("RepositorioRefeicoes.pagina", lambda: RepositorioRefeicoes.pagina(EMAIL)),
+    ("RepositorioRefeicoes.pagina (próxima)", lambda: RepositorioRefeicoes.pagina(EMAIL, apos=(AGORA, 10))),
+    ("RepositorioRefeicoes.pagina (período)",
+     lambda: RepositorioRefeicoes.pagina(EMAIL, apos=(AGORA, 10), intervalo=intervalo_mes(HOJE))),
+    ("RepositorioRefeicoes.pagina (alimento)",
+     lambda: RepositorioRefeicoes.pagina(EMAIL, apos=(AGORA, 10), intervalo=intervalo_mes(HOJE), alimento="arroz")),
+    ("RepositorioRefeicoes.contar_do_dia", lambda: RepositorioRefeicoes.contar_do_dia(EMAIL, HOJE)),
+    ("RepositorioRecomendacoes.recomendar",
+     lambda: RepositorioRecomendacoes.recomendar(EMAIL, "Bulking", intervalo_ultimos_dias(3))),
+    ("RepositorioRecomendacoes.fora_do_catalogo", lambda: RepositorioRecomendacoes.fora_do_catalogo()),
+    ("RepositorioTotaisDiarios.buscar", lambda: RepositorioTotaisDiarios.buscar(EMAIL, HOJE)),
+    ("RepositorioTotaisDiarios.ultimos_dias_ativos",
+     lambda: RepositorioTotaisDiarios.ultimos_dias_ativos(intervalo_ultimos_dias(30))),
+    ("RepositorioUsuarios.limite_lote", lambda: RepositorioUsuarios.limite_lote("", 500)),
+    ("RepositorioFechamentos.resumo_do_dia", lambda: RepositorioFechamentos.resumo_do_dia(20250101, limite=500)),
+    ("RepositorioFechamentos.resumo_do_dia (faixa)",
+     lambda: RepositorioFechamentos.resumo_do_dia(20250101, "a", "m")),
+    ("RepositorioFechamentos.salvar_varios", lambda: RepositorioFechamentos.salvar_varios(
+        [(EMAIL, 20250101, "Bulking", 2450, 2000, 100, 250, 60, 3, -1, AGORA)])),
+    ("RepositorioFechamentos.listar_por_usuario",
+     lambda: RepositorioFechamentos.listar_por_usuario(EMAIL, intervalo_mes(HOJE))),
+    ("RepositorioFechamentos.aderencia_por_dia", lambda: RepositorioFechamentos.aderencia_por_dia(intervalo_mes(HOJE))),
+    ("RepositorioFechamentos.resumo_por_dieta",
+     lambda: RepositorioFechamentos.resumo_por_dieta(intervalo_ultimos_dias(30))),
+    ("RepositorioRecalculos.registrar", lambda: RepositorioRecalculos.registrar("arroz")),
+    ("RepositorioRecalculos.listar", lambda: RepositorioRecalculos.listar()),
+    ("RepositorioRecalculos.proximo", lambda: RepositorioRecalculos.proximo()),
+    ("RepositorioRefeicoes.limite_lote_alimento",
+     lambda: RepositorioRefeicoes.limite_lote_alimento("arroz", 0, 1000, 500)),
+    ("RepositorioRefeicoes.recalcular_nutrientes",
+     lambda: RepositorioRefeicoes.recalcular_nutrientes("arroz", (128, 2.5, 28.1, 0.2), 0, 1000)),
+    ("RepositorioFechamentos.atualizar_totais",
+     lambda: RepositorioFechamentos.atualizar_totais([(EMAIL, 20250101)], 0.1)),
+    ("RepositorioRecalculos.avancar", lambda: RepositorioRecalculos.avancar("arroz", 500)),
+    ("RepositorioRecalculos.concluir", lambda: RepositorioRecalculos.concluir("arroz")),
+    ("RepositorioSuporte.inserir", lambda: RepositorioSuporte.inserir(EMAIL, "mensagem")),
+    ("RepositorioSuporte.listar_por_usuario", lambda: RepositorioSuporte.listar_por_usuario(EMAIL)),
+    ("RepositorioSuporte.listar_todos", lambda: RepositorioSuporte.listar_todos()),
+    ("RepositorioSuporte.existe", lambda: RepositorioSuporte.existe(1)),
+    ("RepositorioSuporte.responder", lambda: RepositorioSuporte.responder(1, "resposta")),
+    ("RepositorioAlimentos.excluir", lambda: RepositorioAlimentos.excluir("arroz")),
+]
+
+# Listagens completas: ler a tabela inteira é o comportamento esperado
+VARREDURAS_PERMITIDAS = {
+    "RepositorioUsuarios.contar",  # contagem_usuarios: uma linha por dieta, sexo e faixa de IMC
+    "RepositorioUsuarios.contagem_por_grupo",
+    "RepositorioUsuarios.iterar",
+    "RepositorioAlimentos.listar_nutrientes",
+    "RepositorioRecomendacoes.fora_do_catalogo",
+    "RepositorioRefeicoes.iterar (todos)",
+    "RepositorioRefeicoes.iterar (período)",
+}
+
+# Instruções que não têm plano de consulta relevante
+_IGNORADAS = re.compile(r"^\s*(BEGIN|COMMIT|ROLLBACK|PRAGMA|CREATE|SAVEPOINT|RELEASE)\b", re.IGNORECASE)
+
+# "SCAN tabela" sem "USING ... INDEX" significa varredura completa
+_VARREDURA = re.compile(r"^SCAN (?!CONSTANT ROW)\S+$")
+
+
+def capturar_sql(operacao):
+    """
+    Executa uma operação e retorna as instruções SQL que ela enviou ao banco
+
+    Args:
+        operacao (callable): Função sem argumentos que usa os repositórios
+
+    Returns:
+        list: Instruções SQL com os parâmetros já substituídos
+    """
+    instrucoes = []
+    with gerenciador.conexao() as conexao:
+        conexao.set_trace_callback(instrucoes.append)
+        try:
+            operacao()
+        finally:
+            conexao.set_trace_callback(None)
+    return [sql for sql in instrucoes if not _IGNORADAS.match(sql)]
+
+
+def plano_de_consulta(sql):
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN de uma instrução"""
+    with gerenciador.conexao() as conexao:
+        return [linha[3] for linha in conexao.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+
+
+def verificar(consultas=CONSULTAS, permitidas=VARREDURAS_PERMITIDAS):
+    """
+    Verifica o plano de todas as consultas num banco temporário
+
+    Returns:
+        list: Tuplas (operação, sql, detalhe) de cada varredura completa encontrada
+    """
+    falhas = []
+    caminho_original = gerenciador.caminho
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            gerenciador.configurar(caminho=os.path.join(pasta, "planos.db"))
+            preparar_banco()
+
+            for nome, operacao in consultas:
+                for sql in capturar_sql(operacao):
+                    detalhes = plano_de_consulta(sql)
+                    varreduras = [d for d in detalhes if _VARREDURA.match(d)]
+                    situacao = "OK"
+                    if varreduras and nome not in permitidas:
+                        situacao = "VARREDURA"
+                        falhas.extend((nome, sql, d) for d in varreduras)
+                    elif varreduras:
+                        situacao = "PERMITIDA"
+                    print(f"[{situacao:^9}] {nome}: {' | '.join(detalhes) or '(sem plano)'}")
+
+            gerenciador.fechar()
+    finally:
+        gerenciador.configurar(caminho=caminho_original)
+    return falhas
+
+
+def main():
+    falhas = verificar()
+    if falhas:
+        print(f"\n❌ {len(falhas)} consulta(s) fazendo varredura completa de tabela:")
+        for nome, sql, detalhe in falhas:
+            print(f"- {nome}: {detalhe}\n  {' '.join(sql.split())}")
+        sys.exit(1)
+    print("\n✅ Todas as consultas usam índices.")
+
+
+if __name__ == "__main__":
+    main()